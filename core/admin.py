@@ -11,7 +11,7 @@ class ProfileAdmin(admin.ModelAdmin):
         "completion_percentage",
         "is_profile_complete",
     )
-    list_filter = ("gender", "country")
+    list_filter = ("is_profile_complete", "gender", "country")
     search_fields = (
         "user__username",
         "user__first_name",
@@ -45,6 +45,9 @@ class ProfileAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("user")
+
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
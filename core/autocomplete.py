@@ -0,0 +1,142 @@
+"""
+In-process prefix indexes for autocomplete.
+
+Each index is a sorted list of case-folded keys searched with bisect, plus a
+reference count per key so a value shared by many rows is suggested once.
+Indexes are built lazily on first use and then patched by the Skill/Profile
+signals after each transaction commits. Every process keeps its own copy, so
+writes made by other processes only show up once this process reloads.
+"""
+
+import bisect
+import threading
+
+
+def _normalize(value):
+    return " ".join((value or "").casefold().split())
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index over values loaded from the database.
+
+    loader() must return an iterable of (row_key, values) pairs, where values
+    is a sequence of strings to suggest for that row.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = threading.RLock()
+        self._keys = None
+        self._entries = {}  # key -> [display value, reference count]
+        self._rows = {}  # row key -> tuple of indexed keys
+
+    @property
+    def is_loaded(self):
+        return self._keys is not None
+
+    def reset(self):
+        """Drop the index so the next lookup reloads it from the database"""
+        with self._lock:
+            self._keys = None
+            self._entries = {}
+            self._rows = {}
+
+    def _ensure_loaded(self):
+        if self._keys is not None:
+            return
+        with self._lock:
+            if self._keys is not None:
+                return
+            self._entries = {}
+            self._rows = {}
+            for row_key, values in self._loader():
+                self._rows[row_key] = self._add_values(values, insert=False)
+            self._keys = sorted(self._entries)
+
+    def _add_values(self, values, insert=True):
+        keys = []
+        for value in values:
+            key = _normalize(value)
+            if not key or key in keys:
+                continue
+            keys.append(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = [value.strip(), 1]
+                if insert:
+                    bisect.insort(self._keys, key)
+            else:
+                entry[1] += 1
+        return tuple(keys)
+
+    def _remove_keys(self, keys):
+        for key in keys:
+            entry = self._entries[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._entries[key]
+                del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def set_row(self, row_key, values):
+        """Replace the values indexed for one row (no-op until loaded)"""
+        with self._lock:
+            if self._keys is None:
+                return
+            self._remove_keys(self._rows.pop(row_key, ()))
+            keys = self._add_values(values)
+            if keys:
+                self._rows[row_key] = keys
+
+    def remove_row(self, row_key):
+        self.set_row(row_key, ())
+
+    def complete(self, prefix, limit=10):
+        """Return up to limit display values whose key starts with prefix"""
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        self._ensure_loaded()
+        keys = self._keys
+        results = []
+        position = bisect.bisect_left(keys, prefix)
+        while position < len(keys) and len(results) < limit:
+            key = keys[position]
+            if not key.startswith(prefix):
+                break
+            entry = self._entries.get(key)
+            if entry is not None:
+                results.append(entry[0])
+            position += 1
+        return results
+
+
+def _load_skill_titles():
+    from .models import Skill
+
+    return (
+        (pk, (title,))
+        for pk, title in Skill.objects.filter(is_active=True)
+        .values_list("pk", "title")
+        .iterator()
+    )
+
+
+def _load_locations():
+    from .models import Profile
+
+    return (
+        (pk, (city, country))
+        for pk, city, country in Profile.objects.values_list(
+            "pk", "city", "country"
+        ).iterator()
+    )
+
+
+SKILL_TITLES = PrefixIndex(_load_skill_titles)
+LOCATIONS = PrefixIndex(_load_locations)
+
+AUTOCOMPLETE_INDEXES = {
+    "title": SKILL_TITLES,
+    "location": LOCATIONS,
+}
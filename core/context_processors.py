@@ -0,0 +1,9 @@
+from .unread import unread_count
+
+
+def unread_messages(request):
+    """The signed-in user's unread message total for the navigation badge"""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {"unread_message_count": unread_count(user)}
@@ -0,0 +1,53 @@
+"""
+Facet counts for the skill filter sidebar.
+
+One grouped query counts active skills per (category, type, gender) for the
+filters that aren't facets (search text, location). Each facet's counts are
+then summed in Python while applying the *other* facets' current selections,
+so every option shows how many results picking it would give.
+"""
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .search_cache import make_key
+
+FACET_CACHE_TIMEOUT = 60 * 10
+
+
+def _grouped_counts(queryset, filter_key):
+    key = make_key("facets", filter_key)
+    rows = cache.get(key)
+    if rows is None:
+        rows = [
+            (row["category"], row["skill_type"], row["user__profile__gender"], row["n"])
+            for row in queryset.order_by()
+            .values("category", "skill_type", "user__profile__gender")
+            .annotate(n=Count("id"))
+        ]
+        cache.set(key, rows, FACET_CACHE_TIMEOUT)
+    return rows
+
+
+def skill_facet_counts(queryset, filter_key, skill_type="", category="", gender=""):
+    """
+    Return {"category": {...}, "type": {...}, "gender": {...}} option counts.
+
+    queryset must already be narrowed by the non-facet filters, and filter_key
+    must be a normalized description of exactly those filters.
+    """
+    counts = {"category": {}, "type": {}, "gender": {}}
+    for row_category, row_type, row_gender, n in _grouped_counts(queryset, filter_key):
+        category_ok = not category or row_category == category
+        type_ok = not skill_type or row_type == skill_type
+        gender_ok = not gender or row_gender == gender
+
+        if type_ok and gender_ok:
+            counts["category"][row_category] = (
+                counts["category"].get(row_category, 0) + n
+            )
+        if category_ok and gender_ok:
+            counts["type"][row_type] = counts["type"].get(row_type, 0) + n
+        if category_ok and type_ok and row_gender:
+            counts["gender"][row_gender] = counts["gender"].get(row_gender, 0) + n
+    return counts
@@ -102,6 +102,7 @@ class SkillForm(forms.ModelForm):
                 attrs={
                     "placeholder": "e.g., Python Programming, Guitar Lessons, French Conversation",
                     "class": "form-control",
+                    "data-autocomplete": "title",
                 }
             ),
             "description": forms.Textarea(
@@ -117,6 +118,7 @@ class SkillForm(forms.ModelForm):
                 attrs={
                     "placeholder": "e.g., Stockholm, Online, My place, Coffee shops",
                     "class": "form-control",
+                    "data-autocomplete": "location",
                 }
             ),
             "availability": forms.TextInput(
@@ -0,0 +1,239 @@
+"""
+Precomputed "top rated skills" leaderboards.
+
+One board per (category, skill type) holds the LEADERBOARD_SIZE active skills
+with the best Bayesian-weighted rating, so the leaderboard page is a single
+indexed read of LeaderboardEntry instead of a ranking over every skill.
+
+rebuild_leaderboards (the management command) fills every board. After that
+the Rating/Skill signals call update_skill_leaderboard, which moves only the
+changed skill within its board's stored rows, under a lock on those rows.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast
+
+from .ranking import PRIOR_MEAN, PRIOR_WEIGHT, bayesian_rating
+
+LEADERBOARD_SIZE = 10
+# Skills need at least this many ratings to be listed
+MIN_RATINGS = 1
+
+
+def weighted_rating_expression():
+    """ranking.bayesian_rating() of the stored totals, as a SQL expression"""
+    return (Value(PRIOR_WEIGHT * PRIOR_MEAN) + Cast("rating_sum", FloatField())) / (
+        Value(float(PRIOR_WEIGHT)) + F("rating_count")
+    )
+
+
+def leaderboard_candidates(category, skill_type):
+    """The skills that belong on a board, best first"""
+    from .models import Skill
+
+    return (
+        Skill.objects.filter(
+            is_active=True,
+            category=category,
+            skill_type=skill_type,
+            rating_count__gte=MIN_RATINGS,
+        )
+        .annotate(weighted_rating=weighted_rating_expression())
+        .order_by("-weighted_rating", "-rating_count", "-id")
+    )
+
+
+def rebuild_leaderboard(category, skill_type):
+    """Replace one board's entries with its current top skills"""
+    from .models import LeaderboardEntry
+
+    top = leaderboard_candidates(category, skill_type).values_list(
+        "id", "weighted_rating"
+    )[:LEADERBOARD_SIZE]
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(
+            category=category, skill_type=skill_type
+        ).delete()
+        LeaderboardEntry.objects.bulk_create(
+            LeaderboardEntry(
+                category=category,
+                skill_type=skill_type,
+                rank=rank,
+                skill_id=skill_id,
+                weighted_rating=weighted,
+            )
+            for rank, (skill_id, weighted) in enumerate(top, start=1)
+        )
+
+
+def rebuild_leaderboards():
+    """Rebuild every board; returns the number of boards"""
+    from .models import Skill
+
+    boards = 0
+    for category, _ in Skill.SKILL_CATEGORIES:
+        for skill_type, _ in Skill.SKILL_TYPES:
+            rebuild_leaderboard(category, skill_type)
+            boards += 1
+    return boards
+
+
+def _ranking_key(entry):
+    """Sort key of a (skill_id, weighted_rating, rating_count) board entry"""
+    skill_id, weighted, rating_count = entry
+    return (weighted, rating_count, skill_id)
+
+
+def _change_board(category, skill_type, change):
+    """
+    Apply change to one board under a lock on its rows.
+
+    change gets the stored entries best first, as (skill_id, weighted_rating,
+    rating_count) tuples, and returns the new list (or None to leave the board
+    as it is). Only the ranks whose entry differs are deleted and re-inserted.
+    A rank that had no row to lock can still be taken by a concurrent
+    transaction; the unique (category, skill_type, rank) then fails the insert
+    and the step is retried once against the committed board.
+    """
+    from .models import LeaderboardEntry
+
+    board = LeaderboardEntry.objects.filter(category=category, skill_type=skill_type)
+    locked = (
+        board.select_for_update(of=("self",))
+        .order_by("rank")
+        .values_list("rank", "skill_id", "weighted_rating", "skill__rating_count")
+    )
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                stored = {
+                    rank: (skill_id, weighted, rating_count)
+                    for rank, skill_id, weighted, rating_count in locked.all()
+                }
+                entries = change(list(stored.values()))
+                if entries is None:
+                    return
+                ranked = dict(enumerate(entries[:LEADERBOARD_SIZE], start=1))
+                stale = [
+                    rank
+                    for rank in stored.keys() | ranked.keys()
+                    if rank not in stored
+                    or rank not in ranked
+                    or stored[rank][:2] != ranked[rank][:2]
+                ]
+                if not stale:
+                    return
+                board.filter(rank__in=stale).delete()
+                LeaderboardEntry.objects.bulk_create(
+                    LeaderboardEntry(
+                        category=category,
+                        skill_type=skill_type,
+                        rank=rank,
+                        skill_id=ranked[rank][0],
+                        weighted_rating=ranked[rank][1],
+                    )
+                    for rank in sorted(stale)
+                    if rank in ranked
+                )
+            return
+        except IntegrityError:
+            if attempt:
+                raise
+
+
+def _next_candidates(category, skill_type, entries, count=1):
+    """The best skills that belong on a board but aren't among entries"""
+    return [
+        (skill_id, weighted, rating_count)
+        for skill_id, weighted, rating_count in leaderboard_candidates(
+            category, skill_type
+        )
+        .exclude(pk__in=[skill_id for skill_id, _, _ in entries])
+        .values_list("id", "weighted_rating", "rating_count")[:count]
+    ]
+
+
+def place_on_leaderboard(category, skill_type, skill_id, entry=None):
+    """
+    Move one skill on a board without re-ranking the whole category.
+
+    entry is the skill's (skill_id, weighted_rating, rating_count) when it
+    qualifies for the board, None when it must be off it. Skills off a full
+    board never beat its lowest entry, so the board's own rows decide the new
+    order; the next best skill is only queried when a listed skill falls to
+    the bottom of a full board or leaves it.
+    """
+
+    def change(stored):
+        others = [listed for listed in stored if listed[0] != skill_id]
+        full = len(stored) >= LEADERBOARD_SIZE
+        if len(others) == len(stored):
+            # Not listed: only a new entry beating the lowest one gets on
+            if entry is None or (
+                full and _ranking_key(entry) <= _ranking_key(stored[-1])
+            ):
+                return None
+            return sorted(others + [entry], key=_ranking_key, reverse=True)
+        if entry is not None and (
+            not full or not others or _ranking_key(entry) >= _ranking_key(others[-1])
+        ):
+            return sorted(others + [entry], key=_ranking_key, reverse=True)
+        if full:
+            # The skill dropped to the cutoff: it or the best unlisted skill
+            # takes the last place
+            return others + _next_candidates(category, skill_type, others)
+        return others
+
+    _change_board(category, skill_type, change)
+
+
+def update_skill_leaderboard(skill_id):
+    """
+    Bring a skill's board up to date after its ratings changed.
+
+    One read of the skill and one locked read of its board; the board is only
+    written when the skill is or should be on it.
+    """
+    from .models import Skill
+
+    row = (
+        Skill.objects.filter(pk=skill_id)
+        .values_list(
+            "category", "skill_type", "is_active", "rating_sum", "rating_count"
+        )
+        .first()
+    )
+    if row is None:
+        return
+    category, skill_type, is_active, rating_sum, rating_count = row
+    entry = None
+    if is_active and rating_count >= MIN_RATINGS:
+        entry = (skill_id, bayesian_rating(rating_sum, rating_count), rating_count)
+    place_on_leaderboard(category, skill_type, skill_id, entry)
+
+
+def leave_other_leaderboards(skill_id, category, skill_type):
+    """Take a skill that moved to another board off the boards still listing it"""
+    from .models import LeaderboardEntry
+
+    boards = (
+        LeaderboardEntry.objects.filter(skill_id=skill_id)
+        .exclude(category=category, skill_type=skill_type)
+        .values_list("category", "skill_type")
+    )
+    for board in list(boards):
+        place_on_leaderboard(*board, skill_id)
+
+
+def refill_leaderboard(category, skill_type):
+    """Close the gap and top a board back up after one of its skills was deleted"""
+
+    def change(stored):
+        if len(stored) < LEADERBOARD_SIZE:
+            return stored + _next_candidates(
+                category, skill_type, stored, LEADERBOARD_SIZE - len(stored)
+            )
+        return stored
+
+    _change_board(category, skill_type, change)
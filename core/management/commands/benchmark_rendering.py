@@ -0,0 +1,218 @@
+"""
+Django management command to benchmark template rendering hot spots.
+
+Scenarios:
+    star_rating      the {% star_rating %} tag: full template render per call
+                     vs the memoized fragments the tag now serves
+    directory_cards  the skill tags of the user directory cards: splitting
+                     skills_offered/skills_needed per card vs the stored
+                     Profile.skills_summary
+
+Usage:
+    python manage.py benchmark_rendering
+    python manage.py benchmark_rendering --scenario star_rating --renders 50000
+    python manage.py benchmark_rendering --scenario directory_cards --cards 1000
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+
+from core.models import Profile
+from core.templatetags.rating_extras import _render_star_rating, star_rating
+
+# (show_value, show_count) as used by the cards and the skill sidebar
+STAR_RATING_VARIANTS = [(False, False), (True, False), (True, True)]
+
+# A skill list page: 12 cards, each with a star rating
+CARD_LIST_TEMPLATE = (
+    "{% load rating_extras %}"
+    "{% for rating in ratings %}"
+    "<div>{% star_rating rating show_value=False show_count=False %}</div>"
+    "{% endfor %}"
+)
+
+# The directory card skill tags as search.html rendered them before
+# Profile.skills_summary: the text is split four times per card
+LEGACY_CARD_SKILLS_TEMPLATE = """{% load core_extras %}{% for profile in profiles %}
+{% if profile.skills_offered %}
+<div class="user-card-skills-section">
+    <div class="user-card-skills-container">
+        {% with skills_offered=profile.skills_offered|split:","|slice:":3" %}
+            {% for skill in skills_offered %}
+            <span class="user-card-skill-tag offered">{{ skill }}</span>
+            {% endfor %}
+            {% with total_skills=profile.skills_offered|split:","|length %}
+                {% if total_skills > 3 %}
+                <span class="user-card-skill-tag more">+{{ total_skills|add:"-3" }} more</span>
+                {% endif %}
+            {% endwith %}
+        {% endwith %}
+    </div>
+</div>
+{% endif %}
+{% if profile.skills_needed %}
+<div class="user-card-skills-section needed">
+    <div class="user-card-skills-container">
+        {% with skills_needed=profile.skills_needed|split:","|slice:":2" %}
+            {% for skill in skills_needed %}
+            <span class="user-card-skill-tag needed">{{ skill }}</span>
+            {% endfor %}
+            {% with total_needed=profile.skills_needed|split:","|length %}
+                {% if total_needed > 2 %}
+                <span class="user-card-skill-tag more">+{{ total_needed|add:"-2" }} more</span>
+                {% endif %}
+            {% endwith %}
+        {% endwith %}
+    </div>
+</div>
+{% endif %}
+{% endfor %}"""
+
+CARD_SKILLS_TEMPLATE = (
+    "{% for profile in profiles %}"
+    "{% include 'core/components/user_card_skills.html' "
+    "with summary=profile.skills_summary %}"
+    "{% endfor %}"
+)
+
+CARD_SKILL_TITLES = [
+    "Python Programming",
+    "Guitar Lessons",
+    "French Conversation",
+    "Watercolor Painting",
+    "Yoga",
+    "Photography",
+    "Baking",
+    "Chess",
+    "Web Design",
+    "Public Speaking",
+    "Knitting",
+    "Spanish",
+    "Piano",
+    "Gardening",
+    "Data Analysis",
+]
+
+# Timed page renders per path in the directory_cards scenario (best is kept)
+CARD_PAGE_RUNS = 5
+
+
+class Command(BaseCommand):
+    help = "Benchmark template rendering (star_rating tag memoization)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            choices=["star_rating", "directory_cards"],
+            default="star_rating",
+            help="Which rendering path to benchmark",
+        )
+        parser.add_argument(
+            "--renders",
+            type=int,
+            default=20000,
+            help="Number of timed renders per path (star_rating)",
+        )
+        parser.add_argument(
+            "--cards",
+            type=int,
+            default=1000,
+            help="Number of user cards per page (directory_cards)",
+        )
+
+    def handle(self, *args, **options):
+        self.renders = options["renders"]
+        self.cards = options["cards"]
+        if options["scenario"] == "directory_cards":
+            self.benchmark_directory_cards()
+        else:
+            self.benchmark_star_rating()
+
+    def benchmark_star_rating(self):
+        rng = random.Random(42)
+        # Ratings as stored: averages of 1-5 star ratings, or 0 when unrated
+        ratings = [rng.choice([0, rng.uniform(1, 5)]) for _ in range(self.renders)]
+        calls = [
+            (rating, *rng.choice(STAR_RATING_VARIANTS), rng.randint(0, 40))
+            for rating in ratings
+        ]
+
+        def uncached():
+            for rating, show_value, show_count, count in calls:
+                _render_star_rating.cache_clear()
+                star_rating(rating, show_value, show_count, count)
+
+        def memoized():
+            for rating, show_value, show_count, count in calls:
+                star_rating(rating, show_value, show_count, count)
+
+        memoized()  # Warm the fragment cache
+        uncached_us = self.per_render_us(uncached)
+        memoized()
+        memoized_us = self.per_render_us(memoized)
+
+        self.stdout.write(f"{'path':<12} {'us/render':>10}")
+        self.stdout.write(f"{'template':<12} {uncached_us:>10.2f}")
+        self.stdout.write(f"{'memoized':<12} {memoized_us:>10.2f}")
+        self.stdout.write(
+            f"Saving {uncached_us - memoized_us:.2f} us per render "
+            f"({uncached_us / memoized_us:.1f}x); "
+            f"{_render_star_rating.cache_info().currsize} distinct fragments"
+        )
+
+        page = Template(CARD_LIST_TEMPLATE)
+        context = Context({"ratings": ratings[:12]})
+        start = time.perf_counter()
+        pages = max(self.renders // 12, 1)
+        for _ in range(pages):
+            page.render(context)
+        page_us = (time.perf_counter() - start) / pages * 1e6
+        self.stdout.write(f"12-card rating block: {page_us:.1f} us per page")
+
+    def benchmark_directory_cards(self):
+        rng = random.Random(42)
+        titles = CARD_SKILL_TITLES
+        profiles = []
+        for _ in range(self.cards):
+            # Unsaved profiles: the summary is what save() would store
+            offered = ", ".join(rng.sample(titles, rng.randint(0, 8)))
+            needed = ", ".join(rng.sample(titles, rng.randint(0, 5)))
+            profiles.append(
+                Profile(
+                    skills_offered=offered,
+                    skills_needed=needed,
+                    skills_summary=Profile.summarize_skills(offered, needed),
+                )
+            )
+        context = Context({"profiles": profiles})
+
+        self.stdout.write(f"{'path':<12} {'ms/page':>10} {'us/card':>10}")
+        timings = {}
+        for label, source in (
+            ("split", LEGACY_CARD_SKILLS_TEMPLATE),
+            ("summary", CARD_SKILLS_TEMPLATE),
+        ):
+            page = Template(source)
+            page.render(context)  # Warm the include's template cache
+            runs = []
+            for _ in range(CARD_PAGE_RUNS):
+                start = time.perf_counter()
+                page.render(context)
+                runs.append(time.perf_counter() - start)
+            timings[label] = min(runs)
+            self.stdout.write(
+                f"{label:<12} {timings[label] * 1e3:>10.2f} "
+                f"{timings[label] / self.cards * 1e6:>10.2f}"
+            )
+        self.stdout.write(
+            f"Saving {(timings['split'] - timings['summary']) * 1e3:.2f} ms per "
+            f"{self.cards}-card page ({timings['split'] / timings['summary']:.1f}x)"
+        )
+
+    def per_render_us(self, run):
+        start = time.perf_counter()
+        run()
+        return (time.perf_counter() - start) / self.renders * 1e6
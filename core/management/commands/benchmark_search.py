@@ -0,0 +1,400 @@
+"""
+Django management command to benchmark skill search at growing table sizes.
+Seeds synthetic skills inside a transaction that is rolled back at the end,
+so the database is left untouched.
+
+Scenarios:
+    text          full-text index vs title/description icontains
+    location      indexed location keys vs city/country/location icontains
+    autocomplete  in-process prefix index lookups (no database rows needed)
+    fuzzy         trigram fallback for misspelt searches, plus per-skill upkeep
+
+Usage:
+    python manage.py benchmark_search
+    python manage.py benchmark_search --sizes 10000 100000 1000000 --repeat 20
+    python manage.py benchmark_search --scenario location --sizes 500000
+    python manage.py benchmark_search --scenario autocomplete --sizes 1000000
+    python manage.py benchmark_search --scenario fuzzy --sizes 100000 1000000
+"""
+
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from core.autocomplete import PrefixIndex
+from core.models import Profile, Skill, SkillTrigram
+from core.search import (
+    SKILL_INDEX,
+    fuzzy_search_skills,
+    location_q,
+    normalize_location,
+    search_skills,
+    skill_trigram_weights,
+    sync_skill_trigrams,
+)
+
+TITLE_WORDS = [
+    "python",
+    "guitar",
+    "spanish",
+    "cooking",
+    "yoga",
+    "photography",
+    "django",
+    "piano",
+    "knitting",
+    "marketing",
+    "painting",
+    "chess",
+    "baking",
+    "french",
+    "running",
+    "accounting",
+]
+
+# Injected into a fixed number of skills per size, so the match count stays
+# constant while the table grows.
+RARE_TERM = "sourdough"
+RARE_TERM_MATCHES = 50
+
+CITIES = [
+    ("Stockholm", "Sweden"),
+    ("Gothenburg", "Sweden"),
+    ("Berlin", "Germany"),
+    ("Munich", "Germany"),
+    ("Paris", "France"),
+    ("Lyon", "France"),
+    ("London", "United Kingdom"),
+    ("Manchester", "United Kingdom"),
+    ("Amsterdam", "Netherlands"),
+    ("Utrecht", "Netherlands"),
+]
+
+# One user per this many skills in the location scenario
+SKILLS_PER_USER = 10
+
+DEFAULT_SIZES = {
+    "text": [10000, 100000, 1000000],
+    "location": [500000],
+    "autocomplete": [1000000],
+    "fuzzy": [100000, 1000000],
+}
+
+# Misspelt queries for the fuzzy scenario; none of them match exactly
+FUZZY_QUERIES = ["pyhton", "guitarr", "photgraphy", "spansh cookng"]
+
+
+class Command(BaseCommand):
+    help = "Benchmark skill search latency (full-text index vs icontains)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            choices=sorted(DEFAULT_SIZES),
+            default="text",
+            help="Which search filter to benchmark",
+        )
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            help="Table sizes (number of skills) to measure at",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=10,
+            help="Number of timed runs per query",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Rows per bulk insert while seeding",
+        )
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+        self.batch_size = options["batch_size"]
+        scenario = options["scenario"]
+        sizes = sorted(options["sizes"] or DEFAULT_SIZES[scenario])
+
+        if scenario == "text" and not SKILL_INDEX.is_available():
+            self.stdout.write(
+                self.style.WARNING(
+                    "Full-text index not available on this backend; "
+                    "only the icontains path will be measured."
+                )
+            )
+
+        with transaction.atomic():
+            if scenario == "text":
+                self.benchmark_text(sizes)
+            elif scenario == "location":
+                self.benchmark_location(sizes)
+            elif scenario == "fuzzy":
+                self.benchmark_fuzzy(sizes)
+            else:
+                self.benchmark_autocomplete(sizes)
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            self.style.SUCCESS("Benchmark finished, seeded data rolled back")
+        )
+
+    def benchmark_text(self, sizes):
+        user = User.objects.create(username="benchmark_search_user")
+        rng = random.Random(42)
+
+        self.stdout.write(
+            f"{'skills':>10}  {'query':<12} {'fts ms':>9} {'icontains ms':>13}"
+        )
+        for size in sizes:
+            self.seed(user, size, rng)
+            for label, term in (("rare", RARE_TERM), ("common", "python")):
+                fts_ms = self.measure(lambda: self.run_fts(term))
+                like_ms = self.measure(lambda: self.run_icontains(term))
+                self.stdout.write(
+                    f"{size:>10}  {label:<12} {fts_ms:>9.2f} {like_ms:>13.2f}"
+                )
+
+    def benchmark_location(self, sizes):
+        rng = random.Random(42)
+
+        self.stdout.write(
+            f"{'skills':>10}  {'query':<12} {'keys ms':>9} {'icontains ms':>13}"
+        )
+        for size in sizes:
+            self.seed_locations(size, rng)
+            for label, term in (
+                ("city", "Stockholm"),
+                ("prefix", "Man"),
+                ("country", "netherlands"),
+            ):
+                keys_ms = self.measure(lambda: self.run_location_keys(term))
+                like_ms = self.measure(lambda: self.run_location_icontains(term))
+                self.stdout.write(
+                    f"{size:>10}  {label:<12} {keys_ms:>9.2f} {like_ms:>13.2f}"
+                )
+
+    def benchmark_autocomplete(self, sizes):
+        rng = random.Random(42)
+
+        self.stdout.write(f"{'entries':>10}  {'prefix':<16} {'complete ms':>12}")
+        for size in sizes:
+            titles = [
+                f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} {index}".title()
+                for index in range(size)
+            ]
+            index = PrefixIndex(
+                lambda: ((pk, (title,)) for pk, title in enumerate(titles))
+            )
+
+            start = time.perf_counter()
+            index.complete("a")
+            load_ms = (time.perf_counter() - start) * 1000
+            self.stdout.write(f"{size:>10}  {'(initial load)':<16} {load_ms:>12.1f}")
+
+            for prefix in ("p", "pyth", "python guitar 12", "zzz"):
+                complete_ms = self.measure(lambda: index.complete(prefix))
+                self.stdout.write(f"{size:>10}  {prefix:<16} {complete_ms:>12.4f}")
+
+            start = time.perf_counter()
+            for pk in range(1000):
+                index.set_row(pk, (f"Renamed Skill {pk}",))
+            update_ms = (time.perf_counter() - start) * 1000 / 1000
+            self.stdout.write(f"{size:>10}  {'(update row)':<16} {update_ms:>12.4f}")
+
+    def benchmark_fuzzy(self, sizes):
+        user = User.objects.create(username="benchmark_fuzzy_user")
+        rng = random.Random(42)
+
+        self.stdout.write(
+            f"{'skills':>10}  {'query':<14} {'exact ms':>9} {'fuzzy ms':>9} "
+            f"{'matches':>8}"
+        )
+        for size in sizes:
+            self.seed_fuzzy(user, size, rng)
+            for term in FUZZY_QUERIES:
+                exact_ms = self.measure(
+                    lambda: search_skills(self.base_queryset(), term).exists()
+                )
+                fuzzy_ms = self.measure(lambda: self.run_fuzzy(term))
+                matches = fuzzy_search_skills(self.base_queryset(), term).count()
+                self.stdout.write(
+                    f"{size:>10}  {term:<14} {exact_ms:>9.2f} {fuzzy_ms:>9.2f} "
+                    f"{matches:>8}"
+                )
+
+            skill = Skill.objects.filter(user=user).first()
+            titles = iter(
+                f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)}".title()
+                for _ in range(self.repeat)
+            )
+
+            def retitle():
+                skill.title = next(titles)
+                sync_skill_trigrams(skill)
+
+            sync_ms = self.measure(retitle)
+            self.stdout.write(
+                f"{size:>10}  {'(edit skill)':<14} {'':>9} {sync_ms:>9.2f}"
+            )
+
+    def seed(self, user, size, rng):
+        """Top the skill table up to size rows and refresh the index"""
+        existing = Skill.objects.filter(user=user).count()
+        missing = size - existing
+        while missing > 0:
+            batch = []
+            for _ in range(min(missing, self.batch_size)):
+                words = rng.sample(TITLE_WORDS, 3)
+                batch.append(
+                    Skill(
+                        user=user,
+                        title=" ".join(words).title(),
+                        description=" ".join(
+                            f"term{rng.randrange(20000)}" for _ in range(12)
+                        ),
+                        skill_type=rng.choice(["offer", "request"]),
+                        category="other",
+                    )
+                )
+            Skill.objects.bulk_create(batch)
+            missing -= len(batch)
+
+        # Keep exactly RARE_TERM_MATCHES skills containing the rare term
+        Skill.objects.filter(user=user, description__startswith=RARE_TERM).update(
+            description="term0"
+        )
+        ids = list(Skill.objects.filter(user=user).values_list("id", flat=True))
+        chosen = rng.sample(ids, min(RARE_TERM_MATCHES, len(ids)))
+        Skill.objects.filter(id__in=chosen).update(
+            description=f"{RARE_TERM} bread baking for beginners"
+        )
+        SKILL_INDEX.rebuild()
+
+    def seed_fuzzy(self, user, size, rng):
+        """Top the table up to size skills with short texts and their trigrams"""
+        existing = Skill.objects.filter(user=user).count()
+        missing = size - existing
+        while missing > 0:
+            skills = Skill.objects.bulk_create(
+                Skill(
+                    user=user,
+                    title=" ".join(rng.sample(TITLE_WORDS, 2)).title(),
+                    description="Learn {} and {} together".format(
+                        *rng.sample(TITLE_WORDS, 2)
+                    ),
+                    skill_type=rng.choice(["offer", "request"]),
+                    category="other",
+                )
+                for _ in range(min(missing, self.batch_size))
+            )
+            SkillTrigram.objects.bulk_create(
+                (
+                    SkillTrigram(skill_id=skill.pk, trigram=gram, weight=weight)
+                    for skill in skills
+                    for gram, weight in skill_trigram_weights(
+                        skill.title, skill.description
+                    ).items()
+                ),
+                batch_size=self.batch_size,
+            )
+            missing -= len(skills)
+        SKILL_INDEX.rebuild()
+
+    def seed_locations(self, size, rng):
+        """Top the table up to size skills spread over users in CITIES"""
+        existing = Skill.objects.filter(user__username__startswith="bench_loc_").count()
+        missing = size - existing
+        while missing > 0:
+            count = min(missing, self.batch_size)
+            offset = User.objects.filter(username__startswith="bench_loc_").count()
+            users = User.objects.bulk_create(
+                User(username=f"bench_loc_{offset + index}")
+                for index in range(max(1, count // SKILLS_PER_USER))
+            )
+            profiles = []
+            for user in users:
+                city, country = rng.choice(CITIES)
+                profiles.append(
+                    Profile(
+                        user=user,
+                        city=city,
+                        country=country,
+                        city_key=normalize_location(city),
+                        country_key=normalize_location(country),
+                    )
+                )
+            Profile.objects.bulk_create(profiles)
+
+            skills = []
+            for index in range(count):
+                location = rng.choice(["", "Online", rng.choice(CITIES)[0]])
+                skills.append(
+                    Skill(
+                        user=users[index % len(users)],
+                        title="Location benchmark",
+                        description="Seeded skill",
+                        skill_type=rng.choice(["offer", "request"]),
+                        category="other",
+                        location=location,
+                        location_key=normalize_location(location),
+                    )
+                )
+            Skill.objects.bulk_create(skills)
+            missing -= count
+
+    def run_location_keys(self, term):
+        skills = self.base_queryset().filter(location_q(term)).order_by("-created_at")
+        list(skills[:12])
+        skills.count()
+
+    def run_location_icontains(self, term):
+        skills = (
+            self.base_queryset()
+            .filter(
+                Q(user__profile__city__icontains=term)
+                | Q(user__profile__country__icontains=term)
+                | Q(location__icontains=term)
+            )
+            .order_by("-created_at")
+        )
+        list(skills[:12])
+        skills.count()
+
+    def base_queryset(self):
+        return Skill.objects.filter(is_active=True).select_related("user__profile")
+
+    def run_fts(self, term):
+        skills = search_skills(self.base_queryset(), term)
+        list(skills[:12])
+        skills.count()
+
+    def run_fuzzy(self, term):
+        skills = fuzzy_search_skills(self.base_queryset(), term)
+        list(skills[:12])
+        skills.count()
+
+    def run_icontains(self, term):
+        skills = (
+            self.base_queryset()
+            .filter(Q(title__icontains=term) | Q(description__icontains=term))
+            .order_by("-created_at")
+        )
+        list(skills[:12])
+        skills.count()
+
+    def measure(self, func):
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
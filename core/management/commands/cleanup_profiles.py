@@ -8,8 +8,19 @@ Usage:
 
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
+from django.db.models import Count, Q
 from core.models import Profile
 
+# (label, lowest, highest) completion percentage per distribution bucket
+COMPLETION_RANGES = [
+    ("100%", 100, 100),
+    ("80-99%", 80, 99),
+    ("60-79%", 60, 79),
+    ("40-59%", 40, 59),
+    ("20-39%", 20, 39),
+    ("0-19%", 0, 19),
+]
+
 
 class Command(BaseCommand):
     help = "Clean up incomplete user profiles and show statistics"
@@ -41,46 +52,26 @@ class Command(BaseCommand):
 
     def show_statistics(self):
         """Show profile completion statistics"""
-        total_users = (
-            User.objects.filter(is_active=True).exclude(is_superuser=True).count()
-        )
-        complete_profiles = 0
-        incomplete_profiles = 0
-
-        users = (
-            User.objects.filter(is_active=True)
-            .exclude(is_superuser=True)
-            .select_related("profile")
+        users = User.objects.filter(is_active=True).exclude(is_superuser=True)
+        # One aggregate over the stored completion columns
+        stats = users.aggregate(
+            total_users=Count("id"),
+            complete_profiles=Count("id", filter=Q(profile__is_profile_complete=True)),
+            **{
+                f"range_{low}": Count(
+                    "id",
+                    filter=Q(
+                        profile__completion_percentage__gte=low,
+                        profile__completion_percentage__lte=high,
+                    ),
+                )
+                for _, low, high in COMPLETION_RANGES
+            },
         )
-
-        completion_stats = {}
-
-        for user in users:
-            try:
-                profile = user.profile
-                completion = profile.completion_percentage
-
-                if profile.is_profile_complete:
-                    complete_profiles += 1
-                else:
-                    incomplete_profiles += 1
-                if completion == 100:
-                    range_key = "100%"
-                elif completion >= 80:
-                    range_key = "80-99%"
-                elif completion >= 60:
-                    range_key = "60-79%"
-                elif completion >= 40:
-                    range_key = "40-59%"
-                elif completion >= 20:
-                    range_key = "20-39%"
-                else:
-                    range_key = "0-19%"
-
-                completion_stats[range_key] = completion_stats.get(range_key, 0) + 1
-
-            except Profile.DoesNotExist:
-                incomplete_profiles += 1
+        total_users = stats["total_users"]
+        complete_profiles = stats["complete_profiles"]
+        # Users without a profile count as incomplete
+        incomplete_profiles = total_users - complete_profiles
 
         self.stdout.write(self.style.SUCCESS("\n=== PROFILE COMPLETION STATISTICS ==="))
         self.stdout.write(f"Total Users: {total_users}")
@@ -92,8 +83,8 @@ class Command(BaseCommand):
         )
 
         self.stdout.write("\n--- Completion Distribution ---")
-        for range_key in ["100%", "80-99%", "60-79%", "40-59%", "20-39%", "0-19%"]:
-            count = completion_stats.get(range_key, 0)
+        for range_key, low, _ in COMPLETION_RANGES:
+            count = stats[f"range_{low}"]
             if count > 0:
                 self.stdout.write(f"{range_key}: {count} users")
 
@@ -101,24 +92,24 @@ class Command(BaseCommand):
         """Clean up users with incomplete profiles"""
         users_to_remove = []
 
+        # Only incomplete (or missing) profiles are loaded
         users = (
             User.objects.filter(is_active=True)
             .exclude(is_superuser=True)
+            .filter(Q(profile__isnull=True) | Q(profile__is_profile_complete=False))
             .select_related("profile")
         )
 
         for user in users:
             try:
                 profile = user.profile
-                if not profile.is_profile_complete:
-                    missing_fields = profile.missing_required_fields
-                    users_to_remove.append(
-                        {
-                            "user": user,
-                            "missing_fields": missing_fields,
-                            "completion": profile.completion_percentage,
-                        }
-                    )
+                users_to_remove.append(
+                    {
+                        "user": user,
+                        "missing_fields": profile.missing_required_fields,
+                        "completion": profile.completion_percentage,
+                    }
+                )
             except Profile.DoesNotExist:
                 users_to_remove.append(
                     {
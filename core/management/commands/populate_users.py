@@ -11,6 +11,7 @@ import random
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from core.models import Profile, Skill, Rating
+from core.skill_summary import bulk_skill_changes
 
 
 class Command(BaseCommand):
@@ -40,17 +41,19 @@ class Command(BaseCommand):
 
         created_count = 0
         all_users = []
-        for i in range(count):
-            try:
-                user_data = self.generate_user_data(i)
-                user = self.create_user_and_profile(user_data)
-                if user:
-                    all_users.append(user)
-                    created_count += 1
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f"Error creating user {i+1}: {str(e)}")
-                )
+        # One profile skill summary rebuild per user instead of one per skill
+        with bulk_skill_changes():
+            for i in range(count):
+                try:
+                    user_data = self.generate_user_data(i)
+                    user = self.create_user_and_profile(user_data)
+                    if user:
+                        all_users.append(user)
+                        created_count += 1
+                except Exception as e:
+                    self.stdout.write(
+                        self.style.ERROR(f"Error creating user {i+1}: {str(e)}")
+                    )
 
         # Create ratings for skills after all users are created
         if all_users:
@@ -0,0 +1,20 @@
+"""
+Django management command to rebuild the "top rated skills" leaderboards.
+Rating and skill signals keep the boards current incrementally; run this after
+bulk imports, raw SQL changes or a change to the leaderboard ranking.
+
+Usage:
+    python manage.py rebuild_leaderboards
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.leaderboard import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed top rated skills board of every category"
+
+    def handle(self, *args, **options):
+        boards = rebuild_leaderboards()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {boards} leaderboards"))
@@ -0,0 +1,32 @@
+"""
+Django management command to recompute the "best match" score of every skill.
+Ratings keep the score current as they change, but the recency part decays
+with time, so run this periodically (e.g. nightly from cron).
+
+Usage:
+    python manage.py recompute_skill_scores
+    python manage.py recompute_skill_scores --batch-size 5000
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.ranking import recompute_skill_scores
+from core.search_cache import bump_generation
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored ranking score (rating + recency) of every skill"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Skills per bulk update",
+        )
+
+    def handle(self, *args, **options):
+        updated = recompute_skill_scores(batch_size=options["batch_size"])
+        # Cached "best match" pages were ordered by the old scores
+        bump_generation()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed scores for {updated} skills"))
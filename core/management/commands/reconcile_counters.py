@@ -0,0 +1,122 @@
+"""
+Django management command to repair the denormalized counters.
+Walks each table in primary key chunks, recomputes the stored aggregates
+(skill rating totals and star counts, profile overall rating, profile skill
+text, conversation unread counters) with set-based queries and rewrites only
+the rows that drifted.
+
+Usage:
+    python manage.py reconcile_counters
+    python manage.py reconcile_counters --dry-run
+    python manage.py reconcile_counters --workers 4 --chunk-size 20000
+    python manage.py reconcile_counters --only skill_ratings
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.reconcile import RECONCILERS, pk_chunks, run_chunk
+from core.search_cache import bump_generation
+
+
+def _init_worker():
+    # Forked workers must not share the parent's database connections
+    django.setup()
+    connections.close_all()
+
+
+def _run_chunk(task):
+    return run_chunk(*task)
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized counters chunk by chunk and fix drifted rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Primary keys per chunk",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Worker processes; chunks are sharded across them",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted rows without fixing them",
+        )
+        parser.add_argument(
+            "--only",
+            choices=[name for name, _, _ in RECONCILERS],
+            action="append",
+            help="Run only the named reconciler (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        workers = options["workers"]
+        if chunk_size < 1 or workers < 1:
+            raise CommandError("--chunk-size and --workers must be positive")
+        dry_run = options["dry_run"]
+        self.verbosity = options["verbosity"]
+        selected = options["only"] or [name for name, _, _ in RECONCILERS]
+
+        pool = None
+        if workers > 1:
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        total_fixed = 0
+        try:
+            # One reconciler at a time: later ones read what earlier ones fix
+            for name, model_label, _ in RECONCILERS:
+                if name in selected:
+                    total_fixed += self.reconcile(
+                        name, apps.get_model(model_label), chunk_size, dry_run, pool
+                    )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(f"Dry run: {total_fixed} rows would be fixed")
+            )
+            return
+        if total_fixed:
+            # Cached result pages may show the drifted values
+            bump_generation()
+        self.stdout.write(self.style.SUCCESS(f"Fixed {total_fixed} rows"))
+
+    def reconcile(self, name, model, chunk_size, dry_run, pool):
+        chunks = pk_chunks(model, chunk_size)
+        tasks = [(name, start, end, dry_run) for start, end in chunks]
+        results = pool.map(_run_chunk, tasks) if pool else map(_run_chunk, tasks)
+
+        started = last_report = time.monotonic()
+        checked = fixed = 0
+        for done, (_, chunk_checked, fixed_ids) in enumerate(results, start=1):
+            checked += chunk_checked
+            fixed += len(fixed_ids)
+            if fixed_ids and self.verbosity >= 2:
+                self.stdout.write(f"  {name}: fixed ids {fixed_ids}")
+            now = time.monotonic()
+            if now - last_report >= 1 or done == len(tasks):
+                last_report = now
+                rate = checked / max(now - started, 1e-6)
+                self.stdout.write(
+                    f"{name}: {done}/{len(tasks)} chunks, {checked} rows checked, "
+                    f"{fixed} drifted ({rate:.0f} rows/s)"
+                )
+        if not tasks:
+            self.stdout.write(f"{name}: nothing to check")
+        return fixed
@@ -0,0 +1,35 @@
+"""
+Django management command to print the skill search result cache hit rate.
+The counters live in the cache, so this only sees the web processes' lookups
+when the configured cache is shared between processes; with the default
+local-memory cache read the periodic log lines of core.search_cache instead.
+
+Usage:
+    python manage.py search_cache_stats
+    python manage.py search_cache_stats --reset
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.search_cache import SKILL_RESULTS
+
+
+class Command(BaseCommand):
+    help = "Print the hits, misses and hit rate of the skill search result cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Zero the counters after printing them",
+        )
+
+    def handle(self, *args, **options):
+        stats = SKILL_RESULTS.stats()
+        self.stdout.write(
+            f"{stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['hit_rate']:.1%} hit rate"
+        )
+        if options["reset"]:
+            SKILL_RESULTS.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset"))
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def create_skill_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS core_skill_fts USING fts5("
+        "title, description, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        "INSERT INTO core_skill_fts (rowid, title, description) "
+        "SELECT id, title, description FROM core_skill"
+    )
+
+
+def drop_skill_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS core_skill_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_skill_fts, drop_skill_fts),
+    ]
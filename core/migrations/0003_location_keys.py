@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:42
+
+from django.db import migrations, models
+
+
+def normalize(value):
+    return " ".join((value or "").casefold().split())
+
+
+def fill_location_keys(apps, schema_editor):
+    Profile = apps.get_model("core", "Profile")
+    Skill = apps.get_model("core", "Skill")
+
+    profiles = []
+    for profile in Profile.objects.only("city", "country").iterator():
+        profile.city_key = normalize(profile.city)
+        profile.country_key = normalize(profile.country)
+        profiles.append(profile)
+    Profile.objects.bulk_update(profiles, ["city_key", "country_key"], batch_size=1000)
+
+    skills = []
+    for skill in Skill.objects.only("location").iterator():
+        skill.location_key = normalize(skill.location)
+        skills.append(skill)
+    Skill.objects.bulk_update(skills, ["location_key"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_skill_fts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="city_key",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=100
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="country_key",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=100
+            ),
+        ),
+        migrations.AddField(
+            model_name="skill",
+            name="location_key",
+            field=models.CharField(
+                blank=True, db_index=True, editable=False, max_length=200
+            ),
+        ),
+        migrations.RunPython(fill_location_keys, migrations.RunPython.noop),
+    ]
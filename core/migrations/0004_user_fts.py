@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def create_user_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS core_user_fts USING fts5("
+        "username, first_name, last_name, skills, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        "INSERT INTO core_user_fts (rowid, username, first_name, last_name, skills) "
+        "SELECT u.id, u.username, u.first_name, u.last_name, "
+        "COALESCE(p.skills_offered, '') || ' ' || COALESCE(p.skills_needed, '') "
+        "FROM auth_user u LEFT JOIN core_profile p ON p.user_id = u.id"
+    )
+
+
+def drop_user_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS core_user_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("core", "0003_location_keys"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_user_fts, drop_user_fts),
+    ]
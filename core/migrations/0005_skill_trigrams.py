@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+import re
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def word_trigrams(text):
+    grams = set()
+    for word in WORD_RE.findall((text or "").casefold()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def fill_skill_trigrams(apps, schema_editor):
+    Skill = apps.get_model("core", "Skill")
+    SkillTrigram = apps.get_model("core", "SkillTrigram")
+
+    batch = []
+    for pk, title, description in Skill.objects.values_list(
+        "pk", "title", "description"
+    ).iterator():
+        weights = dict.fromkeys(word_trigrams(description), 1)
+        weights.update(dict.fromkeys(word_trigrams(title), 2))
+        for gram, weight in weights.items():
+            batch.append(SkillTrigram(skill_id=pk, trigram=gram, weight=weight))
+    SkillTrigram.objects.bulk_create(batch, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_user_fts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SkillTrigram",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("trigram", models.CharField(max_length=3)),
+                ("weight", models.PositiveSmallIntegerField(default=1)),
+                (
+                    "skill",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trigrams",
+                        to="core.skill",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["trigram", "skill", "weight"],
+                        name="core_skilltrigram_lookup",
+                    )
+                ],
+                "unique_together": {("skill", "trigram")},
+            },
+        ),
+        migrations.RunPython(fill_skill_trigrams, migrations.RunPython.noop),
+    ]
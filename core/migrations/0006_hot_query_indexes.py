@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_skill_trigrams"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["receiver", "-created_at"], name="message_inbox_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                condition=models.Q(("is_read", False)),
+                fields=["receiver", "-created_at"],
+                name="message_unread_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["sender", "-created_at"], name="message_sent_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(fields=["gender", "user"], name="profile_gender_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="rating",
+            index=models.Index(fields=["skill", "rating"], name="rating_skill_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="skill",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["skill_type", "category", "-created_at", "-id"],
+                name="skill_active_type_cat_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="skill",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-created_at", "-id"],
+                name="skill_active_newest_idx",
+            ),
+        ),
+    ]
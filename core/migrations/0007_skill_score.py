@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:20
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+
+def fill_skill_scores(apps, schema_editor):
+    # Same formula as core.ranking.skill_score at the time of this migration
+    Skill = apps.get_model("core", "Skill")
+
+    now = timezone.now()
+    skills = []
+    for skill in Skill.objects.annotate(
+        rating_sum=Sum("ratings__rating"), num_ratings=Count("ratings")
+    ).iterator():
+        rating = (5 * 3.0 + (skill.rating_sum or 0)) / (5 + skill.num_ratings)
+        age_days = max((now - skill.created_at).total_seconds(), 0) / 86400
+        skill.score = 0.7 * rating / 5 + 0.3 * 0.5 ** (age_days / 30.0)
+        skills.append(skill)
+    Skill.objects.bulk_update(skills, ["score"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="skill",
+            name="score",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="skill",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["-score", "-id"],
+                name="skill_active_score_idx",
+            ),
+        ),
+        migrations.RunPython(fill_skill_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:25
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rating_totals(apps, schema_editor):
+    Skill = apps.get_model("core", "Skill")
+
+    skills = []
+    for skill in Skill.objects.annotate(
+        total=Sum("ratings__rating"), count=Count("ratings")
+    ).iterator():
+        skill.rating_sum = skill.total or 0
+        skill.rating_count = skill.count
+        skills.append(skill)
+    Skill.objects.bulk_update(skills, ["rating_sum", "rating_count"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_skill_score"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="skill",
+            name="rating_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="skill",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_rating_totals, migrations.RunPython.noop),
+    ]
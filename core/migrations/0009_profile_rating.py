@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:32
+
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def fill_profile_ratings(apps, schema_editor):
+    Profile = apps.get_model("core", "Profile")
+
+    counted = Q(user__skills__is_active=True, user__skills__skill_type="offer")
+    profiles = []
+    for profile in Profile.objects.annotate(
+        total=Sum("user__skills__rating_sum", filter=counted),
+        count=Sum("user__skills__rating_count", filter=counted),
+    ).iterator():
+        profile.rating_sum = profile.total or 0
+        profile.total_ratings = profile.count or 0
+        if profile.total_ratings:
+            profile.overall_rating = profile.rating_sum / profile.total_ratings
+        profiles.append(profile)
+    Profile.objects.bulk_update(
+        profiles, ["rating_sum", "total_ratings", "overall_rating"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_skill_rating_totals"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="overall_rating",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="total_ratings",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                condition=models.Q(("total_ratings__gt", 0)),
+                fields=["-overall_rating", "-user"],
+                name="profile_top_rated_idx",
+            ),
+        ),
+        migrations.RunPython(fill_profile_ratings, migrations.RunPython.noop),
+    ]
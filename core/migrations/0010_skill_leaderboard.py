@@ -0,0 +1,103 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_leaderboards(apps, schema_editor):
+    # Same ranking as core.leaderboard at the time of this migration: the top
+    # 10 active, rated skills per (category, type) by Bayesian rating
+    Skill = apps.get_model("core", "Skill")
+    LeaderboardEntry = apps.get_model("core", "LeaderboardEntry")
+
+    boards = {}
+    for skill in Skill.objects.filter(is_active=True, rating_count__gte=1).only(
+        "id", "category", "skill_type", "rating_sum", "rating_count"
+    ):
+        skill.weighted = (5 * 3.0 + skill.rating_sum) / (5 + skill.rating_count)
+        boards.setdefault((skill.category, skill.skill_type), []).append(skill)
+    entries = []
+    for (category, skill_type), skills in boards.items():
+        skills.sort(
+            key=lambda skill: (skill.weighted, skill.rating_count, skill.id),
+            reverse=True,
+        )
+        for rank, skill in enumerate(skills[:10], start=1):
+            entries.append(
+                LeaderboardEntry(
+                    category=category,
+                    skill_type=skill_type,
+                    rank=rank,
+                    skill_id=skill.id,
+                    weighted_rating=skill.weighted,
+                )
+            )
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_profile_rating"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("technology", "IT, Programming & Tech"),
+                            ("languages", "Languages"),
+                            ("music", "Music & Arts"),
+                            ("sports", "Sports & Fitness"),
+                            ("cooking", "Cooking & Food"),
+                            ("crafts", "Crafts & DIY"),
+                            ("academic", "Academic & Education"),
+                            ("business", "Business & Finance"),
+                            ("health", "Health & Wellness"),
+                            ("fashion", "Fashion & Beauty"),
+                            ("other", "Other"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "skill_type",
+                    models.CharField(
+                        choices=[
+                            ("offer", "Skill Offered"),
+                            ("request", "Skill Requested"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("weighted_rating", models.FloatField()),
+                (
+                    "skill",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_entries",
+                        to="core.skill",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["category", "skill_type", "rank"],
+                "unique_together": {("category", "skill_type", "rank")},
+            },
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:46
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_star_counts(apps, schema_editor):
+    Skill = apps.get_model("core", "Skill")
+
+    stars = range(1, 6)
+    skills = []
+    for skill in Skill.objects.annotate(
+        **{
+            f"count_{star}": Count("ratings", filter=Q(ratings__rating=star))
+            for star in stars
+        }
+    ).iterator():
+        for star in stars:
+            setattr(skill, f"ratings_{star}", getattr(skill, f"count_{star}"))
+        skills.append(skill)
+    Skill.objects.bulk_update(
+        skills, [f"ratings_{star}" for star in stars], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_skill_leaderboard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="skill",
+            name="ratings_1",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="skill",
+            name="ratings_2",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="skill",
+            name="ratings_3",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="skill",
+            name="ratings_4",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="skill",
+            name="ratings_5",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_star_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:16
+
+from django.db import migrations, models
+
+
+def fill_completion(apps, schema_editor):
+    Profile = apps.get_model("core", "Profile")
+
+    # Same rules as Profile.compute_completion
+    profiles = []
+    for profile in Profile.objects.select_related("user").iterator():
+        user = profile.user
+        has_skills = bool(
+            profile.skills_offered.strip() or profile.skills_needed.strip()
+        )
+        filled = [
+            user.first_name,
+            user.last_name,
+            profile.bio.strip(),
+            profile.skills_offered.strip(),
+            profile.skills_needed.strip(),
+            profile.city,
+            profile.country,
+            profile.profile_picture,
+        ]
+        profile.completion_percentage = round(
+            sum(1 for value in filled if value) / len(filled) * 100
+        )
+        profile.is_profile_complete = bool(
+            user.first_name
+            and user.last_name
+            and profile.city
+            and profile.country
+            and has_skills
+        )
+        profiles.append(profile)
+    Profile.objects.bulk_update(
+        profiles, ["completion_percentage", "is_profile_complete"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_skill_rating_histogram"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="completion_percentage",
+            field=models.PositiveSmallIntegerField(
+                db_index=True, default=0, editable=False
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="is_profile_complete",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="profile",
+            index=models.Index(
+                fields=["is_profile_complete", "user"], name="profile_complete_idx"
+            ),
+        ),
+        migrations.RunPython(fill_completion, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:25
+
+from django.db import migrations, models
+
+# Same as Profile.CARD_SKILLS / Profile.summarize_skills
+CARD_SKILLS = {"offered": 3, "needed": 2}
+
+
+def fill_skills_summary(apps, schema_editor):
+    Profile = apps.get_model("core", "Profile")
+
+    profiles = []
+    for profile in Profile.objects.only("skills_offered", "skills_needed").iterator():
+        summary = {}
+        for kind, text in (
+            ("offered", profile.skills_offered),
+            ("needed", profile.skills_needed),
+        ):
+            titles = [title.strip() for title in text.split(",") if title.strip()]
+            if titles:
+                shown = CARD_SKILLS[kind]
+                summary[kind] = titles[:shown]
+                summary[f"{kind}_count"] = len(titles)
+                summary[f"{kind}_more"] = max(len(titles) - shown, 0)
+        profile.skills_summary = summary
+        profiles.append(profile)
+    Profile.objects.bulk_update(profiles, ["skills_summary"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_profile_completion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="skills_summary",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.RunPython(fill_skills_summary, migrations.RunPython.noop),
+    ]
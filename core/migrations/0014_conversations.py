@@ -0,0 +1,172 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def fill_conversations(apps, schema_editor):
+    """One thread per user pair and skill, as Conversation.between() keys them"""
+    Conversation = apps.get_model("core", "Conversation")
+    Message = apps.get_model("core", "Message")
+
+    threads = {}
+    message_ids = {}
+    rows = Message.objects.order_by("created_at", "id").values_list(
+        "pk", "sender_id", "receiver_id", "skill_id", "created_at", "is_read"
+    )
+    for pk, sender_id, receiver_id, skill_id, created_at, is_read in rows.iterator():
+        first, second = sorted((sender_id, receiver_id))
+        key = (first, second, skill_id)
+        conversation = threads.get(key)
+        if conversation is None:
+            conversation = threads[key] = Conversation(
+                first_user_id=first, second_user_id=second, skill_id=skill_id
+            )
+            message_ids[key] = []
+        conversation.last_message_id = pk
+        conversation.last_message_at = created_at
+        if not is_read:
+            if receiver_id < sender_id:
+                conversation.first_unread += 1
+            else:
+                conversation.second_unread += 1
+        message_ids[key].append(pk)
+    for key, conversation in threads.items():
+        conversation.save()
+        ids = message_ids[key]
+        for start in range(0, len(ids), 500):
+            Message.objects.filter(pk__in=ids[start : start + 500]).update(
+                conversation=conversation
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0013_profile_skills_summary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Conversation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "last_message_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, editable=False
+                    ),
+                ),
+                (
+                    "first_unread",
+                    models.PositiveIntegerField(default=0, editable=False),
+                ),
+                (
+                    "second_unread",
+                    models.PositiveIntegerField(default=0, editable=False),
+                ),
+            ],
+            options={
+                "ordering": ["-last_message_at", "-id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="first_user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="last_message",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="core.message",
+            ),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="second_user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="conversation",
+            name="skill",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="conversations",
+                to="core.skill",
+            ),
+        ),
+        migrations.AddField(
+            model_name="message",
+            name="conversation",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="messages",
+                to="core.conversation",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["conversation", "created_at"], name="message_thread_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="conversation",
+            index=models.Index(
+                fields=["first_user", "-last_message_at"], name="conversation_first_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="conversation",
+            index=models.Index(
+                fields=["second_user", "-last_message_at"],
+                name="conversation_second_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="conversation",
+            constraint=models.UniqueConstraint(
+                fields=("first_user", "second_user", "skill"),
+                name="conversation_skill_uniq",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="conversation",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("skill__isnull", True)),
+                fields=("first_user", "second_user"),
+                name="conversation_direct_uniq",
+            ),
+        ),
+        migrations.RunPython(fill_conversations, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,39 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.urls import reverse
-from django.db.models import Avg
+from django.utils import timezone
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FloatField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce
+
+from .autocomplete import LOCATIONS, SKILL_TITLES
+from .search import (
+    SKILL_INDEX,
+    USER_INDEX,
+    normalize_location,
+    profile_skills_text,
+    sync_skill_trigrams,
+)
+from .leaderboard import (
+    leave_other_leaderboards,
+    refill_leaderboard,
+    update_skill_leaderboard,
+)
+from .ranking import refresh_skill_score, skill_score
+from .search_cache import bump_generation
+from .skill_summary import schedule_skill_summary
+from .unread import forget_unread_counts, shift_unread_count
 
 
 class Profile(models.Model):
@@ -24,22 +54,128 @@ class Profile(models.Model):
     city = models.CharField(max_length=100, blank=True)
     country = models.CharField(max_length=100, blank=True)
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES, blank=True)
+    # Case-folded copies of city/country for indexed exact and prefix lookups
+    city_key = models.CharField(
+        max_length=100, blank=True, editable=False, db_index=True
+    )
+    country_key = models.CharField(
+        max_length=100, blank=True, editable=False, db_index=True
+    )
+    # Totals over the ratings of the user's active offered skills, kept in
+    # step by the Rating and Skill signals with F() updates
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    total_ratings = models.PositiveIntegerField(default=0, editable=False)
+    overall_rating = models.FloatField(default=0, editable=False)
+    # Stored by save() from the profile and user fields, so completeness
+    # filters and sorting are plain WHERE/ORDER BY clauses
+    completion_percentage = models.PositiveSmallIntegerField(
+        default=0, editable=False, db_index=True
+    )
+    is_profile_complete = models.BooleanField(default=False, editable=False)
+
+    # Profile fields that feed the stored completion columns
+    COMPLETION_INPUTS = (
+        "bio",
+        "skills_offered",
+        "skills_needed",
+        "city",
+        "country",
+        "profile_picture",
+    )
+    COMPLETION_FIELDS = ("completion_percentage", "is_profile_complete")
+    # Directory card skill tags, derived from skills_offered/skills_needed on
+    # save so cards render without splitting the text per card
+    skills_summary = models.JSONField(default=dict, editable=False)
+
+    # Titles shown per directory card; the rest are counted as "+N more"
+    CARD_SKILLS = {"offered": 3, "needed": 2}
+
+    # Same protection as Skill.DENORMALIZED_FIELDS: a User save re-saves a
+    # profile it loaded, often before the latest rating
+    DENORMALIZED_FIELDS = ("rating_sum", "total_ratings", "overall_rating")
+
+    class Meta:
+        indexes = [
+            # User directory gender filter, joined back to auth_user
+            models.Index(fields=["gender", "user"], name="profile_gender_idx"),
+            # "Complete profiles only" directory filter and cleanup_profiles
+            models.Index(
+                fields=["is_profile_complete", "user"],
+                name="profile_complete_idx",
+            ),
+            # "Top rated" directory sort; unrated people are never listed
+            models.Index(
+                fields=["-overall_rating", "-user"],
+                condition=models.Q(total_ratings__gt=0),
+                name="profile_top_rated_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s profile"
 
-    @property
-    def is_profile_complete(self):
+    def save(self, *args, **kwargs):
+        self.city_key = normalize_location(self.city)
+        self.country_key = normalize_location(self.country)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(self.COMPLETION_INPUTS) & set(update_fields):
+            self.refresh_completion()
+            if update_fields is not None:
+                update_fields = {*update_fields, *self.COMPLETION_FIELDS}
+                kwargs["update_fields"] = update_fields
+        if update_fields is None or {"skills_offered", "skills_needed"} & set(
+            update_fields
+        ):
+            self.skills_summary = self.summarize_skills(
+                self.skills_offered, self.skills_needed
+            )
+            if update_fields is not None:
+                update_fields = {*update_fields, "skills_summary"}
+                kwargs["update_fields"] = update_fields
+        if update_fields is not None and {"city", "country"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "city_key", "country_key"}
+        elif update_fields is None and not self._state.adding and not args:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DENORMALIZED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def summarize_skills(cls, skills_offered, skills_needed):
+        """
+        The directory card summary: per kind, the first titles, the total
+        count and how many are left over. Kinds without skills are omitted.
+        """
+        summary = {}
+        for kind, text in (("offered", skills_offered), ("needed", skills_needed)):
+            titles = [title.strip() for title in text.split(",") if title.strip()]
+            if titles:
+                shown = cls.CARD_SKILLS[kind]
+                summary[kind] = titles[:shown]
+                summary[f"{kind}_count"] = len(titles)
+                summary[f"{kind}_more"] = max(len(titles) - shown, 0)
+        return summary
+
+    def compute_completion(self):
+        """(completion_percentage, is_profile_complete) for the current fields"""
         required_user_fields = bool(self.user.first_name and self.user.last_name)
         required_profile_fields = bool(
             self.city
             and self.country
             and (self.skills_offered.strip() or self.skills_needed.strip())
         )
-        return required_user_fields and required_profile_fields
+        return (
+            self._completion_percentage(),
+            required_user_fields and required_profile_fields,
+        )
 
-    @property
-    def completion_percentage(self):
+    def refresh_completion(self):
+        """Recompute the stored completion columns (without saving)"""
+        self.completion_percentage, self.is_profile_complete = self.compute_completion()
+
+    def _completion_percentage(self):
         total_fields = 8
         completed_fields = 0
         if self.user.first_name:
@@ -119,16 +255,23 @@ class Profile(models.Model):
         self.skills_needed = ", ".join(needed_skills)
         self.save(update_fields=["skills_offered", "skills_needed"])
 
-    @property
-    def overall_rating(self):
-        """Calculate median rating across all user's offered skills"""
-        from django.db.models import Avg
 
-        user_skill_ratings = Rating.objects.filter(
-            skill__user=self.user, skill__skill_type="offer", skill__is_active=True
-        ).aggregate(avg_rating=Avg("rating"))
+class SkillQuerySet(models.QuerySet):
+    def with_ratings(self):
+        """
+        Annotate rating_average in the same SELECT as the skills.
 
-        return user_skill_ratings["avg_rating"] or 0.0
+        The average is derived from the stored rating totals, so list pages
+        neither join Rating nor query it per card; average_rating and
+        rating_count read the annotation and the stored count.
+        """
+        return self.annotate(
+            rating_average=Case(
+                When(rating_count=0, then=Value(0.0)),
+                default=Cast("rating_sum", FloatField()) / F("rating_count"),
+                output_field=FloatField(),
+            )
+        )
 
 
 class Skill(models.Model):
@@ -179,6 +322,9 @@ class Skill(models.Model):
     location = models.CharField(
         max_length=200, blank=True, help_text="Where can this skill be taught/learned?"
     )
+    location_key = models.CharField(
+        max_length=200, blank=True, editable=False, db_index=True
+    )
     availability = models.CharField(
         max_length=200, blank=True, help_text="When are you available?"
     )
@@ -188,13 +334,97 @@ class Skill(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Rating totals, kept in step by the Rating signals with F() updates
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    # How many ratings gave 1 to 5 stars, for the rating histogram
+    ratings_1 = models.PositiveIntegerField(default=0, editable=False)
+    ratings_2 = models.PositiveIntegerField(default=0, editable=False)
+    ratings_3 = models.PositiveIntegerField(default=0, editable=False)
+    ratings_4 = models.PositiveIntegerField(default=0, editable=False)
+    ratings_5 = models.PositiveIntegerField(default=0, editable=False)
+    # Precomputed rating + recency part of the "best match" ranking
+    score = models.FloatField(default=0, editable=False)
+
+    objects = SkillQuerySet.as_manager()
+
+    # Columns only ever written by targeted UPDATEs; a whole-object save
+    # leaves them alone so a stale instance can't overwrite newer totals
+    DENORMALIZED_FIELDS = (
+        "rating_sum",
+        "rating_count",
+        "ratings_1",
+        "ratings_2",
+        "ratings_3",
+        "ratings_4",
+        "ratings_5",
+        "score",
+    )
+    STARS = range(1, 6)
 
     class Meta:
         ordering = ["-created_at"]
+        # Only active skills are ever listed, so the listing indexes are
+        # partial on is_active; that also lets SQLite use them for the bare
+        # boolean filter, which a leading is_active column would not.
+        indexes = [
+            models.Index(
+                fields=["skill_type", "category", "-created_at", "-id"],
+                condition=models.Q(is_active=True),
+                name="skill_active_type_cat_idx",
+            ),
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(is_active=True),
+                name="skill_active_newest_idx",
+            ),
+            models.Index(
+                fields=["-score", "-id"],
+                condition=models.Q(is_active=True),
+                name="skill_active_score_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.get_skill_type_display()}: {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Whose profile rating currently includes this skill's ratings
+        if {"user_id", "is_active", "skill_type"} <= instance.__dict__.keys():
+            instance._rating_owner = instance.profile_rating_owner
+        # Which leaderboard the skill is on, if any
+        if {"category", "skill_type", "is_active"} <= instance.__dict__.keys():
+            instance._leaderboard_state = instance.leaderboard_state
+        return instance
+
+    @property
+    def leaderboard_state(self):
+        return (self.category, self.skill_type, self.is_active)
+
+    @property
+    def profile_rating_owner(self):
+        """The user whose overall rating counts this skill, if any"""
+        if self.is_active and self.skill_type == "offer":
+            return self.user_id
+        return None
+
+    def save(self, *args, **kwargs):
+        self.location_key = normalize_location(self.location)
+        if self._state.adding:
+            self.score = skill_score(0, 0, self.created_at or timezone.now())
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "location" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "location_key"}
+        elif update_fields is None and not self._state.adding and not args:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DENORMALIZED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse("skill_detail_page", kwargs={"pk": self.pk})
 
@@ -204,17 +434,73 @@ class Skill(models.Model):
 
     @property
     def average_rating(self):
-        avg = self.ratings.aggregate(avg_rating=Avg("rating"))["avg_rating"]
-        return round(avg, 1) if avg else 0.0
-
-    @property
-    def rating_count(self):
-        return self.ratings.count()
+        # Set by Skill.objects.with_ratings()
+        if "rating_average" in self.__dict__:
+            return round(self.rating_average, 1)
+        if not self.rating_count:
+            return 0.0
+        return round(self.rating_sum / self.rating_count, 1)
 
     @property
     def star_range(self):
         return range(1, 6)
 
+    @staticmethod
+    def star_field(star):
+        """The counter column for ratings of star stars"""
+        return f"ratings_{star}"
+
+    @property
+    def rating_histogram(self):
+        """(stars, count, percent of all ratings) rows, 5 stars first"""
+        rows = []
+        for star in reversed(self.STARS):
+            count = getattr(self, self.star_field(star))
+            percent = round(100 * count / self.rating_count) if self.rating_count else 0
+            rows.append((star, count, percent))
+        return rows
+
+
+class SkillTrigram(models.Model):
+    """One distinct trigram of a skill's title/description, for fuzzy search"""
+
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="trigrams")
+    trigram = models.CharField(max_length=3)
+    # 2 when the trigram occurs in the title, 1 when only in the description
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        unique_together = ("skill", "trigram")
+        indexes = [
+            # Covers the fuzzy search aggregate without touching the table
+            models.Index(
+                fields=["trigram", "skill", "weight"], name="core_skilltrigram_lookup"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.trigram!r} in skill {self.skill_id}"
+
+
+class LeaderboardEntry(models.Model):
+    """One place on a precomputed top rated board, see core.leaderboard"""
+
+    category = models.CharField(max_length=20, choices=Skill.SKILL_CATEGORIES)
+    skill_type = models.CharField(max_length=10, choices=Skill.SKILL_TYPES)
+    rank = models.PositiveSmallIntegerField()
+    skill = models.ForeignKey(
+        Skill, on_delete=models.CASCADE, related_name="leaderboard_entries"
+    )
+    weighted_rating = models.FloatField()
+
+    class Meta:
+        ordering = ["category", "skill_type", "rank"]
+        # Also the index the leaderboard page reads a board through
+        unique_together = ("category", "skill_type", "rank")
+
+    def __str__(self):
+        return f"#{self.rank} {self.category}/{self.skill_type}: skill {self.skill_id}"
+
 
 class Rating(models.Model):
     skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="ratings")
@@ -228,10 +514,231 @@ class Rating(models.Model):
     class Meta:
         unique_together = ("skill", "user")
         ordering = ["-created_at"]
+        indexes = [
+            # Per-skill averages and counts are read from the index alone
+            models.Index(fields=["skill", "rating"], name="rating_skill_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} rated {self.skill.title}: {self.rating}/5"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the skill totals currently include for this rating
+        instance._counted = (
+            instance.__dict__.get("skill_id"),
+            instance.__dict__.get("rating"),
+        )
+        return instance
+
+
+class ConversationQuerySet(models.QuerySet):
+    def involving(self, user):
+        """Threads the user takes part in, on either side"""
+        return self.filter(models.Q(first_user=user) | models.Q(second_user=user))
+
+    def visible_to(self, user):
+        """The user's threads with messages newer than their last delete"""
+        return self.filter(
+            models.Q(first_user=user)
+            & (
+                models.Q(first_deleted_at__isnull=True)
+                | models.Q(last_message_at__gt=F("first_deleted_at"))
+            )
+            | models.Q(second_user=user)
+            & (
+                models.Q(second_deleted_at__isnull=True)
+                | models.Q(last_message_at__gt=F("second_deleted_at"))
+            )
+        )
+
+    def unread_total(self, user):
+        """How many messages the user has not read, summed over their threads"""
+        totals = self.involving(user).aggregate(
+            first=Sum("first_unread", filter=models.Q(first_user=user)),
+            second=Sum("second_unread", filter=models.Q(second_user=user)),
+        )
+        return (totals["first"] or 0) + (totals["second"] or 0)
+
+    def recounted(self):
+        """
+        Annotate recounted_<field> for each Conversation.RECOUNTED_FIELDS
+        column: its value computed from the thread's messages. A thread with
+        no messages gets a NULL recounted_last_message_id.
+        """
+        thread = Message.objects.filter(conversation=OuterRef("pk"))
+        newest = thread.order_by("-created_at", "-id")
+
+        def unread(receiver):
+            return Coalesce(
+                Subquery(
+                    thread.filter(is_read=False, receiver=OuterRef(receiver))
+                    .order_by()
+                    .values("conversation")
+                    .annotate(unread=Count("id"))
+                    .values("unread")
+                ),
+                0,
+            )
+
+        return self.annotate(
+            recounted_last_message_id=Subquery(newest.values("pk")[:1]),
+            recounted_last_message_at=Subquery(newest.values("created_at")[:1]),
+            # A thread with oneself counts its unread on the second side only
+            recounted_first_unread=Case(
+                When(first_user=F("second_user"), then=Value(0)),
+                default=unread("first_user"),
+            ),
+            recounted_second_unread=unread("second_user"),
+        )
+
+
+class Conversation(models.Model):
+    """
+    The message thread between two users, optionally about one skill.
+
+    Participants are stored lowest user id first so each pair (and skill) has
+    one row. The Message signals keep the newest message pointer and each
+    participant's unread counter up to date, so the inbox lists threads
+    without reading their messages.
+
+    Deleting a thread is per participant: it hides the thread's messages up to
+    then from that user only (a newer message brings the thread back), and
+    the row and its messages go once both sides have deleted everything.
+    """
+
+    first_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    second_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    skill = models.ForeignKey(
+        Skill,
+        on_delete=models.CASCADE,
+        related_name="conversations",
+        null=True,
+        blank=True,
+    )
+    # No constraint or cascade, so messages can be bulk deleted in one
+    # statement; every path that deletes messages repoints or drops the thread
+    last_message = models.ForeignKey(
+        "Message",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    last_message_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Messages the first/second user received in this thread and hasn't read
+    first_unread = models.PositiveIntegerField(default=0, editable=False)
+    second_unread = models.PositiveIntegerField(default=0, editable=False)
+    # When the first/second user last deleted the thread
+    first_deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    second_deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Maintained by the Message signals; recount_conversation() rebuilds them
+    RECOUNTED_FIELDS = (
+        "last_message_id",
+        "last_message_at",
+        "first_unread",
+        "second_unread",
+    )
+
+    objects = ConversationQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-last_message_at", "-id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["first_user", "second_user", "skill"],
+                name="conversation_skill_uniq",
+            ),
+            # NULLs never collide in a unique index, so direct threads need
+            # their own constraint
+            models.UniqueConstraint(
+                fields=["first_user", "second_user"],
+                condition=models.Q(skill__isnull=True),
+                name="conversation_direct_uniq",
+            ),
+        ]
+        indexes = [
+            # The inbox reads both sides of the OR through these
+            models.Index(
+                fields=["first_user", "-last_message_at"],
+                name="conversation_first_idx",
+            ),
+            models.Index(
+                fields=["second_user", "-last_message_at"],
+                name="conversation_second_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"Conversation between users {self.first_user_id} and {self.second_user_id}"
+        )
+
+    @classmethod
+    def between(cls, user_id, other_id, skill_id=None):
+        """The thread of two users (about a skill), created on first use"""
+        first, second = sorted((user_id, other_id))
+        conversation, _ = cls.objects.get_or_create(
+            first_user_id=first, second_user_id=second, skill_id=skill_id
+        )
+        return conversation
+
+    @staticmethod
+    def unread_field(user_id, other_id):
+        """The counter of user_id's unread messages in a thread with other_id"""
+        return "first_unread" if user_id < other_id else "second_unread"
+
+    def other_user(self, user):
+        return self.second_user if user.pk == self.first_user_id else self.first_user
+
+    def unread_field_for(self, user):
+        if user.pk == self.second_user_id:
+            return self.unread_field(user.pk, self.first_user_id)
+        return self.unread_field(user.pk, self.second_user_id)
+
+    def unread_for(self, user):
+        return getattr(self, self.unread_field_for(user))
+
+    def deleted_at_for(self, user):
+        if user.pk == self.first_user_id:
+            return self.first_deleted_at
+        return self.second_deleted_at
+
+
+class MessageQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Messages the user takes part in and hasn't deleted with the thread"""
+        return self.filter(
+            models.Q(conversation__first_user=user)
+            & (
+                models.Q(conversation__first_deleted_at__isnull=True)
+                | models.Q(created_at__gt=F("conversation__first_deleted_at"))
+            )
+            | models.Q(conversation__second_user=user)
+            & (
+                models.Q(conversation__second_deleted_at__isnull=True)
+                | models.Q(created_at__gt=F("conversation__second_deleted_at"))
+            )
+        )
+
+    def delete(self):
+        """Delete the messages and recount the threads they leave behind"""
+        with transaction.atomic():
+            conversation_ids = set(
+                self.order_by().values_list("conversation_id", flat=True)
+            )
+            result = super().delete()
+            for conversation_id in conversation_ids - {None}:
+                recount_conversation(conversation_id)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 
 class Message(models.Model):
     sender = models.ForeignKey(
@@ -243,33 +750,558 @@ class Message(models.Model):
     skill = models.ForeignKey(
         Skill, on_delete=models.CASCADE, related_name="messages", null=True, blank=True
     )
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.CASCADE,
+        related_name="messages",
+        null=True,
+        blank=True,
+        editable=False,
+    )
     subject = models.CharField(max_length=200)
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
+    objects = MessageQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["receiver", "-created_at"], name="message_inbox_idx"),
+            # Unread counts and listings; partial for the same reason as Skill
+            models.Index(
+                fields=["receiver", "-created_at"],
+                condition=models.Q(is_read=False),
+                name="message_unread_idx",
+            ),
+            models.Index(fields=["sender", "-created_at"], name="message_sent_idx"),
+            models.Index(
+                fields=["conversation", "created_at"], name="message_thread_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Message from {self.sender.username} to {self.receiver.username}: {self.subject[:50]}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the thread's unread counter currently includes for this message
+        if "is_read" in instance.__dict__:
+            instance._counted = (
+                instance.__dict__.get("conversation_id"),
+                not instance.is_read,
+            )
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.conversation_id is None:
+            self.conversation = Conversation.between(
+                self.sender_id, self.receiver_id, self.skill_id
+            )
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        # Recounted here rather than from post_delete, whose receivers would
+        # stop the cascades from deleting messages in bulk
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            if self.conversation_id is not None:
+                recount_conversation(self.conversation_id)
+        return result
+
+    def hidden_for(self, user):
+        """Whether the user deleted this message along with its thread"""
+        if self.conversation is None:
+            return False
+        deleted_at = self.conversation.deleted_at_for(user)
+        return deleted_at is not None and self.created_at <= deleted_at
+
 
 @receiver(post_save, sender=User)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
+def create_or_update_user_profile(
+    sender, instance, created, update_fields=None, **kwargs
+):
     if created:
         Profile.objects.create(user=instance)
-    instance.profile.save()
+    elif update_fields is None and User.profile.is_cached(instance):
+        # A profile the caller loaded (and may have edited) is saved along
+        # with the user, which also recomputes its completion
+        instance.profile.save()
+    elif update_fields is None or {"first_name", "last_name"} & set(update_fields):
+        # Names count towards completion; partial saves such as last_login
+        # on every login never touch the profile
+        refresh_profile_completion(instance)
+
+
+def refresh_profile_completion(user):
+    """Rewrite a user's stored profile completion if their names changed it"""
+    # Joined rather than assigned so user.profile isn't cached as a side effect
+    profile = Profile.objects.select_related("user").filter(user=user).first()
+    if profile is None:
+        return
+    stored = (profile.completion_percentage, profile.is_profile_complete)
+    profile.refresh_completion()
+    if (profile.completion_percentage, profile.is_profile_complete) != stored:
+        profile.save(update_fields=Profile.COMPLETION_FIELDS)
 
 
 @receiver(post_save, sender=Skill)
-def update_profile_skills_on_save(sender, instance, **kwargs):
-    instance.user.profile.update_skills_from_skill_objects()
+@receiver(models.signals.post_delete, sender=Skill)
+def update_profile_skills(sender, instance, **kwargs):
+    # Coalesced: one rebuild per user when the transaction commits
+    schedule_skill_summary(instance.user_id)
+
+
+@receiver(post_save, sender=Skill)
+def update_search_index_on_save(sender, instance, **kwargs):
+    SKILL_INDEX.index(
+        instance.pk, {"title": instance.title, "description": instance.description}
+    )
+
+
+@receiver(post_save, sender=Skill)
+def update_trigram_index_on_save(
+    sender, instance, created, update_fields=None, **kwargs
+):
+    if update_fields is not None and not {"title", "description"} & set(update_fields):
+        return
+    sync_skill_trigrams(instance, created=created)
+
+
+@receiver(models.signals.post_delete, sender=Skill)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    SKILL_INDEX.remove(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def update_user_index_on_save(sender, instance, update_fields=None, **kwargs):
+    # Logins save only last_login; skip saves that can't change indexed text
+    if update_fields is not None and not {
+        "username",
+        "first_name",
+        "last_name",
+    } & set(update_fields):
+        return
+    USER_INDEX.update(
+        instance.pk,
+        {
+            "username": instance.username,
+            "first_name": instance.first_name,
+            "last_name": instance.last_name,
+        },
+    )
+
+
+@receiver(post_save, sender=Profile)
+def update_user_index_on_profile_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {"skills_offered", "skills_needed"} & set(
+        update_fields
+    ):
+        return
+    USER_INDEX.update(instance.user_id, {"skills": profile_skills_text(instance)})
+
+
+@receiver(models.signals.post_delete, sender=User)
+def update_user_index_on_delete(sender, instance, **kwargs):
+    USER_INDEX.remove(instance.pk)
+
+
+@receiver(post_save, sender=Skill)
+def update_autocomplete_on_skill_save(sender, instance, **kwargs):
+    pk = instance.pk
+    values = (instance.title,) if instance.is_active else ()
+    transaction.on_commit(lambda: SKILL_TITLES.set_row(pk, values))
 
 
 @receiver(models.signals.post_delete, sender=Skill)
-def update_profile_skills_on_delete(sender, instance, **kwargs):
-    try:
-        instance.user.profile.update_skills_from_skill_objects()
-    except Profile.DoesNotExist:
+def update_autocomplete_on_skill_delete(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: SKILL_TITLES.remove_row(pk))
+
+
+@receiver(post_save, sender=Profile)
+def update_autocomplete_on_profile_save(sender, instance, **kwargs):
+    pk = instance.pk
+    values = (instance.city, instance.country)
+    transaction.on_commit(lambda: LOCATIONS.set_row(pk, values))
+
+
+@receiver(models.signals.post_delete, sender=Profile)
+def update_autocomplete_on_profile_delete(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: LOCATIONS.remove_row(pk))
+
+
+def _profile_rating_changes(rating_delta, count_delta):
+    """UPDATE assignments shifting a profile's rating totals and average"""
+    total = F("total_ratings") + count_delta
+    return {
+        "rating_sum": F("rating_sum") + rating_delta,
+        "total_ratings": total,
+        # Right-hand sides see the old row, so this is the new average
+        "overall_rating": Case(
+            When(
+                total_ratings__gt=-count_delta,
+                then=Cast(F("rating_sum") + rating_delta, FloatField()) / total,
+            ),
+            default=Value(0.0),
+        ),
+    }
+
+
+def _shift_loaded_profile(profile, rating_delta, count_delta):
+    profile.rating_sum += rating_delta
+    profile.total_ratings += count_delta
+    if profile.total_ratings:
+        profile.overall_rating = profile.rating_sum / profile.total_ratings
+    else:
+        profile.overall_rating = 0.0
+
+
+def _loaded_profile(skill):
+    if skill is None or not Skill.user.is_cached(skill):
+        return None
+    user = skill.user
+    return user.profile if User.profile.is_cached(user) else None
+
+
+def add_to_profile_rating(user_id, rating_delta, count_delta):
+    """Shift a user's stored overall rating totals"""
+    Profile.objects.filter(user_id=user_id).update(
+        **_profile_rating_changes(rating_delta, count_delta)
+    )
+
+
+def recount_profile_rating(user_id):
+    """Recompute a user's stored overall rating from their skills' totals"""
+    totals = Skill.objects.filter(
+        user_id=user_id, is_active=True, skill_type="offer"
+    ).aggregate(
+        rating_sum=Coalesce(Sum("rating_sum"), 0),
+        total_ratings=Coalesce(Sum("rating_count"), 0),
+    )
+    overall = 0.0
+    if totals["total_ratings"]:
+        overall = totals["rating_sum"] / totals["total_ratings"]
+    Profile.objects.filter(user_id=user_id).update(overall_rating=overall, **totals)
+
+
+def add_to_rating_totals(skill_id, added=None, removed=None, skill=None):
+    """
+    Count one rating value in (added) and/or out (removed) of a skill's stored
+    totals and star counters, and of a loaded copy of the skill if given.
+
+    The owner's profile totals move too while the skill is an active offer.
+    """
+    stars = {}
+    if added is not None:
+        stars[added] = stars.get(added, 0) + 1
+    if removed is not None:
+        stars[removed] = stars.get(removed, 0) - 1
+    rating_delta = (added or 0) - (removed or 0)
+    count_delta = (added is not None) - (removed is not None)
+    changes = {
+        Skill.star_field(star): F(Skill.star_field(star)) + delta
+        for star, delta in stars.items()
+        if delta
+    }
+    Skill.objects.filter(pk=skill_id).update(
+        rating_sum=F("rating_sum") + rating_delta,
+        rating_count=F("rating_count") + count_delta,
+        **changes,
+    )
+    Profile.objects.filter(
+        user__skills__pk=skill_id,
+        user__skills__is_active=True,
+        user__skills__skill_type="offer",
+    ).update(**_profile_rating_changes(rating_delta, count_delta))
+    if skill is not None and skill.pk == skill_id:
+        skill.rating_sum += rating_delta
+        skill.rating_count += count_delta
+        for star, delta in stars.items():
+            field = Skill.star_field(star)
+            setattr(skill, field, getattr(skill, field) + delta)
+        skill.__dict__.pop("rating_average", None)
+        profile = _loaded_profile(skill)
+        if profile is not None and skill.profile_rating_owner is not None:
+            _shift_loaded_profile(profile, rating_delta, count_delta)
+
+
+def recount_rating_totals(skill_id):
+    """Recompute a skill's stored rating totals from its Rating rows"""
+    totals = Rating.objects.filter(skill_id=skill_id).aggregate(
+        rating_sum=Coalesce(Sum("rating"), 0),
+        rating_count=Count("id"),
+        **{
+            Skill.star_field(star): Count("id", filter=models.Q(rating=star))
+            for star in Skill.STARS
+        },
+    )
+    Skill.objects.filter(pk=skill_id).update(**totals)
+    owner_id = (
+        Skill.objects.filter(pk=skill_id).values_list("user_id", flat=True).first()
+    )
+    if owner_id is not None:
+        recount_profile_rating(owner_id)
+
+
+def upsert_rating(skill, user, rating, comment=""):
+    """
+    Create or replace a user's rating of a skill, writing before reading so
+    concurrent submissions queue on the write lock instead of failing.
+
+    An UPDATE of the user's row comes first: it takes the row lock (the
+    database write lock on SQLite) before the previous value is read back,
+    so nothing can change it in between. Without a row, the rating is
+    inserted; an insert that loses a race to a concurrent one updates that
+    row instead. The writes bypass the Rating signals, so the totals are
+    shifted by the difference, as the signals would.
+    """
+    existing = Rating.objects.filter(skill=skill, user=user)
+    with transaction.atomic():
+        for attempt in range(2):
+            if existing.update(comment=comment):
+                previous = existing.values_list("rating", flat=True).get()
+                if previous != rating:
+                    existing.update(rating=rating)
+                break
+            try:
+                with transaction.atomic():
+                    Rating.objects.bulk_create(
+                        [Rating(skill=skill, user=user, rating=rating, comment=comment)]
+                    )
+                previous = None
+                break
+            except IntegrityError:
+                # Inserted concurrently since the UPDATE: replace that row
+                if attempt:
+                    raise
+        if previous != rating:
+            add_to_rating_totals(skill.pk, added=rating, removed=previous)
+            refresh_skill_score(skill.pk)
+            update_skill_leaderboard(skill.pk)
+        transaction.on_commit(bump_generation)
+
+
+def _loaded_skill(rating):
+    return rating.skill if Rating.skill.is_cached(rating) else None
+
+
+@receiver(post_save, sender=Rating)
+def update_rating_totals_on_save(sender, instance, created, **kwargs):
+    counted_skill_id, counted_rating = getattr(instance, "_counted", (None, None))
+    skill = _loaded_skill(instance)
+    if created:
+        add_to_rating_totals(instance.skill_id, added=instance.rating, skill=skill)
+    elif counted_rating is None:
+        # Saved from an instance that wasn't loaded from the database
+        recount_rating_totals(instance.skill_id)
+    elif counted_skill_id != instance.skill_id:
+        add_to_rating_totals(counted_skill_id, removed=counted_rating)
+        add_to_rating_totals(instance.skill_id, added=instance.rating, skill=skill)
+        refresh_skill_score(counted_skill_id)
+    elif counted_rating != instance.rating:
+        add_to_rating_totals(
+            instance.skill_id,
+            added=instance.rating,
+            removed=counted_rating,
+            skill=skill,
+        )
+    instance._counted = (instance.skill_id, instance.rating)
+    refresh_skill_score(instance.skill_id)
+
+
+@receiver(models.signals.post_delete, sender=Rating)
+def update_rating_totals_on_delete(sender, instance, **kwargs):
+    counted_skill_id, counted_rating = getattr(
+        instance, "_counted", (instance.skill_id, instance.rating)
+    )
+    add_to_rating_totals(
+        counted_skill_id, removed=counted_rating, skill=_loaded_skill(instance)
+    )
+    refresh_skill_score(counted_skill_id)
+
+
+@receiver(post_save, sender=Skill)
+def update_profile_rating_on_skill_save(sender, instance, created, **kwargs):
+    owner = instance.profile_rating_owner
+    if created:
+        # A new skill has no ratings to move
         pass
+    elif not hasattr(instance, "_rating_owner"):
+        # Saved from an instance that wasn't fully loaded from the database
+        recount_profile_rating(instance.user_id)
+    elif instance._rating_owner != owner:
+        rating_sum, rating_count = Skill.objects.values_list(
+            "rating_sum", "rating_count"
+        ).get(pk=instance.pk)
+        if rating_count:
+            if instance._rating_owner is not None:
+                add_to_profile_rating(
+                    instance._rating_owner, -rating_sum, -rating_count
+                )
+            if owner is not None:
+                add_to_profile_rating(owner, rating_sum, rating_count)
+    instance._rating_owner = owner
+
+
+@receiver(post_save, sender=Rating)
+def update_leaderboard_on_rating_save(sender, instance, **kwargs):
+    update_skill_leaderboard(instance.skill_id)
+
+
+@receiver(models.signals.post_delete, sender=Rating)
+def update_leaderboard_on_rating_delete(sender, instance, **kwargs):
+    update_skill_leaderboard(instance.skill_id)
+
+
+@receiver(post_save, sender=Skill)
+def update_leaderboard_on_skill_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_leaderboard_state", None)
+    instance._leaderboard_state = instance.leaderboard_state
+    if created or previous == instance.leaderboard_state:
+        # New skills have no ratings; other edits don't move the skill
+        return
+    if previous is None or previous[:2] != instance.leaderboard_state[:2]:
+        leave_other_leaderboards(instance.pk, instance.category, instance.skill_type)
+    update_skill_leaderboard(instance.pk)
+
+
+@receiver(models.signals.post_delete, sender=Skill)
+def update_leaderboard_on_skill_delete(sender, instance, **kwargs):
+    refill_leaderboard(instance.category, instance.skill_type)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(models.signals.post_delete, sender=Skill)
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Rating)
+@receiver(models.signals.post_delete, sender=Rating)
+def invalidate_search_cache(sender, **kwargs):
+    transaction.on_commit(bump_generation)
+
+
+def recount_conversation(conversation_id):
+    """
+    Recompute a thread's last message pointer and unread counters from its
+    messages, deleting the thread once it has none left.
+    """
+    conversation = Conversation.objects.filter(pk=conversation_id).recounted().first()
+    if conversation is None:
+        return
+    forget_unread_counts(conversation.first_user_id, conversation.second_user_id)
+    if conversation.recounted_last_message_id is None:
+        Conversation.objects.filter(pk=conversation_id).delete()
+        return
+    Conversation.objects.filter(pk=conversation_id).update(
+        **{
+            field: getattr(conversation, f"recounted_{field}")
+            for field in Conversation.RECOUNTED_FIELDS
+        }
+    )
+
+
+def shift_unread(message, delta):
+    """Move the receiver's unread counter on the message's thread by delta"""
+    field = Conversation.unread_field(message.receiver_id, message.sender_id)
+    threads = Conversation.objects.filter(pk=message.conversation_id)
+    if delta < 0:
+        threads = threads.filter(**{f"{field}__gte": -delta})
+    if threads.update(**{field: F(field) + delta}):
+        shift_unread_count(message.receiver_id, delta)
+
+
+@receiver(post_save, sender=Message)
+def update_conversation_on_message_save(sender, instance, created, **kwargs):
+    unread = not instance.is_read
+    counted = getattr(instance, "_counted", None)
+    if created:
+        changes = {"last_message": instance, "last_message_at": instance.created_at}
+        if unread:
+            field = Conversation.unread_field(instance.receiver_id, instance.sender_id)
+            changes[field] = F(field) + 1
+            shift_unread_count(instance.receiver_id, 1)
+        Conversation.objects.filter(pk=instance.conversation_id).update(**changes)
+    elif counted == (instance.conversation_id, True) and not unread:
+        # The common case: the receiver opened the message
+        shift_unread(instance, -1)
+    elif counted != (instance.conversation_id, unread):
+        # Unread again, moved, or saved from an instance that wasn't loaded
+        # from the database
+        stale = {instance.conversation_id, counted[0] if counted else None}
+        for conversation_id in stale - {None}:
+            recount_conversation(conversation_id)
+    instance._counted = (instance.conversation_id, unread)
+
+
+@receiver(models.signals.post_delete, sender=Conversation)
+def forget_unread_on_conversation_delete(sender, instance, **kwargs):
+    # Threads go with a deleted user or skill; the other side's total shrinks
+    forget_unread_counts(instance.first_user_id, instance.second_user_id)
+
+
+def mark_conversations_read(user, conversations):
+    """
+    Mark every message the user received in the given threads as read, with
+    one UPDATE of the messages and one of the threads' counters.
+
+    Returns the number of messages marked.
+    """
+    conversations = conversations.involving(user)
+    with transaction.atomic():
+        read = Message.objects.filter(
+            conversation__in=conversations, receiver=user, is_read=False
+        ).update(is_read=True)
+        if read:
+            # Only the user's side; the other participant's unread stays
+            conversations.update(
+                first_unread=Case(
+                    When(first_user=user, then=Value(0)),
+                    default=F("first_unread"),
+                    output_field=models.PositiveIntegerField(),
+                ),
+                second_unread=Case(
+                    When(second_user=user, then=Value(0)),
+                    default=F("second_unread"),
+                    output_field=models.PositiveIntegerField(),
+                ),
+            )
+            shift_unread_count(user.pk, -read)
+    return read
+
+
+def mark_conversation_read(conversation, user):
+    """Mark every message the user received in a thread as read"""
+    mark_conversations_read(user, Conversation.objects.filter(pk=conversation.pk))
+    setattr(conversation, conversation.unread_field_for(user), 0)
+
+
+def delete_conversations(user, conversations):
+    """
+    Delete the given threads for the user only: their messages so far are
+    read and hidden from the user, and the threads both sides have now
+    deleted in full are dropped with their messages.
+
+    Returns the number of threads deleted for the user.
+    """
+    conversations = conversations.involving(user)
+    now = timezone.now()
+    with transaction.atomic():
+        mark_conversations_read(user, conversations)
+        deleted = conversations.update(
+            first_deleted_at=Case(
+                When(first_user=user, then=Value(now)),
+                default=F("first_deleted_at"),
+            ),
+            second_deleted_at=Case(
+                When(second_user=user, then=Value(now)),
+                default=F("second_deleted_at"),
+            ),
+        )
+        conversations.filter(
+            first_deleted_at__gte=F("last_message_at"),
+            second_deleted_at__gte=F("last_message_at"),
+        ).delete()
+    return deleted
@@ -0,0 +1,185 @@
+"""
+Keyset (seek) pagination.
+
+Instead of OFFSET, each page is fetched with a WHERE clause that continues
+after the last row of the previous page, so deep pages cost the same as the
+first one. Pages are addressed by opaque cursors rather than page numbers.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class KeysetPage:
+    """A page of results plus the cursors needed to move to its neighbours"""
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous, count):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def next_cursor(self):
+        if not self.has_next:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], "next", self.count)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], "prev", self.count)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by seeking on its ordering fields.
+
+    ordering must end in a unique field (usually id) and every field must sort
+    in the same direction, e.g. ("-created_at", "-id").
+
+    The total count is optional: with_count=False skips it entirely, otherwise
+    it is computed once for the first page and then carried along inside the
+    cursors, so following pages never run COUNT(*) again.
+    """
+
+    def __init__(
+        self, queryset, per_page, ordering=("-created_at", "-id"), with_count=True
+    ):
+        descending = {field.startswith("-") for field in ordering}
+        if len(descending) != 1:
+            raise ValueError("All keyset ordering fields must share one direction")
+
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip("-") for field in ordering)
+        self.descending = descending.pop()
+        self.with_count = with_count
+
+    def encode_cursor(self, obj, direction, count=None):
+        payload = {
+            "v": [_encode_value(getattr(obj, field)) for field in self.fields],
+            "d": direction,
+        }
+        if count is not None:
+            payload["n"] = count
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """Return (values, direction, count), or None for a missing/invalid cursor"""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            values = payload["v"]
+            direction = payload["d"]
+            count = payload.get("n")
+            if len(values) != len(self.fields) or direction not in ("next", "prev"):
+                return None
+            values = [
+                self._to_python(field, value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            return None
+        if count is not None and not isinstance(count, int):
+            count = None
+        return values, direction, count
+
+    def _to_python(self, field_name, value):
+        try:
+            field = self.queryset.model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+    def _seek_filter(self, values, after):
+        """
+        Build (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ... for the row tuple.
+
+        "after" means further along the ordering, so the comparison flips for
+        descending orderings.
+        """
+        lookup = "lt" if self.descending == after else "gt"
+        condition = Q()
+        for position, field in enumerate(self.fields):
+            clause = Q(**{f"{field}__{lookup}": values[position]})
+            for previous_field, previous_value in zip(
+                self.fields[:position], values[:position]
+            ):
+                clause &= Q(**{previous_field: previous_value})
+            condition |= clause
+        return condition
+
+    def _reversed_ordering(self):
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        )
+
+    def get_page(self, cursor=None):
+        decoded = self.decode_cursor(cursor)
+        count = None
+
+        if decoded is None:
+            rows = list(self.queryset.order_by(*self.ordering)[: self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            has_previous = False
+            rows = rows[: self.per_page]
+            if self.with_count:
+                count = len(rows) if not has_next else self.queryset.order_by().count()
+        else:
+            values, direction, count = decoded
+            if direction == "next":
+                rows = list(
+                    self.queryset.filter(
+                        self._seek_filter(values, after=True)
+                    ).order_by(*self.ordering)[: self.per_page + 1]
+                )
+                has_next = len(rows) > self.per_page
+                has_previous = True
+                rows = rows[: self.per_page]
+            else:
+                rows = list(
+                    self.queryset.filter(
+                        self._seek_filter(values, after=False)
+                    ).order_by(*self._reversed_ordering())[: self.per_page + 1]
+                )
+                has_previous = len(rows) > self.per_page
+                has_next = True
+                rows = rows[: self.per_page]
+                rows.reverse()
+            if not self.with_count:
+                count = None
+
+        return KeysetPage(rows, self, has_next, has_previous, count)
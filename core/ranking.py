@@ -0,0 +1,85 @@
+"""
+Skill ranking for the "best match" sort.
+
+Each skill stores a precomputed score in Skill.score that combines a
+Bayesian-smoothed rating with a recency decay. Ordering active skills by that
+column is a plain index scan; text searches multiply their bm25 relevance by
+the score so better and fresher skills rise within equally good matches.
+
+The rating part is refreshed when a skill's ratings change. The recency part
+decays with time, so recompute_skill_scores should be run periodically.
+"""
+
+from django.utils import timezone
+
+# Bayesian smoothing: every skill starts with PRIOR_WEIGHT ratings of
+# PRIOR_MEAN, so a single 5-star rating can't outrank a long track record
+PRIOR_MEAN = 3.0
+PRIOR_WEIGHT = 5
+
+# Recency halves every RECENCY_HALF_LIFE_DAYS days
+RECENCY_HALF_LIFE_DAYS = 30.0
+
+RATING_WEIGHT = 0.7
+RECENCY_WEIGHT = 0.3
+
+# How strongly the score boosts text relevance in searches
+TEXT_SCORE_BOOST = 1.0
+
+
+def bayesian_rating(rating_sum, rating_count):
+    """Average rating pulled towards PRIOR_MEAN while there are few ratings"""
+    return (PRIOR_WEIGHT * PRIOR_MEAN + (rating_sum or 0)) / (
+        PRIOR_WEIGHT + (rating_count or 0)
+    )
+
+
+def recency(created_at, now=None):
+    """1.0 for a brand new skill, halving every RECENCY_HALF_LIFE_DAYS"""
+    now = now or timezone.now()
+    age_days = max((now - created_at).total_seconds(), 0) / 86400
+    return 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+
+def skill_score(rating_sum, rating_count, created_at, now=None):
+    """The stored ranking score, between 0 and 1"""
+    return RATING_WEIGHT * bayesian_rating(
+        rating_sum, rating_count
+    ) / 5 + RECENCY_WEIGHT * recency(created_at, now)
+
+
+def refresh_skill_score(skill_id):
+    """Recompute one skill's score after its ratings changed"""
+    from .models import Skill
+
+    row = (
+        Skill.objects.filter(pk=skill_id)
+        .values_list("rating_sum", "rating_count", "created_at")
+        .first()
+    )
+    if row is None:
+        return
+    Skill.objects.filter(pk=skill_id).update(score=skill_score(*row))
+
+
+def recompute_skill_scores(batch_size=1000):
+    """Recompute every skill's score; returns the number of skills updated"""
+    from .models import Skill
+
+    now = timezone.now()
+    skills = Skill.objects.order_by().only(
+        "id", "created_at", "rating_sum", "rating_count", "score"
+    )
+    batch = []
+    updated = 0
+    for skill in skills.iterator(chunk_size=batch_size):
+        skill.score = skill_score(
+            skill.rating_sum, skill.rating_count, skill.created_at, now
+        )
+        batch.append(skill)
+        if len(batch) >= batch_size:
+            Skill.objects.bulk_update(batch, ["score"])
+            updated += len(batch)
+            batch = []
+    Skill.objects.bulk_update(batch, ["score"])
+    return updated + len(batch)
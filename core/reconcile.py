@@ -0,0 +1,224 @@
+"""
+Reconciliation of the denormalized counters.
+
+Signals keep the stored aggregates (Skill rating totals and star counters,
+Profile overall rating, skills text and summary, and completion columns, and
+Conversation last message and unread counters) in step incrementally, so a
+crash between statements or a bulk SQL edit can leave them wrong. Each
+reconciler here recomputes one group of columns for a primary key range of
+its table with set-based queries and rewrites only the rows whose stored
+values differ.
+
+Reconcilers run in RECONCILERS order because later ones read the columns
+earlier ones fix (profile ratings are summed from the skill totals, and
+completion counts the skill summaries).
+"""
+
+from django.apps import apps
+from django.db.models import Count, Max, Min, Q, Sum
+
+from .search import USER_INDEX, profile_skills_text
+
+
+def pk_chunks(model, chunk_size):
+    """Split the model's primary key range into [start, end) chunks"""
+    bounds = model.objects.aggregate(low=Min("pk"), high=Max("pk"))
+    if bounds["low"] is None:
+        return []
+    return [
+        (start, start + chunk_size)
+        for start in range(bounds["low"], bounds["high"] + 1, chunk_size)
+    ]
+
+
+def reconcile_skill_ratings(start, end, dry_run=False):
+    """Skill.rating_sum, rating_count and ratings_1..5 from the Rating rows"""
+    Rating = apps.get_model("core", "Rating")
+    Skill = apps.get_model("core", "Skill")
+
+    star_fields = {Skill.star_field(star): star for star in Skill.STARS}
+    fields = ["rating_sum", "rating_count", *star_fields]
+    expected = {
+        row.pop("skill_id"): row
+        for row in Rating.objects.filter(skill_id__gte=start, skill_id__lt=end)
+        .order_by()
+        .values("skill_id")
+        .annotate(
+            rating_sum=Sum("rating"),
+            rating_count=Count("id"),
+            **{
+                field: Count("id", filter=Q(rating=star))
+                for field, star in star_fields.items()
+            },
+        )
+    }
+    skills = Skill.objects.filter(pk__gte=start, pk__lt=end).order_by().only(*fields)
+    return _fix_rows(Skill, skills, expected, fields, dry_run)
+
+
+def reconcile_profile_ratings(start, end, dry_run=False):
+    """Profile.rating_sum, total_ratings and overall_rating from skill totals"""
+    Profile = apps.get_model("core", "Profile")
+    Skill = apps.get_model("core", "Skill")
+
+    fields = ["rating_sum", "total_ratings", "overall_rating"]
+    expected = {}
+    for row in (
+        Skill.objects.filter(
+            user__profile__pk__gte=start,
+            user__profile__pk__lt=end,
+            is_active=True,
+            skill_type="offer",
+        )
+        .order_by()
+        .values("user_id")
+        .annotate(rating_sum=Sum("rating_sum"), total_ratings=Sum("rating_count"))
+    ):
+        total = row["total_ratings"]
+        expected[row.pop("user_id")] = dict(
+            row, overall_rating=row["rating_sum"] / total if total else 0.0
+        )
+    profiles = (
+        Profile.objects.filter(pk__gte=start, pk__lt=end)
+        .order_by()
+        .only("user_id", *fields)
+    )
+    return _fix_rows(Profile, profiles, expected, fields, dry_run, key="user_id")
+
+
+def reconcile_profile_skills(start, end, dry_run=False):
+    """Profile.skills_offered, skills_needed and skills_summary from skill titles"""
+    Profile = apps.get_model("core", "Profile")
+    Skill = apps.get_model("core", "Skill")
+
+    fields = ["skills_offered", "skills_needed", "skills_summary"]
+    titles = {}
+    # Same order as Profile.update_skills_from_skill_objects: newest first
+    for user_id, skill_type, title in (
+        Skill.objects.filter(
+            user__profile__pk__gte=start, user__profile__pk__lt=end, is_active=True
+        )
+        .order_by("user_id", "-created_at")
+        .values_list("user_id", "skill_type", "title")
+    ):
+        titles.setdefault(user_id, {"offer": [], "request": []})[skill_type].append(
+            title
+        )
+    expected = {}
+    for user_id, by_type in titles.items():
+        offered = ", ".join(by_type["offer"])
+        needed = ", ".join(by_type["request"])
+        expected[user_id] = {
+            "skills_offered": offered,
+            "skills_needed": needed,
+            "skills_summary": Profile.summarize_skills(offered, needed),
+        }
+    profiles = (
+        Profile.objects.filter(pk__gte=start, pk__lt=end)
+        .order_by()
+        .only("user_id", *fields)
+    )
+    checked, fixed = _fix_rows(
+        Profile, profiles, expected, fields, dry_run, key="user_id"
+    )
+    if not dry_run:
+        # bulk_update skips the signals that feed the user search index
+        for profile in fixed:
+            USER_INDEX.update(profile.user_id, {"skills": profile_skills_text(profile)})
+    return checked, fixed
+
+
+def reconcile_profile_completion(start, end, dry_run=False):
+    """Profile.completion_percentage and is_profile_complete, as save() sets them"""
+    Profile = apps.get_model("core", "Profile")
+
+    fields = list(Profile.COMPLETION_FIELDS)
+    profiles = list(
+        Profile.objects.filter(pk__gte=start, pk__lt=end)
+        .order_by()
+        .select_related("user")
+        .only(
+            *fields,
+            *Profile.COMPLETION_INPUTS,
+            "user__first_name",
+            "user__last_name",
+        )
+    )
+    expected = {
+        profile.pk: dict(zip(fields, profile.compute_completion()))
+        for profile in profiles
+    }
+    return _fix_rows(Profile, profiles, expected, fields, dry_run)
+
+
+def reconcile_conversations(start, end, dry_run=False):
+    """Conversation last message pointer and unread counters from its messages"""
+    from .models import recount_conversation
+
+    Conversation = apps.get_model("core", "Conversation")
+
+    checked = 0
+    fixed = []
+    for conversation in (
+        Conversation.objects.filter(pk__gte=start, pk__lt=end).order_by().recounted()
+    ):
+        checked += 1
+        if any(
+            getattr(conversation, field) != getattr(conversation, f"recounted_{field}")
+            for field in Conversation.RECOUNTED_FIELDS
+        ):
+            fixed.append(conversation)
+    if not dry_run:
+        # Also drops threads left without messages and the cached unread totals
+        for conversation in fixed:
+            recount_conversation(conversation.pk)
+    return checked, fixed
+
+
+def _fix_rows(model, rows, expected, fields, dry_run, key="pk"):
+    """
+    Compare rows against expected[getattr(row, key)] (missing means all zero
+    or empty) and bulk update the ones that differ.
+
+    Returns (number of rows checked, list of rows that were stale).
+    """
+    checked = 0
+    fixed = []
+    for row in rows:
+        checked += 1
+        wanted = expected.get(getattr(row, key), {})
+        stale = False
+        for field in fields:
+            value = wanted.get(field)
+            if value is None:
+                value = model._meta.get_field(field).get_default()
+            current = getattr(row, field)
+            if isinstance(value, float):
+                differs = abs((current or 0) - value) > 1e-9
+            else:
+                differs = current != value
+            if differs:
+                setattr(row, field, value)
+                stale = True
+        if stale:
+            fixed.append(row)
+    if fixed and not dry_run:
+        model.objects.bulk_update(fixed, fields)
+    return checked, fixed
+
+
+# (name, model label, reconciler), in the order they must run
+RECONCILERS = [
+    ("skill_ratings", "core.Skill", reconcile_skill_ratings),
+    ("profile_ratings", "core.Profile", reconcile_profile_ratings),
+    ("profile_skills", "core.Profile", reconcile_profile_skills),
+    ("profile_completion", "core.Profile", reconcile_profile_completion),
+    ("conversations", "core.Conversation", reconcile_conversations),
+]
+
+
+def run_chunk(name, start, end, dry_run=False):
+    """Run one reconciler over one chunk; returns (name, checked, fixed ids)"""
+    reconciler = {entry[0]: entry[2] for entry in RECONCILERS}[name]
+    checked, fixed = reconciler(start, end, dry_run=dry_run)
+    return name, checked, [row.pk for row in fixed]
@@ -0,0 +1,356 @@
+"""
+Search helpers for SkillSwap.
+
+On SQLite (the default backend) skill titles and descriptions, and user names
+plus profile skill text, are mirrored into FTS5 virtual tables that are kept in
+sync by the signals in core.models. Other database backends fall back to
+icontains filtering.
+
+Locations are matched on case-folded key columns (Profile.city_key,
+Profile.country_key, Skill.location_key) with exact/prefix range lookups.
+
+Typo-tolerant matching uses the SkillTrigram table: every distinct trigram of
+a skill's title and description words, maintained per skill on save. It works
+on any backend and is only consulted when the exact search finds nothing.
+"""
+
+import math
+import re
+
+from django.db import connections, router
+from django.db.models import (
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Cast
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Share of the query's trigrams a skill must contain to count as a fuzzy match
+FUZZY_MIN_SIMILARITY = 0.4
+# Upper bound on the candidates the fuzzy fallback ranks
+FUZZY_MAX_MATCHES = 500
+
+
+def normalize_location(value):
+    """Case-fold and collapse whitespace so locations compare as plain keys"""
+    return " ".join((value or "").casefold().split())
+
+
+def prefix_q(field, prefix):
+    """
+    Match field values starting with prefix as an index-friendly range.
+
+    field >= prefix AND field < prefix-with-last-char-bumped, which any B-tree
+    index can serve, unlike LIKE '%...%'.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": upper})
+
+
+def location_q(location):
+    """Skills whose own location or owner's city/country starts with location"""
+    from .models import Profile
+
+    key = normalize_location(location)
+    if not key:
+        return Q()
+    matching_users = Profile.objects.filter(
+        prefix_q("city_key", key) | prefix_q("country_key", key)
+    ).values("user_id")
+    return Q(user_id__in=matching_users) | prefix_q("location_key", key)
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 MATCH expression (all words, prefix matched)"""
+    words = WORD_RE.findall(text.lower())
+    if not words:
+        return ""
+    return " ".join(f'"{word}"*' for word in words)
+
+
+class FullTextIndex:
+    """
+    An FTS5 table mirroring some text columns of a model, keyed by rowid = pk.
+
+    weights are the bm25() column weights, in the same order as columns.
+    source_sql selects (pk, *columns) for every row and is used by rebuild().
+    """
+
+    def __init__(self, model_label, table, columns, weights, source_sql):
+        self.model_label = model_label
+        self.table = table
+        self.columns = columns
+        self.weights = weights
+        self.source_sql = source_sql
+
+    @property
+    def model(self):
+        from django.apps import apps
+
+        return apps.get_model(self.model_label)
+
+    def _connection(self, for_write=False):
+        if for_write:
+            alias = router.db_for_write(self.model)
+        else:
+            alias = router.db_for_read(self.model)
+        return connections[alias]
+
+    def is_available(self, for_write=False):
+        return self._connection(for_write).vendor == "sqlite"
+
+    def index(self, pk, values):
+        """Insert or replace the row for pk with the given column values"""
+        if not self.is_available(for_write=True):
+            return
+        column_list = ", ".join(self.columns)
+        placeholders = ", ".join(["%s"] * len(self.columns))
+        with self._connection(for_write=True).cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [pk])
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, {column_list}) "
+                f"VALUES (%s, {placeholders})",
+                [pk] + [values.get(column) or "" for column in self.columns],
+            )
+
+    def update(self, pk, values):
+        """Overwrite only the given columns, creating the row if it is missing"""
+        if not self.is_available(for_write=True):
+            return
+        assignments = ", ".join(f"{column} = %s" for column in values)
+        with self._connection(for_write=True).cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {self.table} SET {assignments} WHERE rowid = %s",
+                [value or "" for value in values.values()] + [pk],
+            )
+            updated = cursor.rowcount
+        if not updated:
+            self.index(pk, values)
+
+    def remove(self, pk):
+        if not self.is_available(for_write=True):
+            return
+        with self._connection(for_write=True).cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [pk])
+
+    def rebuild(self):
+        """Repopulate the whole index from the model table"""
+        if not self.is_available(for_write=True):
+            return
+        column_list = ", ".join(self.columns)
+        with self._connection(for_write=True).cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, {column_list}) {self.source_sql}"
+            )
+
+    @property
+    def rank_sql(self):
+        weights = ", ".join(str(weight) for weight in self.weights)
+        return f"bm25({self.table}, {weights})"
+
+    def search(self, queryset, text):
+        """
+        Restrict queryset to rows matching text, annotated with search_rank.
+
+        search_rank is the bm25 score, so lower is a better match. Returns None
+        when the index can't be used, so callers can fall back to icontains.
+        """
+        match = build_match_query(text)
+        if not match or not self.is_available():
+            return None
+        source_table = queryset.model._meta.db_table
+        return queryset.extra(
+            tables=[self.table],
+            where=[f"{self.table}.rowid = {source_table}.id", f"{self.table} MATCH %s"],
+            params=[match],
+            select={"search_rank": self.rank_sql},
+        )
+
+
+SKILL_INDEX = FullTextIndex(
+    "core.Skill",
+    table="core_skill_fts",
+    columns=("title", "description"),
+    weights=(5.0, 1.0),
+    source_sql="SELECT id, title, description FROM core_skill",
+)
+
+USER_INDEX = FullTextIndex(
+    "auth.User",
+    table="core_user_fts",
+    columns=("username", "first_name", "last_name", "skills"),
+    weights=(3.0, 5.0, 5.0, 1.0),
+    source_sql=(
+        "SELECT u.id, u.username, u.first_name, u.last_name, "
+        "COALESCE(p.skills_offered, '') || ' ' || COALESCE(p.skills_needed, '') "
+        "FROM auth_user u LEFT JOIN core_profile p ON p.user_id = u.id"
+    ),
+)
+
+
+def profile_skills_text(profile):
+    """The profile skill text stored in the user index"""
+    return f"{profile.skills_offered} {profile.skills_needed}".strip()
+
+
+def search_skills(queryset, text, best_match=False):
+    """
+    Filter a Skill queryset by free text, most relevant first.
+
+    With best_match the text relevance is boosted by the stored Skill.score,
+    so well rated, recent skills come first among similar matches.
+    """
+    from .ranking import TEXT_SCORE_BOOST
+
+    results = SKILL_INDEX.search(queryset, text)
+    if results is not None:
+        if not best_match:
+            return results.order_by("search_rank", "-created_at")
+        # bm25 is negative (lower is better), so boosting scales it down
+        table = queryset.model._meta.db_table
+        return results.extra(
+            select={
+                "best_match_rank": f"{SKILL_INDEX.rank_sql} * "
+                f"(1 + {TEXT_SCORE_BOOST} * {table}.score)"
+            }
+        ).order_by("best_match_rank", "-created_at")
+    results = queryset.filter(Q(title__icontains=text) | Q(description__icontains=text))
+    if best_match:
+        return results.order_by("-score", "-created_at")
+    return results.order_by("-created_at")
+
+
+def search_users(queryset, text):
+    """Filter a User queryset by name, username or profile skills, best first"""
+    results = USER_INDEX.search(queryset, text)
+    if results is not None:
+        return results.order_by("search_rank", "id")
+    return queryset.filter(
+        Q(username__icontains=text)
+        | Q(first_name__icontains=text)
+        | Q(last_name__icontains=text)
+        | Q(profile__skills_offered__icontains=text)
+        | Q(profile__skills_needed__icontains=text)
+    ).order_by("id")
+
+
+def word_trigrams(text):
+    """
+    Distinct trigrams of each word in text, padded like pg_trgm.
+
+    "guitar" gives "  g", " gu", "gui", "uit", "ita", "tar" and "ar ".
+    """
+    grams = set()
+    for word in WORD_RE.findall((text or "").casefold()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def skill_trigram_weights(title, description):
+    """Map each trigram of a skill to its weight (title 2, description 1)"""
+    weights = dict.fromkeys(word_trigrams(description), 1)
+    weights.update(dict.fromkeys(word_trigrams(title), 2))
+    return weights
+
+
+def sync_skill_trigrams(skill, created=False):
+    """Bring the skill's SkillTrigram rows in line with its current text"""
+    from .models import SkillTrigram
+
+    wanted = skill_trigram_weights(skill.title, skill.description)
+    existing = {}
+    if not created:
+        existing = dict(
+            SkillTrigram.objects.filter(skill=skill).values_list("trigram", "weight")
+        )
+    outdated = [gram for gram, weight in existing.items() if wanted.get(gram) != weight]
+    if outdated:
+        SkillTrigram.objects.filter(skill=skill, trigram__in=outdated).delete()
+    SkillTrigram.objects.bulk_create(
+        SkillTrigram(skill=skill, trigram=gram, weight=weight)
+        for gram, weight in wanted.items()
+        if existing.get(gram) != weight
+    )
+
+
+def rebuild_skill_trigrams(batch_size=10000):
+    """Repopulate the whole trigram table from the skill table"""
+    from .models import Skill, SkillTrigram
+
+    SkillTrigram.objects.all().delete()
+    batch = []
+    for pk, title, description in Skill.objects.values_list(
+        "pk", "title", "description"
+    ).iterator(chunk_size=batch_size):
+        for gram, weight in skill_trigram_weights(title, description).items():
+            batch.append(SkillTrigram(skill_id=pk, trigram=gram, weight=weight))
+        if len(batch) >= batch_size:
+            SkillTrigram.objects.bulk_create(batch, batch_size=batch_size)
+            batch = []
+    SkillTrigram.objects.bulk_create(batch, batch_size=batch_size)
+
+
+def fuzzy_search_skills(queryset, text, best_match=False, capped=True):
+    """
+    Filter a Skill queryset to rows sharing enough trigrams with text.
+
+    Rows are annotated with fuzzy_score, a weighted Jaccard similarity: the
+    weight of the shared trigrams over the weight of the union of the query's
+    and the skill's trigrams, with query trigrams weighing as much as title
+    ones. A long description sharing a few trigrams therefore ranks below a
+    short title that shares them all. Rows are ordered best first (ties broken
+    by Skill.score with best_match, else newest first). Only the
+    FUZZY_MAX_MATCHES most similar skills of the filtered queryset are kept,
+    so a fallback for a very common misspelling stays cheap.
+
+    capped=False keeps every match, unscored and unordered, for counts that
+    must not depend on which skills made the cut.
+    """
+    from .models import SkillTrigram
+
+    grams = word_trigrams(text)
+    if not grams:
+        return queryset.none()
+    min_shared = max(2, math.ceil(len(grams) * FUZZY_MIN_SIMILARITY))
+    query_weight = 2 * len(grams)
+    skill_weight = (
+        SkillTrigram.objects.filter(skill_id=OuterRef("skill_id"))
+        .values("skill_id")
+        .annotate(total=Sum("weight"))
+        .values("total")
+    )
+    similar = (
+        SkillTrigram.objects.filter(
+            trigram__in=grams, skill_id__in=queryset.values("pk")
+        )
+        .values("skill_id")
+        .annotate(shared=Count("id"), shared_weight=Sum("weight"))
+        .filter(shared__gte=min_shared)
+        .annotate(
+            similarity=ExpressionWrapper(
+                Cast("shared_weight", FloatField())
+                / (query_weight + Subquery(skill_weight) - F("shared_weight")),
+                output_field=FloatField(),
+            )
+        )
+    )
+    if not capped:
+        return queryset.filter(id__in=similar.values("skill_id"))
+    best = similar.order_by("-similarity", "-skill_id").values("skill_id")[
+        :FUZZY_MAX_MATCHES
+    ]
+    score = similar.filter(skill_id=OuterRef("pk")).values("similarity")
+    return (
+        queryset.filter(id__in=best)
+        .annotate(fuzzy_score=Subquery(score))
+        .order_by("-fuzzy_score", "-score" if best_match else "-created_at")
+    )
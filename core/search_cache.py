@@ -0,0 +1,116 @@
+"""
+Cache helpers for skill search.
+
+Cached search data is stored under keys that include a global generation
+number. Any write that can change search results bumps the generation once
+its transaction commits, which orphans every older entry at once instead of
+deleting keys one by one. Bumping at commit keeps a search that ran before
+the commit from caching the old rows under the new generation. The
+invalidation reaches other processes only if the configured cache is shared
+between them (the default local-memory cache is per process).
+"""
+
+import hashlib
+import json
+import logging
+import time
+
+from django.core.cache import cache
+
+GENERATION_KEY = "skill_search:generation"
+# Log a result cache's hit rate each time its hits or misses reach a multiple
+STATS_LOG_EVERY = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def _fresh_generation():
+    # A clock reading, so a generation lost to eviction is never handed out
+    # again and entries cached under it stay orphaned
+    return time.time_ns()
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        fresh = _fresh_generation()
+        cache.add(GENERATION_KEY, fresh, timeout=None)
+        generation = cache.get(GENERATION_KEY, fresh)
+    return generation
+
+
+def bump_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, _fresh_generation(), timeout=None)
+
+
+def make_key(prefix, parts):
+    """Build a cache key for prefix from JSON-serializable parts"""
+    digest = hashlib.md5(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"skill_search:{prefix}:{get_generation()}:{digest}"
+
+
+class ResultCache:
+    """
+    Caches pages of search results as ordered primary keys plus page metadata.
+
+    Entries are keyed by the normalized filters and the page address, and live
+    under the current generation like every other search cache entry. Hits and
+    misses are counted in the cache itself so stats() covers every process
+    sharing it; the search_cache_stats command prints them, and they are
+    logged every STATS_LOG_EVERY hits or misses.
+    """
+
+    def __init__(self, prefix, timeout):
+        self.prefix = prefix
+        self.timeout = timeout
+
+    def _stat_key(self, name):
+        return f"skill_search:{self.prefix}:stats:{name}"
+
+    def _count(self, name):
+        key = self._stat_key(name)
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            count = 1 if cache.add(key, 1, timeout=None) else cache.incr(key)
+        if count % STATS_LOG_EVERY == 0:
+            self.log_stats()
+
+    def get(self, parts):
+        value = cache.get(make_key(self.prefix, parts))
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, parts, value):
+        cache.set(make_key(self.prefix, parts), value, self.timeout)
+
+    def stats(self):
+        hits = cache.get(self._stat_key("hits"), 0)
+        misses = cache.get(self._stat_key("misses"), 0)
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info(
+            "Skill search %s cache: %d hits, %d misses, %.1f%% hit rate",
+            self.prefix,
+            stats["hits"],
+            stats["misses"],
+            stats["hit_rate"] * 100,
+        )
+
+    def reset_stats(self):
+        cache.delete_many([self._stat_key("hits"), self._stat_key("misses")])
+
+
+SKILL_RESULTS = ResultCache("results", timeout=60 * 5)
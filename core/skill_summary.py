@@ -0,0 +1,77 @@
+"""
+Deferred sync of Profile.skills_offered / skills_needed.
+
+Rebuilding a user's skill summary costs two SELECTs and an UPDATE (plus the
+profile's index and cache updates), so the Skill signals don't do it per
+write. They call schedule_skill_summary(), which adds the user to a pending
+set and registers flush_skill_summaries() with transaction.on_commit. The
+first flush after a commit rebuilds every pending user and empties the set,
+so the flushes registered by the transaction's later writes find nothing to
+do: a burst of writes costs one rebuild per user.
+
+Users whose writes were rolled back stay pending until the next commit
+flushes them; a rebuild reads the current skills, so the extra one is
+harmless. Outside a transaction on_commit runs at once, so scripts that write
+skills in autocommit mode should wrap the burst in bulk_skill_changes() to
+get one rebuild per user at the end.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+# Connections are per thread, and so is the pending state
+_local = threading.local()
+
+
+def _state():
+    if not hasattr(_local, "user_ids"):
+        _local.user_ids = set()
+        _local.bulk_depth = 0
+        _local.bulk_user_ids = set()
+    return _local
+
+
+def sync_skill_summaries(user_ids):
+    """Rebuild the skill summary of each user that still has a profile"""
+    from .models import Profile
+
+    for profile in Profile.objects.filter(user_id__in=user_ids).select_related("user"):
+        profile.update_skills_from_skill_objects()
+
+
+def flush_skill_summaries():
+    """Rebuild the pending skill summaries (the on_commit callback)"""
+    state = _state()
+    user_ids, state.user_ids = state.user_ids, set()
+    if user_ids:
+        sync_skill_summaries(user_ids)
+
+
+def schedule_skill_summary(*user_ids):
+    """Rebuild users' skill summaries once the current transaction commits"""
+    state = _state()
+    if state.bulk_depth:
+        state.bulk_user_ids.update(user_ids)
+        return
+    state.user_ids.update(user_ids)
+    transaction.on_commit(flush_skill_summaries)
+
+
+@contextmanager
+def bulk_skill_changes():
+    """
+    Collect the skill summaries touched inside the block and rebuild each one
+    once on exit (after commit if a transaction is still open).
+    """
+    state = _state()
+    state.bulk_depth += 1
+    try:
+        yield
+    finally:
+        state.bulk_depth -= 1
+        if not state.bulk_depth:
+            user_ids, state.bulk_user_ids = state.bulk_user_ids, set()
+            if user_ids:
+                schedule_skill_summary(*user_ids)
@@ -1,8 +1,13 @@
 from django import template
+from django.template.loader import get_template
+from django.utils import translation
+from functools import lru_cache
 from math import floor, ceil
 
 register = template.Library()
 
+STAR_RATING_TEMPLATE = "core/components/star_rating.html"
+
 
 def filled_stars(rating):
     """Calculate number of filled stars (rounded to nearest integer)"""
@@ -15,7 +20,30 @@ def empty_stars(rating):
     return 5 - filled_stars(rating)
 
 
-@register.inclusion_tag("core/components/star_rating.html")
+@lru_cache(maxsize=2048)
+def _render_star_rating(full_stars, half_star, tenths, show_count, count, language):
+    """
+    Render star_rating.html once per distinct output.
+
+    tenths is the displayed rating in tenths (None when hidden) and count is
+    None when hidden, so list cards share ~11 fragments between them. Edits
+    to the template show up after a restart.
+    """
+    empty = 5 - full_stars - (1 if half_star else 0)
+    return get_template(STAR_RATING_TEMPLATE).render(
+        {
+            "rating": tenths / 10 if tenths is not None else 0,
+            "full_stars": range(full_stars),
+            "half_star": half_star,
+            "empty_stars": range(empty),
+            "show_value": tenths is not None,
+            "show_count": show_count,
+            "count": count,
+        }
+    )
+
+
+@register.simple_tag
 def star_rating(rating, show_value=True, show_count=True, count=0):
     """
     Display star rating with proper filled stars
@@ -23,14 +51,12 @@ def star_rating(rating, show_value=True, show_count=True, count=0):
     rating = float(rating) if rating else 0
     full_stars = int(floor(rating))
     half_star = (rating - full_stars) >= 0.5
-    empty_stars = 5 - full_stars - (1 if half_star else 0)
-
-    return {
-        "rating": rating,
-        "full_stars": range(full_stars),
-        "half_star": half_star,
-        "empty_stars": range(empty_stars),
-        "show_value": show_value,
-        "show_count": show_count,
-        "count": count,
-    }
+    return _render_star_rating(
+        full_stars,
+        half_star,
+        # Rounded half up, like the template's floatformat:1
+        int(rating * 10 + 0.5) if show_value else None,
+        bool(show_count),
+        count if show_count else None,
+        translation.get_language(),
+    )
@@ -491,38 +491,41 @@ class SkillSynchronizationTest(TestCase):
         self.assertEqual(self.profile.skills_needed, "")
 
         # Step 2: Create offer skill
-        skill1 = Skill.objects.create(
-            user=self.user,
-            title="Python Programming",
-            description="Web development",
-            skill_type="offer",
-            category="technology",
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            skill1 = Skill.objects.create(
+                user=self.user,
+                title="Python Programming",
+                description="Web development",
+                skill_type="offer",
+                category="technology",
+            )
 
         # Profile should be updated automatically via signal
         self.profile.refresh_from_db()
         self.assertEqual(self.profile.skills_offered, "Python Programming")
 
         # Step 3: Create request skill
-        skill2 = Skill.objects.create(
-            user=self.user,
-            title="Machine Learning",
-            description="Want to learn ML",
-            skill_type="request",
-            category="technology",
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            skill2 = Skill.objects.create(
+                user=self.user,
+                title="Machine Learning",
+                description="Want to learn ML",
+                skill_type="request",
+                category="technology",
+            )
 
         self.profile.refresh_from_db()
         self.assertEqual(self.profile.skills_needed, "Machine Learning")
 
         # Step 4: Create multiple skills of same type
-        skill3 = Skill.objects.create(
-            user=self.user,
-            title="Django Framework",
-            description="Web framework",
-            skill_type="offer",
-            category="technology",
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            skill3 = Skill.objects.create(
+                user=self.user,
+                title="Django Framework",
+                description="Web framework",
+                skill_type="offer",
+                category="technology",
+            )
 
         self.profile.refresh_from_db()
         offered_skills = self.profile.skills_offered.split(", ")
@@ -531,14 +534,16 @@ class SkillSynchronizationTest(TestCase):
 
         # Step 5: Deactivate a skill
         skill1.is_active = False
-        skill1.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            skill1.save()
 
         self.profile.refresh_from_db()
         self.assertNotIn("Python Programming", self.profile.skills_offered)
         self.assertIn("Django Framework", self.profile.skills_offered)
 
         # Step 6: Delete a skill
-        skill3.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            skill3.delete()
 
         self.profile.refresh_from_db()
         self.assertEqual(self.profile.skills_offered, "")  # No active offer skills left
@@ -596,18 +601,19 @@ class CrossBrowserCompatibilityTest(TestCase):
         user = User.objects.create_user(username="testuser", password="pass123")
 
         # Test transaction consistency
-        with transaction.atomic():
-            skill = Skill.objects.create(
-                user=user,
-                title="Atomic Skill",
-                description="Test atomic operations",
-                skill_type="offer",
-                category="technology",
-            )
-
-            # Profile should be updated within the same transaction
-            user.profile.refresh_from_db()
-            self.assertIn("Atomic Skill", user.profile.skills_offered)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                skill = Skill.objects.create(
+                    user=user,
+                    title="Atomic Skill",
+                    description="Test atomic operations",
+                    skill_type="offer",
+                    category="technology",
+                )
+
+                # The profile summary is rebuilt once the transaction commits
+                user.profile.refresh_from_db()
+                self.assertNotIn("Atomic Skill", user.profile.skills_offered)
 
         # Verify data persisted correctly
         user.profile.refresh_from_db()
@@ -1,9 +1,30 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 from django.contrib.auth.models import User
-from django.db import IntegrityError
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.core.files.uploadedfile import SimpleUploadedFile
-from core.models import Profile, Skill, Message, Rating
+from django.core.management import call_command
+from django.utils import timezone
+from core.models import (
+    Conversation,
+    LeaderboardEntry,
+    Profile,
+    Skill,
+    SkillTrigram,
+    Message,
+    Rating,
+    delete_conversations,
+    mark_conversation_read,
+)
+from core.leaderboard import LEADERBOARD_SIZE, rebuild_leaderboards
+from core.ranking import bayesian_rating, skill_score
+from core.search import fuzzy_search_skills, search_skills, word_trigrams
+from core.skill_summary import bulk_skill_changes, flush_skill_summaries
+from datetime import timedelta
 from decimal import Decimal
+from io import StringIO
 
 
 class ProfileModelTest(TestCase):
@@ -24,6 +45,87 @@ class ProfileModelTest(TestCase):
         self.assertTrue(hasattr(new_user, "profile"))
         self.assertIsInstance(new_user.profile, Profile)
 
+    def test_user_save_skips_unloaded_profile(self):
+        """Test saves that can't change completion don't touch the profile"""
+        user = User.objects.get(pk=self.user.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            user.save(update_fields=["last_login"])
+            user.save(update_fields=["email"])
+
+        self.assertFalse([q for q in queries if "core_profile" in q["sql"]])
+
+    def test_user_name_change_updates_stored_completion(self):
+        """Test a name saved without loading the profile still updates completion"""
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = "Ada"
+        user.last_name = "Lovelace"
+        user.save(update_fields=["first_name", "last_name"])
+
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.completion_percentage, 25)
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        # Unchanged completion is read but not rewritten
+        self.assertEqual(
+            [q for q in queries if q["sql"].startswith('UPDATE "core_profile"')], []
+        )
+
+    def test_skills_summary_follows_skill_text(self):
+        """Test the card summary is rebuilt whenever the skills text is saved"""
+        self.profile.skills_offered = "Python, Django, , SQL, Rust"
+        self.profile.save(update_fields=["skills_offered"])
+
+        stored = Profile.objects.get(pk=self.profile.pk).skills_summary
+        self.assertEqual(
+            stored,
+            {
+                "offered": ["Python", "Django", "SQL"],
+                "offered_count": 4,
+                "offered_more": 1,
+            },
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(
+                user=self.user,
+                title="Chess",
+                description="Openings",
+                skill_type="request",
+                category="other",
+            )
+        stored = Profile.objects.get(pk=self.profile.pk).skills_summary
+        self.assertEqual(
+            stored, {"needed": ["Chess"], "needed_count": 1, "needed_more": 0}
+        )
+
+    def test_completion_is_filterable(self):
+        """Test the stored completion columns work as plain query filters"""
+        self.user.first_name = "John"
+        self.user.last_name = "Doe"
+        self.user.save()
+        self.profile.city = "Stockholm"
+        self.profile.country = "Sweden"
+        self.profile.save()
+        self.assertFalse(Profile.objects.filter(is_profile_complete=True).exists())
+
+        self.profile.skills_needed = "Chess"
+        self.profile.save(update_fields=["skills_needed"])
+
+        complete = Profile.objects.get(is_profile_complete=True)
+        self.assertEqual(complete, self.profile)
+        self.assertEqual(complete.completion_percentage, 62)
+        self.assertEqual(
+            list(Profile.objects.filter(completion_percentage__gte=50)), [self.profile]
+        )
+
+    def test_user_save_saves_loaded_profile(self):
+        """Test a profile edited through user.profile is saved with the user"""
+        self.user.profile.city = "Malmo"
+        self.user.save()
+
+        self.assertEqual(Profile.objects.get(user=self.user).city, "Malmo")
+
     def test_profile_string_representation(self):
         """Test Profile __str__ method"""
         self.assertEqual(str(self.profile), "testuser's profile")
@@ -167,6 +269,20 @@ class ProfileModelTest(TestCase):
         self.assertEqual(self.profile.skills_offered, "Python Programming")
         self.assertEqual(self.profile.skills_needed, "Spanish")
 
+    def test_location_keys_follow_city_and_country(self):
+        """Test the normalized location keys are kept up to date on save"""
+        self.profile.city = "  New   York "
+        self.profile.country = "USA"
+        self.profile.save()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.city_key, "new york")
+        self.assertEqual(self.profile.country_key, "usa")
+
+        self.profile.city = "Göteborg"
+        self.profile.save(update_fields=["city"])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.city_key, "göteborg")
+
     def test_overall_rating_no_ratings(self):
         """Test overall_rating with no ratings"""
         self.assertEqual(self.profile.overall_rating, 0.0)
@@ -287,6 +403,160 @@ class SkillModelTest(TestCase):
         self.assertEqual(skills[1], self.skill)
 
 
+class SkillSearchIndexTest(TestCase):
+    """Test cases for keeping the skill full-text index in sync"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username="indexuser", password="pass")
+        self.skill = Skill.objects.create(
+            user=self.user,
+            title="Sourdough Baking",
+            description="Bread from scratch",
+            skill_type="offer",
+            category="cooking",
+        )
+
+    def search(self, text):
+        return list(search_skills(Skill.objects.all(), text))
+
+    def test_new_skill_is_searchable(self):
+        """Test that a saved skill is found by title and description words"""
+        self.assertEqual(self.search("sourdough"), [self.skill])
+        self.assertEqual(self.search("scratch"), [self.skill])
+
+    def test_edited_skill_is_reindexed(self):
+        """Test that editing a skill replaces its indexed text"""
+        self.skill.title = "Pasta Making"
+        self.skill.save()
+
+        self.assertEqual(self.search("sourdough"), [])
+        self.assertEqual(self.search("pasta"), [self.skill])
+
+    def test_deleted_skill_is_removed_from_index(self):
+        """Test that deleting a skill removes it from search results"""
+        self.skill.delete()
+        self.assertEqual(self.search("sourdough"), [])
+
+    def test_search_requires_all_words(self):
+        """Test that every word in the query has to match"""
+        self.assertEqual(self.search("sourdough bread"), [self.skill])
+        self.assertEqual(self.search("sourdough pizza"), [])
+
+
+class SkillTrigramIndexTest(TestCase):
+    """Test cases for the trigram table behind typo-tolerant search"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username="trigramuser", password="pass")
+        self.skill = Skill.objects.create(
+            user=self.user,
+            title="Python",
+            description="Guitar",
+            skill_type="offer",
+            category="technology",
+        )
+
+    def trigrams(self):
+        return dict(self.skill.trigrams.values_list("trigram", "weight"))
+
+    def fuzzy(self, text):
+        return list(fuzzy_search_skills(Skill.objects.all(), text))
+
+    def test_trigrams_are_stored_on_create(self):
+        """Test title trigrams weigh 2 and description-only trigrams weigh 1"""
+        self.assertEqual(
+            self.trigrams(),
+            {
+                **{gram: 2 for gram in word_trigrams("python")},
+                **{gram: 1 for gram in word_trigrams("guitar")},
+            },
+        )
+
+    def test_edit_replaces_only_changed_trigrams(self):
+        """Test editing the text keeps unchanged rows and swaps the rest"""
+        kept = self.skill.trigrams.get(trigram="pyt")
+        self.skill.description = "Piano"
+        self.skill.save()
+
+        self.assertEqual(self.skill.trigrams.get(trigram="pyt").pk, kept.pk)
+        self.assertNotIn("gui", self.trigrams())
+        self.assertEqual(self.trigrams()["pia"], 1)
+
+    def test_unrelated_update_fields_are_skipped(self):
+        """Test saves limited to other fields leave the trigrams alone"""
+        self.skill.trigrams.all().delete()
+        self.skill.save(update_fields=["is_active"])
+        self.assertEqual(self.trigrams(), {})
+
+    def test_deleted_skill_drops_trigrams(self):
+        """Test deleting a skill deletes its trigram rows"""
+        self.skill.delete()
+        self.assertFalse(SkillTrigram.objects.exists())
+
+    def test_fuzzy_search_matches_typos(self):
+        """Test misspelt words still find the skill"""
+        self.assertEqual(self.fuzzy("pyhton"), [self.skill])
+        self.assertEqual(self.fuzzy("guitarr"), [self.skill])
+        self.assertEqual(self.fuzzy("knitting"), [])
+
+    def test_fuzzy_search_prefers_title_matches(self):
+        """Test a title match outranks the same match in a description"""
+        title_match = Skill.objects.create(
+            user=self.user,
+            title="Guitar lessons",
+            description="Strings",
+            skill_type="offer",
+            category="music",
+        )
+        self.assertEqual(self.fuzzy("guitarr"), [title_match, self.skill])
+
+    def test_fuzzy_search_prefers_closer_titles_over_long_descriptions(self):
+        """Test a short title match outranks a long text sharing more trigrams"""
+        title_match = Skill.objects.create(
+            user=self.user,
+            title="Guitar",
+            description="Lessons",
+            skill_type="offer",
+            category="music",
+        )
+        long_text = Skill.objects.create(
+            user=self.user,
+            title="Guitars and more",
+            description="Arrangements for every style of music imaginable",
+            skill_type="offer",
+            category="music",
+        )
+        results = self.fuzzy("guitarr")
+        self.assertEqual(results[0], title_match)
+        ranked = results[results.index(long_text)]
+        self.assertGreater(results[0].fuzzy_score, ranked.fuzzy_score)
+
+    def test_fuzzy_search_caps_matches_after_filtering(self):
+        """Test the match cap only counts skills the queryset keeps"""
+        cooking = Skill.objects.create(
+            user=self.user,
+            title="Python cooking",
+            description="Snake recipes from the jungle",
+            skill_type="offer",
+            category="cooking",
+        )
+        for i in range(3):
+            Skill.objects.create(
+                user=self.user,
+                title=f"Python {i}",
+                description="Python",
+                skill_type="offer",
+                category="technology",
+            )
+        with patch("core.search.FUZZY_MAX_MATCHES", 2):
+            results = list(
+                fuzzy_search_skills(Skill.objects.filter(category="cooking"), "pyhton")
+            )
+        self.assertEqual(results, [cooking])
+
+
 class MessageModelTest(TestCase):
     """Test cases for Message model functionality"""
 
@@ -349,6 +619,752 @@ class MessageModelTest(TestCase):
         self.assertEqual(messages[1], self.message)
 
 
+class ConversationModelTest(TestCase):
+    """Test the Conversation threads and counters kept by the Message signals"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.alice = User.objects.create_user(username="alice", password="pass123")
+        self.bob = User.objects.create_user(username="bob", password="pass123")
+        self.skill = Skill.objects.create(
+            user=self.bob,
+            title="Guitar",
+            description="Chords",
+            skill_type="offer",
+            category="music",
+        )
+
+    def send(self, sender, receiver, skill=None, subject="Hi"):
+        return Message.objects.create(
+            sender=sender,
+            receiver=receiver,
+            skill=skill,
+            subject=subject,
+            message="Hello",
+        )
+
+    def test_messages_share_thread_per_pair_and_skill(self):
+        """Both directions of a pair share a thread; a skill gets its own"""
+        first = self.send(self.alice, self.bob)
+        reply = self.send(self.bob, self.alice)
+        about_skill = self.send(self.alice, self.bob, skill=self.skill)
+
+        self.assertEqual(first.conversation_id, reply.conversation_id)
+        self.assertNotEqual(first.conversation_id, about_skill.conversation_id)
+        self.assertEqual(Conversation.objects.count(), 2)
+        self.assertEqual(about_skill.conversation.skill, self.skill)
+
+    def test_last_message_and_unread_counters(self):
+        """Sending moves the pointer and counts unread for the receiver only"""
+        self.send(self.alice, self.bob)
+        self.send(self.alice, self.bob)
+        last = self.send(self.bob, self.alice, subject="Re")
+
+        conversation = Conversation.objects.get()
+        self.assertEqual(conversation.last_message, last)
+        self.assertEqual(conversation.last_message_at, last.created_at)
+        self.assertEqual(conversation.unread_for(self.bob), 2)
+        self.assertEqual(conversation.unread_for(self.alice), 1)
+        self.assertEqual(conversation.other_user(self.alice), self.bob)
+        self.assertEqual(Conversation.objects.unread_total(self.bob), 2)
+
+    def test_reading_message_decrements_counter(self):
+        """Marking a loaded message read takes it off the receiver's counter"""
+        self.send(self.alice, self.bob)
+        message = Message.objects.get()
+        message.is_read = True
+        message.save()
+        message.save()  # Already counted as read
+
+        self.assertEqual(Conversation.objects.get().unread_for(self.bob), 0)
+
+    def test_mark_conversation_read(self):
+        """Opening a thread reads only the user's received messages"""
+        self.send(self.alice, self.bob)
+        self.send(self.alice, self.bob)
+        self.send(self.bob, self.alice)
+        conversation = Conversation.objects.get()
+
+        mark_conversation_read(conversation, self.bob)
+
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.unread_for(self.bob), 0)
+        self.assertEqual(conversation.unread_for(self.alice), 1)
+        self.assertFalse(
+            Message.objects.filter(receiver=self.bob, is_read=False).exists()
+        )
+
+    def test_delete_message_recounts_thread(self):
+        """Deleting repoints the last message; the last one removes the thread"""
+        first = self.send(self.alice, self.bob)
+        last = self.send(self.alice, self.bob)
+
+        last.delete()
+        conversation = Conversation.objects.get()
+        self.assertEqual(conversation.last_message, first)
+        self.assertEqual(conversation.unread_for(self.bob), 1)
+
+        first.delete()
+        self.assertFalse(Conversation.objects.exists())
+
+    def test_delete_conversations_is_per_participant(self):
+        """Deleting hides the thread from one side; it goes once both delete"""
+        self.send(self.alice, self.bob)
+        for _ in range(4):
+            self.send(self.bob, self.alice)
+        threads = Conversation.objects.all()
+
+        delete_conversations(self.bob, threads)
+
+        conversation = Conversation.objects.get()
+        self.assertEqual(conversation.unread_for(self.bob), 0)
+        self.assertEqual(conversation.unread_for(self.alice), 4)
+        self.assertFalse(Conversation.objects.visible_to(self.bob).exists())
+        self.assertTrue(Conversation.objects.visible_to(self.alice).exists())
+        self.assertEqual(Message.objects.visible_to(self.bob).count(), 0)
+        self.assertEqual(Message.objects.visible_to(self.alice).count(), 5)
+
+        with CaptureQueriesContext(connection) as queries:
+            deleted = delete_conversations(self.alice, threads)
+
+        self.assertEqual(deleted, 1)
+        self.assertFalse(Conversation.objects.exists())
+        self.assertFalse(Message.objects.exists())
+        # Marking read and the cascade, each one statement for any thread size
+        message_queries = [q for q in queries if '"core_message"' in q["sql"]]
+        self.assertEqual(len(message_queries), 2)
+
+    def test_new_message_revives_deleted_thread(self):
+        """A message after a delete shows the thread again, without the old ones"""
+        self.send(self.alice, self.bob, subject="Old")
+        delete_conversations(self.bob, Conversation.objects.all())
+
+        self.send(self.alice, self.bob, subject="New")
+
+        self.assertTrue(Conversation.objects.visible_to(self.bob).exists())
+        self.assertEqual(
+            list(Message.objects.visible_to(self.bob).values_list("subject")),
+            [("New",)],
+        )
+        self.assertEqual(Conversation.objects.get().unread_for(self.bob), 1)
+
+    def test_deleting_user_removes_threads(self):
+        """A deleted user's threads and messages go in bulk with them"""
+        carol = User.objects.create_user(username="carol", password="pass123")
+        self.send(self.alice, self.bob)
+        self.send(self.bob, self.alice)
+        self.send(carol, self.bob)
+
+        self.alice.delete()
+
+        self.assertEqual(
+            list(Conversation.objects.values_list("first_user", "second_user")),
+            [(self.bob.pk, carol.pk)],
+        )
+        self.assertEqual(Message.objects.count(), 1)
+        self.assertEqual(Conversation.objects.unread_total(self.bob), 1)
+
+    def test_queryset_delete_recounts_thread(self):
+        """Bulk deleting messages recounts the threads they were in"""
+        first = self.send(self.alice, self.bob)
+        self.send(self.alice, self.bob)
+
+        Message.objects.exclude(pk=first.pk).delete()
+
+        conversation = Conversation.objects.get()
+        self.assertEqual(conversation.last_message, first)
+        self.assertEqual(conversation.unread_for(self.bob), 1)
+
+    def test_direct_thread_is_unique(self):
+        """The pair can't have two threads without a skill"""
+        self.send(self.alice, self.bob)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Conversation.objects.create(first_user=self.alice, second_user=self.bob)
+
+
+class SkillRatingTotalsTest(TestCase):
+    """Test cases for the stored rating_sum/rating_count columns on Skill"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.owner = User.objects.create_user(username="totalsowner", password="pass")
+        self.raters = [
+            User.objects.create_user(username=f"totalsrater{i}", password="pass")
+            for i in range(2)
+        ]
+        self.skill = Skill.objects.create(
+            user=self.owner,
+            title="Pottery",
+            description="Wheel throwing",
+            skill_type="offer",
+            category="crafts",
+        )
+
+    def stored(self):
+        return Skill.objects.values_list("rating_sum", "rating_count").get(
+            pk=self.skill.pk
+        )
+
+    def test_create_change_and_delete_update_totals(self):
+        """Test every kind of rating change is applied to the stored totals"""
+        rating = Rating.objects.create(skill=self.skill, user=self.raters[0], rating=4)
+        Rating.objects.create(skill=self.skill, user=self.raters[1], rating=2)
+        self.assertEqual(self.stored(), (6, 2))
+
+        rating = Rating.objects.get(pk=rating.pk)
+        rating.rating = 5
+        rating.save()
+        self.assertEqual(self.stored(), (7, 2))
+
+        rating.delete()
+        self.assertEqual(self.stored(), (2, 1))
+
+    def test_loaded_skill_is_kept_in_step(self):
+        """Test the skill instance attached to the rating sees the new totals"""
+        Rating.objects.create(skill=self.skill, user=self.raters[0], rating=3)
+        self.assertEqual((self.skill.rating_sum, self.skill.rating_count), (3, 1))
+        self.assertEqual(self.skill.average_rating, 3.0)
+
+    def test_rating_without_loaded_state_is_recounted(self):
+        """Test saving a rating built by hand falls back to a recount"""
+        rating = Rating.objects.create(skill=self.skill, user=self.raters[0], rating=3)
+        Rating(
+            pk=rating.pk,
+            skill=self.skill,
+            user=self.raters[0],
+            rating=1,
+            created_at=rating.created_at,
+        ).save()
+        self.assertEqual(self.stored(), (1, 1))
+
+    def test_stale_skill_save_keeps_totals(self):
+        """Test saving an old copy of the skill doesn't overwrite newer totals"""
+        stale = Skill.objects.get(pk=self.skill.pk)
+        Rating.objects.create(skill=self.skill, user=self.raters[0], rating=5)
+
+        stale.title = "Pottery for beginners"
+        stale.save()
+
+        self.assertEqual(self.stored(), (5, 1))
+        self.assertEqual(Skill.objects.get(pk=self.skill.pk).title, stale.title)
+
+    def stars(self, skill=None):
+        return Skill.objects.values_list(
+            "ratings_1", "ratings_2", "ratings_3", "ratings_4", "ratings_5"
+        ).get(pk=(skill or self.skill).pk)
+
+    def test_star_counters_follow_ratings(self):
+        """Test the histogram counters through create, change, move and delete"""
+        rating = Rating.objects.create(skill=self.skill, user=self.raters[0], rating=4)
+        Rating.objects.create(skill=self.skill, user=self.raters[1], rating=4)
+        self.assertEqual(self.stars(), (0, 0, 0, 2, 0))
+
+        rating = Rating.objects.get(pk=rating.pk)
+        rating.rating = 1
+        rating.save()
+        self.assertEqual(self.stars(), (1, 0, 0, 1, 0))
+
+        other = Skill.objects.create(
+            user=self.owner,
+            title="Kiln",
+            description="Firing",
+            skill_type="offer",
+            category="crafts",
+        )
+        rating.skill = other
+        rating.save()
+        self.assertEqual(self.stars(), (0, 0, 0, 1, 0))
+        self.assertEqual(self.stars(other), (1, 0, 0, 0, 0))
+
+        rating.delete()
+        self.assertEqual(self.stars(other), (0, 0, 0, 0, 0))
+
+    def test_recount_restores_star_counters(self):
+        """Test a recount rebuilds the counters from the Rating rows"""
+        rating = Rating.objects.create(skill=self.skill, user=self.raters[0], rating=2)
+        Skill.objects.filter(pk=self.skill.pk).update(ratings_2=0, ratings_5=3)
+        Rating(
+            pk=rating.pk,
+            skill=self.skill,
+            user=self.raters[0],
+            rating=3,
+            created_at=rating.created_at,
+        ).save()
+        self.assertEqual(self.stars(), (0, 0, 1, 0, 0))
+
+    def test_rating_histogram(self):
+        """Test rating_histogram lists 5 stars first with shares of the total"""
+        Rating.objects.create(skill=self.skill, user=self.raters[0], rating=5)
+        Rating.objects.create(skill=self.skill, user=self.raters[1], rating=2)
+        self.assertEqual(
+            self.skill.rating_histogram,
+            [(5, 1, 50), (4, 0, 0), (3, 0, 0), (2, 1, 50), (1, 0, 0)],
+        )
+
+    def test_with_ratings_annotates_average(self):
+        """Test with_ratings() computes the average in the skill SELECT"""
+        Rating.objects.create(skill=self.skill, user=self.raters[0], rating=4)
+        Rating.objects.create(skill=self.skill, user=self.raters[1], rating=3)
+        unrated = Skill.objects.create(
+            user=self.owner,
+            title="Glazing",
+            description="Colours",
+            skill_type="offer",
+            category="crafts",
+        )
+
+        with self.assertNumQueries(1):
+            skills = {
+                skill.pk: skill
+                for skill in Skill.objects.with_ratings().only("id", "rating_count")
+            }
+            self.assertEqual(skills[self.skill.pk].rating_average, 3.5)
+            self.assertEqual(skills[self.skill.pk].average_rating, 3.5)
+            self.assertEqual(skills[unrated.pk].average_rating, 0.0)
+
+    def test_average_rating_reads_no_ratings(self):
+        """Test average_rating and rating_count don't query the ratings table"""
+        Rating.objects.create(skill=self.skill, user=self.raters[0], rating=4)
+        skill = Skill.objects.get(pk=self.skill.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(skill.average_rating, 4.0)
+            self.assertEqual(skill.rating_count, 1)
+
+
+class SkillScoreTest(TestCase):
+    """Test cases for the stored best-match ranking score"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.owner = User.objects.create_user(username="scoreowner", password="pass")
+        self.rater = User.objects.create_user(username="scorerater", password="pass")
+        self.skill = Skill.objects.create(
+            user=self.owner,
+            title="Woodworking",
+            description="Joinery",
+            skill_type="offer",
+            category="crafts",
+        )
+
+    def score(self):
+        return Skill.objects.values_list("score", flat=True).get(pk=self.skill.pk)
+
+    def test_new_skill_gets_prior_score(self):
+        """Test an unrated new skill scores the prior rating plus full recency"""
+        self.assertAlmostEqual(
+            self.score(), skill_score(0, 0, timezone.now()), places=3
+        )
+
+    def test_ratings_update_score(self):
+        """Test adding, changing and deleting ratings refreshes the score"""
+        unrated = self.score()
+        rating = Rating.objects.create(skill=self.skill, user=self.rater, rating=5)
+        self.assertGreater(self.score(), unrated)
+
+        rating.rating = 1
+        rating.save()
+        self.assertLess(self.score(), unrated)
+
+        rating.delete()
+        self.assertAlmostEqual(self.score(), unrated, places=3)
+
+    def test_one_rating_is_smoothed(self):
+        """Test a single 5-star rating moves the average only part way"""
+        self.assertAlmostEqual(bayesian_rating(5, 1), (5 * 3.0 + 5) / 6)
+        self.assertLess(bayesian_rating(5, 1), bayesian_rating(50, 10))
+
+    def test_recompute_command_applies_recency_decay(self):
+        """Test the periodic recompute lowers the score of old skills"""
+        fresh = self.score()
+        Skill.objects.filter(pk=self.skill.pk).update(
+            created_at=timezone.now() - timedelta(days=30)
+        )
+        call_command("recompute_skill_scores", stdout=StringIO())
+
+        self.assertAlmostEqual(fresh - self.score(), 0.3 * 0.5, places=3)
+
+
+class ProfileRatingTest(TestCase):
+    """Test cases for the stored overall rating on Profile"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.owner = User.objects.create_user(username="ratingowner", password="pass")
+        self.raters = [
+            User.objects.create_user(username=f"profilerater{i}", password="pass")
+            for i in range(2)
+        ]
+        self.skill = Skill.objects.create(
+            user=self.owner,
+            title="Baking",
+            description="Bread",
+            skill_type="offer",
+            category="cooking",
+        )
+        self.other_skill = Skill.objects.create(
+            user=self.owner,
+            title="Knitting",
+            description="Scarves",
+            skill_type="offer",
+            category="crafts",
+        )
+
+    def stored(self):
+        return Profile.objects.values_list(
+            "rating_sum", "total_ratings", "overall_rating"
+        ).get(user=self.owner)
+
+    def test_rating_changes_update_profile(self):
+        """Test creating, changing and deleting ratings update the profile"""
+        rating = Rating.objects.create(skill=self.skill, user=self.raters[0], rating=4)
+        Rating.objects.create(skill=self.other_skill, user=self.raters[1], rating=3)
+        self.assertEqual(self.stored(), (7, 2, 3.5))
+
+        rating = Rating.objects.get(pk=rating.pk)
+        rating.rating = 5
+        rating.save()
+        self.assertEqual(self.stored(), (8, 2, 4.0))
+
+        rating.delete()
+        self.assertEqual(self.stored(), (3, 1, 3.0))
+
+    def test_skill_toggles_move_its_ratings(self):
+        """Test deactivating or turning a skill into a request drops its ratings"""
+        Rating.objects.create(skill=self.skill, user=self.raters[0], rating=5)
+        Rating.objects.create(skill=self.other_skill, user=self.raters[0], rating=1)
+
+        skill = Skill.objects.get(pk=self.skill.pk)
+        skill.is_active = False
+        skill.save()
+        self.assertEqual(self.stored(), (1, 1, 1.0))
+
+        skill.is_active = True
+        skill.save()
+        self.assertEqual(self.stored(), (6, 2, 3.0))
+
+        other = Skill.objects.get(pk=self.other_skill.pk)
+        other.skill_type = "request"
+        other.save()
+        self.assertEqual(self.stored(), (5, 1, 5.0))
+
+    def test_deleting_skill_drops_its_ratings(self):
+        """Test a deleted skill's ratings leave the overall rating"""
+        Rating.objects.create(skill=self.skill, user=self.raters[0], rating=5)
+        Rating.objects.create(skill=self.other_skill, user=self.raters[0], rating=2)
+
+        Skill.objects.get(pk=self.skill.pk).delete()
+        self.assertEqual(self.stored(), (2, 1, 2.0))
+
+        Skill.objects.get(pk=self.other_skill.pk).delete()
+        self.assertEqual(self.stored(), (0, 0, 0.0))
+
+    def test_stale_profile_save_keeps_rating(self):
+        """Test re-saving the user from an old copy keeps the stored rating"""
+        stale = User.objects.get(pk=self.owner.pk)
+        stale.profile  # Loaded before the rating below
+        Rating.objects.create(skill=self.skill, user=self.raters[0], rating=4)
+
+        stale.first_name = "Stale"
+        stale.save()
+
+        self.assertEqual(self.stored(), (4, 1, 4.0))
+
+    def test_loaded_profile_is_kept_in_step(self):
+        """Test the owner's profile attached to the rated skill sees the change"""
+        profile = self.owner.profile
+        Rating.objects.create(skill=self.skill, user=self.raters[0], rating=4)
+        self.assertEqual((profile.total_ratings, profile.overall_rating), (1, 4.0))
+
+    def test_overall_rating_reads_no_ratings(self):
+        """Test overall_rating is a stored column, not an aggregate"""
+        Rating.objects.create(skill=self.skill, user=self.raters[0], rating=4)
+        profile = Profile.objects.get(user=self.owner)
+        with self.assertNumQueries(0):
+            self.assertEqual(profile.overall_rating, 4.0)
+            self.assertEqual(profile.total_ratings, 1)
+
+
+class LeaderboardTest(TestCase):
+    """Test cases for the precomputed top rated boards"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.owner = User.objects.create_user(username="boardowner", password="pass")
+        self.raters = [
+            User.objects.create_user(username=f"boardrater{i}", password="pass")
+            for i in range(3)
+        ]
+
+    def add_skill(self, title, *ratings, category="music", skill_type="offer"):
+        skill = Skill.objects.create(
+            user=self.owner,
+            title=title,
+            description=title,
+            skill_type=skill_type,
+            category=category,
+        )
+        for rater, rating in zip(self.raters, ratings):
+            Rating.objects.create(skill=skill, user=rater, rating=rating)
+        return skill
+
+    def board(self, category="music", skill_type="offer"):
+        return list(
+            LeaderboardEntry.objects.filter(
+                category=category, skill_type=skill_type
+            ).values_list("rank", "skill__title")
+        )
+
+    def test_ratings_rank_skills_by_weighted_rating(self):
+        """Test rated skills are listed best first and unrated ones are not"""
+        self.add_skill("Piano", 5, 5, 4)
+        self.add_skill("Violin", 5)
+        self.add_skill("Drums")
+        # A lone 5 is smoothed below 5, 5, 4: (15 + 5) / 6 < (15 + 14) / 8
+        self.assertEqual(self.board(), [(1, "Piano"), (2, "Violin")])
+
+    def test_rating_changes_rerank(self):
+        """Test changing and deleting ratings reorders the board"""
+        piano = self.add_skill("Piano", 3)
+        self.add_skill("Violin", 4)
+        rating = Rating.objects.get(skill=piano)
+        rating.rating = 5
+        rating.save()
+        self.assertEqual(self.board(), [(1, "Piano"), (2, "Violin")])
+
+        rating.delete()
+        self.assertEqual(self.board(), [(1, "Violin")])
+
+    def test_board_keeps_top_entries_only(self):
+        """Test a full board only takes skills that beat its lowest entry"""
+        for index in range(LEADERBOARD_SIZE):
+            self.add_skill(f"Listed {index}", 4)
+        self.add_skill("Weak", 1)
+        self.assertEqual(len(self.board()), LEADERBOARD_SIZE)
+        self.assertNotIn("Weak", [title for _, title in self.board()])
+
+        self.add_skill("Strong", 5, 5)
+        self.assertEqual(self.board()[0], (1, "Strong"))
+        self.assertEqual(len(self.board()), LEADERBOARD_SIZE)
+
+    def test_rating_change_rewrites_moved_ranks_only(self):
+        """Test a listed skill moving up leaves the entries below it alone"""
+        for index in range(LEADERBOARD_SIZE - 1):
+            self.add_skill(f"Listed {index}", 4)
+        self.add_skill("Climber", 3)
+        below = dict(
+            LeaderboardEntry.objects.filter(rank__gt=3).values_list("skill_id", "pk")
+        )
+        rating = Rating.objects.get(skill__title=self.board()[2][1])
+
+        with patch("core.leaderboard._next_candidates") as next_candidates:
+            rating.rating = 5
+            rating.save()
+        next_candidates.assert_not_called()
+
+        self.assertEqual(self.board()[0], (1, rating.skill.title))
+        self.assertEqual(
+            dict(
+                LeaderboardEntry.objects.filter(rank__gt=3).values_list(
+                    "skill_id", "pk"
+                )
+            ),
+            below,
+        )
+
+    def test_dropped_entry_is_replaced_by_next_candidate(self):
+        """Test a listed skill falling below an unlisted one swaps places"""
+        for index in range(LEADERBOARD_SIZE):
+            self.add_skill(f"Listed {index}", 4)
+        self.add_skill("Waiting", 3)
+        rating = Rating.objects.get(skill__title="Listed 0")
+        rating.rating = 1
+        rating.save()
+
+        titles = [title for _, title in self.board()]
+        self.assertEqual(len(titles), LEADERBOARD_SIZE)
+        self.assertEqual(titles[-1], "Waiting")
+        self.assertNotIn("Listed 0", titles)
+
+        board = self.board()
+        rebuild_leaderboards()
+        self.assertEqual(self.board(), board)
+
+    def test_skill_changes_move_entries(self):
+        """Test deactivating, recategorizing and deleting skills update boards"""
+        piano = self.add_skill("Piano", 5)
+        self.add_skill("Violin", 3)
+
+        piano = Skill.objects.get(pk=piano.pk)
+        piano.category = "academic"
+        piano.save()
+        self.assertEqual(self.board(), [(1, "Violin")])
+        self.assertEqual(self.board("academic"), [(1, "Piano")])
+
+        piano.is_active = False
+        piano.save()
+        self.assertEqual(self.board("academic"), [])
+
+        Skill.objects.get(title="Violin").delete()
+        self.assertEqual(self.board(), [])
+
+    def test_rebuild_command(self):
+        """Test the command restores boards changed behind the signals' back"""
+        self.add_skill("Piano", 4)
+        self.add_skill("Guitar", 5, category="music", skill_type="request")
+        LeaderboardEntry.objects.all().delete()
+
+        call_command("rebuild_leaderboards", stdout=StringIO())
+
+        self.assertEqual(self.board(), [(1, "Piano")])
+        self.assertEqual(self.board(skill_type="request"), [(1, "Guitar")])
+
+
+class ReconcileCountersTest(TestCase):
+    """Test cases for the reconcile_counters command"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.owner = User.objects.create_user(username="driftowner", password="pass")
+        rater = User.objects.create_user(username="driftrater", password="pass")
+        self.skills = []
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(5):
+                skill = Skill.objects.create(
+                    user=self.owner,
+                    title=f"Drift {index}",
+                    description="Drift",
+                    skill_type="offer",
+                    category="other",
+                )
+                Rating.objects.create(skill=skill, user=rater, rating=index + 1)
+                self.skills.append(skill)
+        self.correct = self.snapshot()
+
+    def snapshot(self):
+        return (
+            list(
+                Skill.objects.order_by("pk").values_list(
+                    "rating_sum", "rating_count", "ratings_1", "ratings_5"
+                )
+            ),
+            list(
+                Profile.objects.order_by("pk").values_list(
+                    "rating_sum",
+                    "total_ratings",
+                    "overall_rating",
+                    "skills_offered",
+                    "skills_needed",
+                )
+            ),
+        )
+
+    def drift(self):
+        Skill.objects.filter(pk=self.skills[0].pk).update(rating_sum=40, ratings_1=0)
+        Skill.objects.filter(pk=self.skills[4].pk).update(ratings_5=2)
+        Profile.objects.filter(user=self.owner).update(
+            overall_rating=1.5, skills_needed="Ghost"
+        )
+
+    def test_fixes_drifted_rows(self):
+        """Test drifted counters are rewritten and the count is reported"""
+        self.drift()
+        out = StringIO()
+        call_command("reconcile_counters", "--chunk-size", "2", stdout=out)
+
+        self.assertEqual(self.snapshot(), self.correct)
+        self.assertIn(
+            "skill_ratings: 3/3 chunks, 5 rows checked, 2 drifted", out.getvalue()
+        )
+        self.assertIn("Fixed 4 rows", out.getvalue())
+
+    def test_dry_run_changes_nothing(self):
+        """Test --dry-run reports the drift without fixing it"""
+        self.drift()
+        drifted = self.snapshot()
+        out = StringIO()
+        call_command("reconcile_counters", "--dry-run", stdout=out)
+
+        self.assertEqual(self.snapshot(), drifted)
+        # Completion is checked against the still drifted skills text
+        self.assertIn("Dry run: 5 rows would be fixed", out.getvalue())
+
+    def test_clean_tables_write_nothing(self):
+        """Test nothing is updated when every counter is already right"""
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("Fixed 0 rows", out.getvalue())
+
+    def test_fixes_drifted_completion(self):
+        """Test stored profile completion is recomputed from the profile"""
+        Profile.objects.filter(user=self.owner).update(
+            completion_percentage=90, is_profile_complete=True
+        )
+        out = StringIO()
+        call_command("reconcile_counters", "--only", "profile_completion", stdout=out)
+
+        profile = Profile.objects.get(user=self.owner)
+        self.assertEqual(
+            (profile.completion_percentage, profile.is_profile_complete), (12, False)
+        )
+        self.assertIn("Fixed 1 rows", out.getvalue())
+
+    def test_fixes_drifted_conversations(self):
+        """Test thread counters and last message pointers are recounted"""
+        rater = User.objects.get(username="driftrater")
+        first = Message.objects.create(
+            sender=rater, receiver=self.owner, subject="Hi", message="Hello"
+        )
+        last = Message.objects.create(
+            sender=self.owner, receiver=rater, subject="Re", message="Hey"
+        )
+        conversation = first.conversation
+        Conversation.objects.filter(pk=conversation.pk).update(
+            first_unread=7, second_unread=0, last_message=first
+        )
+        out = StringIO()
+        call_command("reconcile_counters", "--only", "conversations", stdout=out)
+
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.unread_for(self.owner), 1)
+        self.assertEqual(conversation.unread_for(rater), 1)
+        self.assertEqual(conversation.last_message, last)
+        self.assertIn("Fixed 1 rows", out.getvalue())
+
+
+class CleanupProfilesCommandTest(TestCase):
+    """Test cases for the cleanup_profiles command"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.complete = User.objects.create_user(
+            username="complete", first_name="Ada", last_name="Lovelace"
+        )
+        profile = self.complete.profile
+        profile.city = "London"
+        profile.country = "UK"
+        profile.skills_offered = "Maths"
+        profile.save()
+        self.incomplete = User.objects.create_user(username="incomplete")
+
+    def test_stats_from_stored_columns(self):
+        """Test --stats counts completion with one aggregate query"""
+        out = StringIO()
+        with self.assertNumQueries(1):
+            call_command("cleanup_profiles", "--stats", stdout=out)
+
+        self.assertIn("Complete Profiles: 1 (50.0%)", out.getvalue())
+        self.assertIn("60-79%: 1 users", out.getvalue())
+        self.assertIn("0-19%: 1 users", out.getvalue())
+
+    def test_delete_removes_only_incomplete(self):
+        """Test --delete selects incomplete profiles in SQL"""
+        call_command("cleanup_profiles", "--delete", stdout=StringIO())
+
+        self.assertEqual(
+            list(User.objects.values_list("username", flat=True)), ["complete"]
+        )
+
+
 class RatingModelTest(TestCase):
     """Test cases for Rating model functionality"""
 
@@ -430,15 +1446,16 @@ class SignalTest(TestCase):
         self.assertEqual(profile.skills_needed, "")
 
         # Create a skill
-        skill = Skill.objects.create(
-            user=user,
-            title="Python",
-            description="Programming",
-            skill_type="offer",
-            category="technology",
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            skill = Skill.objects.create(
+                user=user,
+                title="Python",
+                description="Programming",
+                skill_type="offer",
+                category="technology",
+            )
 
-        # Profile should be updated automatically
+        # Profile should be updated automatically on commit
         profile.refresh_from_db()
         self.assertEqual(profile.skills_offered, "Python")
 
@@ -446,20 +1463,21 @@ class SignalTest(TestCase):
         """Test that profile skills are updated when Skill is deleted"""
         user = User.objects.create_user(username="testuser", password="pass")
 
-        skill1 = Skill.objects.create(
-            user=user,
-            title="Python",
-            description="Programming",
-            skill_type="offer",
-            category="technology",
-        )
-        skill2 = Skill.objects.create(
-            user=user,
-            title="JavaScript",
-            description="Web dev",
-            skill_type="offer",
-            category="technology",
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            skill1 = Skill.objects.create(
+                user=user,
+                title="Python",
+                description="Programming",
+                skill_type="offer",
+                category="technology",
+            )
+            skill2 = Skill.objects.create(
+                user=user,
+                title="JavaScript",
+                description="Web dev",
+                skill_type="offer",
+                category="technology",
+            )
 
         profile = user.profile
         profile.refresh_from_db()
@@ -467,8 +1485,87 @@ class SignalTest(TestCase):
         self.assertIn("JavaScript", profile.skills_offered)
 
         # Delete one skill
-        skill1.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            skill1.delete()
 
         profile.refresh_from_db()
         self.assertNotIn("Python", profile.skills_offered)
         self.assertIn("JavaScript", profile.skills_offered)
+
+
+class SkillSummarySyncTest(TestCase):
+    """Test cases for the coalesced profile skill summary sync"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username="summaryuser", password="pass")
+
+    def create_skills(self, count, skill_type="offer"):
+        for index in range(count):
+            Skill.objects.create(
+                user=self.user,
+                title=f"{skill_type.title()} {index}",
+                description="Summary",
+                skill_type=skill_type,
+                category="other",
+            )
+
+    def summary_updates(self, queries):
+        return [
+            q["sql"]
+            for q in queries
+            if q["sql"].startswith('UPDATE "core_profile"')
+            and "skills_offered" in q["sql"]
+        ]
+
+    def test_burst_rebuilds_summary_once(self):
+        """Test several skill writes in one transaction rebuild the summary once"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_skills(3)
+            self.create_skills(1, "request")
+        flushes = [c for c in callbacks if c is flush_skill_summaries]
+        self.assertTrue(flushes)
+
+        with CaptureQueriesContext(connection) as queries:
+            for callback in flushes:
+                callback()
+
+        self.assertEqual(len(self.summary_updates(queries)), 1)
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.skills_offered.count(","), 2)
+        self.assertEqual(profile.skills_needed, "Request 0")
+
+    def test_rolled_back_writes_are_requeued(self):
+        """Test a rollback doesn't leave later writes waiting on a dropped sync"""
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.create_skills(1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.create_skills(1, "request")
+
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(
+            (profile.skills_offered, profile.skills_needed), ("", "Request 0")
+        )
+
+    def test_bulk_skill_changes_defers_to_exit(self):
+        """Test the bulk context manager queues one sync per user on exit"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            with bulk_skill_changes():
+                self.create_skills(3)
+        # Registered once, on exit, instead of per skill
+        self.assertEqual(
+            [c for c in callbacks if c is flush_skill_summaries],
+            [flush_skill_summaries],
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            flush_skill_summaries()
+
+        self.assertEqual(len(self.summary_updates(queries)), 1)
+        self.assertEqual(
+            Profile.objects.get(user=self.user).skills_offered.count(","), 2
+        )
@@ -0,0 +1,160 @@
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from core.models import Profile, Skill, Message, Rating
+from unittest import skipUnless
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite syntax")
+class QueryPlanTest(TestCase):
+    """Test that the views' queries are served by indexes, not table scans"""
+
+    # Tables a view may legitimately read in full, with the reason
+    ALLOWED_SCANS = {
+        # The user directory walks Django's user table in primary key order
+        # and counts it once for the first page; core can't index auth_user
+        "auth_user": "user directory",
+    }
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="planuser", password="testpass123", first_name="Plan"
+        )
+        self.other = User.objects.create_user(
+            username="otheruser", password="testpass123", first_name="Other"
+        )
+        self.other.profile.city = "Stockholm"
+        self.other.profile.gender = "F"
+        self.other.profile.save()
+        self.skill = Skill.objects.create(
+            user=self.other,
+            title="Python Programming",
+            description="Learn Python basics",
+            skill_type="offer",
+            category="technology",
+        )
+        Skill.objects.create(
+            user=self.user,
+            title="Guitar",
+            description="Chords",
+            skill_type="request",
+            category="music",
+        )
+        Rating.objects.create(skill=self.skill, user=self.user, rating=5)
+        self.message = Message.objects.create(
+            sender=self.other, receiver=self.user, subject="Hi", message="Hello"
+        )
+        Message.objects.create(
+            sender=self.user, receiver=self.other, subject="Re", message="Hey"
+        )
+        # Enough rows for more than one page, so the first-page counts run too
+        extra_users = User.objects.bulk_create(
+            User(username=f"planfiller{index}") for index in range(13)
+        )
+        Profile.objects.bulk_create(Profile(user=user) for user in extra_users)
+        Skill.objects.bulk_create(
+            Skill(
+                user=self.other,
+                title=f"Filler {index}",
+                description="Filler",
+                skill_type="offer",
+                category="technology",
+            )
+            for index in range(13)
+        )
+        self.client.login(username="planuser", password="testpass123")
+
+    def full_scans(self, sql, params):
+        """Return the plan lines that read a whole table without an index"""
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        scans = []
+        for line in plan:
+            # "SCAN t USING [COVERING] INDEX" walks an index and full-text
+            # lookups show up as "SCAN t VIRTUAL TABLE INDEX"
+            if not line.startswith("SCAN ") or " USING " in line or " VIRTUAL " in line:
+                continue
+            if line.split()[1] in self.ALLOWED_SCANS:
+                continue
+            scans.append(line)
+        return scans
+
+    def assertNoFullScans(self, url):
+        """Request url and EXPLAIN every SELECT it ran"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        problems = []
+        for query in queries.captured_queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT"):
+                continue
+            problems.extend(f"{line}: {sql}" for line in self.full_scans(sql, ()))
+        self.assertEqual(problems, [], f"Full table scans for {url}")
+
+    def test_skills_list(self):
+        for query in (
+            "",
+            "?type=offer",
+            "?category=technology",
+            "?type=offer&category=technology",
+            "?search=python",
+            "?search=pyhton",
+            "?location=stock",
+            "?gender=F",
+            "?sort=best",
+            "?search=python&sort=best",
+        ):
+            with self.subTest(query=query):
+                cache.clear()
+                self.assertNoFullScans(reverse("skills_list_search") + query)
+
+    def test_skill_leaderboard(self):
+        self.assertNoFullScans(reverse("skill_leaderboard", args=["technology"]))
+
+    def test_skill_detail(self):
+        self.assertNoFullScans(reverse("skill_detail_page", args=[self.skill.pk]))
+
+    def test_my_skills(self):
+        self.assertNoFullScans(reverse("my_skills"))
+
+    def test_inbox(self):
+        self.assertNoFullScans(reverse("inbox"))
+
+    def test_view_conversation(self):
+        self.assertNoFullScans(
+            reverse("view_conversation", args=[self.message.conversation_id])
+        )
+
+    def test_sent_messages(self):
+        self.assertNoFullScans(reverse("sent_messages"))
+
+    def test_view_message(self):
+        self.assertNoFullScans(reverse("view_message", args=[self.message.pk]))
+
+    def test_rate_skill(self):
+        self.assertNoFullScans(reverse("rate_skill", args=[self.skill.pk]))
+
+    def test_profiles(self):
+        self.assertNoFullScans(reverse("view_my_profile"))
+        self.assertNoFullScans(reverse("view_user_profile", args=[self.other.pk]))
+
+    def test_user_search(self):
+        for query in (
+            "",
+            "?search=plan",
+            "?location=stock",
+            "?gender=F",
+            "?sort=top",
+            "?complete=1",
+        ):
+            with self.subTest(query=query):
+                self.assertNoFullScans(reverse("search") + query)
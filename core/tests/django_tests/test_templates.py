@@ -4,7 +4,12 @@ from django.urls import reverse
 from django.template.loader import render_to_string
 from django.template import Context, Template
 from core.models import Profile, Skill, Message, Rating
-from core.templatetags.rating_extras import star_rating, filled_stars, empty_stars
+from core.templatetags.rating_extras import (
+    _render_star_rating,
+    star_rating,
+    filled_stars,
+    empty_stars,
+)
 from core.templatetags.core_extras import get_item
 
 
@@ -78,6 +83,20 @@ class TemplateRenderingTest(TestCase):
         # Check pagination context
         self.assertTrue("page_obj" in response.context)
 
+    def test_directory_card_skill_tags(self):
+        """Test directory cards show the stored skill summary"""
+        profile = self.user.profile
+        profile.skills_offered = "Python, Django, SQL, Rust, Go"
+        profile.skills_needed = "Chess"
+        profile.save(update_fields=["skills_offered", "skills_needed"])
+
+        response = self.client.get(reverse("search"))
+
+        self.assertContains(response, "user-card-skill-tag offered", count=3)
+        self.assertContains(response, "+2 more")
+        self.assertContains(response, '<span class="user-card-skill-tag needed">Chess')
+        self.assertNotContains(response, "Rust")
+
     def test_message_template_context(self):
         """Test message templates render correctly"""
         self.client.login(username="testuser", password="testpass123")
@@ -134,6 +153,47 @@ class TemplateTagTest(TestCase):
         self.assertIn("fa-solid fa-star", result)
         self.assertIn("fa-regular fa-star", result)
 
+    def test_star_rating_matches_template(self):
+        """Test the memoized tag renders exactly what the template renders"""
+        for rating, show_value, show_count, count in (
+            (0, True, True, 0),
+            (4.25, True, False, 0),
+            (3.5, False, False, 0),
+            (4.96, True, True, 12),
+            (1, True, True, 1),
+        ):
+            with self.subTest(rating=rating):
+                full = int(rating)
+                half = rating - full >= 0.5
+                expected = render_to_string(
+                    "core/components/star_rating.html",
+                    {
+                        "rating": rating,
+                        "full_stars": range(full),
+                        "half_star": half,
+                        "empty_stars": range(5 - full - half),
+                        "show_value": show_value,
+                        "show_count": show_count,
+                        "count": count,
+                    },
+                )
+                self.assertHTMLEqual(
+                    star_rating(rating, show_value, show_count, count), expected
+                )
+
+    def test_star_rating_reuses_fragments(self):
+        """Test cards with the same stars share one rendered fragment"""
+        _render_star_rating.cache_clear()
+        for rating in (4.0, 4.2, 4.4, 4.1):
+            star_rating(rating, show_value=False, show_count=False)
+        info = _render_star_rating.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 3))
+
+        html = Template(
+            "{% load rating_extras %}{% star_rating 4.25 show_count=False %}"
+        ).render(Context())
+        self.assertIn("4.3", html)
+
     def test_filled_stars_tag(self):
         """Test filled_stars template tag"""
         self.assertEqual(filled_stars(3.7), 4)  # Should round up
@@ -1,10 +1,24 @@
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.core.cache import cache
+from django.core.management import call_command
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.http import Http404
-from core.models import Profile, Skill, Message, Rating
+from core.models import Conversation, Profile, Skill, Message, Rating
 from core.forms import CustomUserCreationForm, ProfileForm, SkillForm
+from core.autocomplete import LOCATIONS, SKILL_TITLES
+from core.search_cache import (
+    GENERATION_KEY,
+    SKILL_RESULTS,
+    bump_generation,
+    get_generation,
+)
+from core.unread import unread_count
 import json
+from io import StringIO
+from unittest.mock import patch
 
 
 class AuthenticationViewTest(TestCase):
@@ -43,6 +57,20 @@ class AuthenticationViewTest(TestCase):
         new_user = User.objects.get(username="newuser")
         self.assertTrue(hasattr(new_user, "profile"))
 
+    def test_login_does_not_write_profile(self):
+        """Test a login saves last_login without reading or rewriting the profile"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("login"),
+                {"username": "testuser", "password": "testpass123"},
+            )
+
+        self.assertEqual(response.status_code, 302)
+        sql = [q["sql"] for q in queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual([q for q in sql if "core_profile" in q], [])
+        # User lookup, last_login update and the session writes
+        self.assertEqual(len(sql), 5, "\n".join(sql))
+
     def test_signup_view_post_invalid(self):
         """Test SignupView POST with invalid data"""
         data = {
@@ -165,6 +193,7 @@ class SkillViewTest(TestCase):
     def setUp(self):
         """Set up test data"""
         self.client = Client()
+        cache.clear()
         self.user = User.objects.create_user(
             username="testuser", password="testpass123"
         )
@@ -249,6 +278,139 @@ class SkillViewTest(TestCase):
         self.assertContains(response, "Python Programming")
         self.assertNotContains(response, "Spanish Lessons")
 
+    def test_skills_list_search_full_text(self):
+        """Test skills_list_search keyword search uses word prefixes"""
+        Skill.objects.create(
+            user=self.other_user,
+            title="Spanish Lessons",
+            description="Learn Spanish",
+            skill_type="request",
+            category="languages",
+        )
+
+        response = self.client.get(reverse("skills_list_search") + "?search=pyth")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Python Programming")
+        self.assertNotContains(response, "Spanish Lessons")
+        self.assertEqual(response.context["total_skills"], 1)
+
+    def test_skills_list_search_ranks_title_matches_first(self):
+        """Test search results are ordered by relevance, not creation date"""
+        Skill.objects.create(
+            user=self.other_user,
+            title="Cooking Basics",
+            description="We cook while listening to Python podcasts",
+            skill_type="offer",
+            category="cooking",
+        )
+
+        response = self.client.get(reverse("skills_list_search") + "?search=python")
+        titles = [skill.title for skill in response.context["skills"]]
+        self.assertEqual(titles, ["Python Programming", "Cooking Basics"])
+
+    def test_skills_list_search_fuzzy_fallback(self):
+        """Test a misspelt search with no exact hits shows similar skills"""
+        response = self.client.get(reverse("skills_list_search") + "?search=pyhton")
+
+        self.assertTrue(response.context["fuzzy_search"])
+        self.assertEqual(response.context["total_skills"], 1)
+        self.assertContains(response, "Python Programming")
+        self.assertContains(response, "No exact matches")
+
+    def test_skills_list_search_exact_hits_skip_fuzzy(self):
+        """Test the fuzzy fallback stays off while the exact search has hits"""
+        response = self.client.get(reverse("skills_list_search") + "?search=python")
+        self.assertFalse(response.context["fuzzy_search"])
+        self.assertNotContains(response, "No exact matches")
+
+    def test_skills_list_search_fuzzy_with_category_filter(self):
+        """Test the fuzzy fallback searches within the selected category"""
+        for title in ("Python", "Python 3"):
+            Skill.objects.create(
+                user=self.other_user,
+                title=title,
+                description="Python",
+                skill_type="offer",
+                category="technology",
+            )
+        Skill.objects.create(
+            user=self.other_user,
+            title="Python cooking",
+            description="Snake recipes from the jungle",
+            skill_type="offer",
+            category="cooking",
+        )
+
+        with patch("core.search.FUZZY_MAX_MATCHES", 2):
+            response = self.client.get(
+                reverse("skills_list_search") + "?search=pyhton&category=cooking"
+            )
+
+        self.assertTrue(response.context["fuzzy_search"])
+        self.assertEqual(
+            [skill.title for skill in response.context["skills"]], ["Python cooking"]
+        )
+        self.assertEqual(response.context["facet_counts"]["category"]["cooking"], 1)
+
+    def test_skills_list_search_best_match_sort(self):
+        """Test sort=best orders by the stored rating/recency score"""
+        rated = Skill.objects.create(
+            user=self.other_user,
+            title="Python Testing",
+            description="Unit tests",
+            skill_type="offer",
+            category="technology",
+        )
+        newest = Skill.objects.create(
+            user=self.other_user,
+            title="Python Packaging",
+            description="Wheels",
+            skill_type="offer",
+            category="technology",
+        )
+        for index in range(3):
+            rater = User.objects.create_user(username=f"rater{index}", password="x")
+            Rating.objects.create(skill=rated, user=rater, rating=5)
+
+        url = reverse("skills_list_search")
+        newest_first = [skill.pk for skill in self.client.get(url).context["skills"]]
+        best_first = [
+            skill.pk for skill in self.client.get(url + "?sort=best").context["skills"]
+        ]
+        best_search = [
+            skill.pk
+            for skill in self.client.get(url + "?search=python&sort=best").context[
+                "skills"
+            ]
+        ]
+
+        self.assertEqual(newest_first[0], newest.pk)
+        self.assertEqual(best_first[0], rated.pk)
+        self.assertEqual(best_search[0], rated.pk)
+        self.assertEqual(
+            self.client.get(url + "?sort=bogus").context["current_sort"], ""
+        )
+
+    def test_skills_list_cards_read_stored_ratings(self):
+        """Test rendering rated skill cards runs no queries on core_rating"""
+        rater = User.objects.create_user(username="cardrater", password="x")
+        for index in range(12):
+            skill = Skill.objects.create(
+                user=self.other_user,
+                title=f"Rated skill {index}",
+                description="Rated",
+                skill_type="offer",
+                category="technology",
+            )
+            Rating.objects.create(skill=skill, user=rater, rating=4)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("skills_list_search"))
+
+        rating_queries = [q for q in queries if "core_rating" in q["sql"]]
+        self.assertEqual(rating_queries, [])
+        self.assertContains(response, "(1)")
+
     def test_skill_detail_page(self):
         """Test skill_detail_page view"""
         response = self.client.get(reverse("skill_detail_page", args=[self.skill.pk]))
@@ -296,6 +458,685 @@ class SkillViewTest(TestCase):
         self.assertContains(response, "Python Programming")
 
 
+class SkillListPaginationTest(TestCase):
+    """Test cases for cursor pagination on skills_list_search"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        cache.clear()
+        self.user = User.objects.create_user(username="pager", password="pass")
+        for index in range(30):
+            Skill.objects.create(
+                user=self.user,
+                title=f"Skill {index:02d}",
+                description="Paged skill",
+                skill_type="offer" if index % 2 else "request",
+                category="other",
+            )
+
+    def get_page(self, query=""):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("skills_list_search") + query)
+        count_queries = [
+            q
+            for q in queries
+            if "COUNT(" in q["sql"].upper() and "GROUP BY" not in q["sql"].upper()
+        ]
+        return response, len(count_queries)
+
+    def test_pages_cover_every_skill_once(self):
+        """Test walking the next cursors visits every skill in order"""
+        seen = []
+        query = ""
+        while True:
+            response, _ = self.get_page(query)
+            page = response.context["page_obj"]
+            seen.extend(skill.title for skill in page)
+            if not page.has_next:
+                break
+            query = f"?cursor={page.next_cursor}"
+
+        expected = [f"Skill {index:02d}" for index in reversed(range(30))]
+        self.assertEqual(seen, expected)
+
+    def test_previous_cursor_returns_previous_page(self):
+        """Test that the previous cursor leads back to the same rows"""
+        first, _ = self.get_page()
+        first_titles = [skill.title for skill in first.context["page_obj"]]
+
+        second, _ = self.get_page(f"?cursor={first.context['page_obj'].next_cursor}")
+        back, _ = self.get_page(f"?cursor={second.context['page_obj'].previous_cursor}")
+
+        self.assertEqual(
+            [skill.title for skill in back.context["page_obj"]], first_titles
+        )
+        self.assertFalse(back.context["page_obj"].has_previous)
+
+    def test_total_is_counted_once(self):
+        """Test that only the first page runs a COUNT query"""
+        first, first_counts = self.get_page()
+        self.assertEqual(first_counts, 1)
+        self.assertEqual(first.context["total_skills"], 30)
+
+        second, second_counts = self.get_page(
+            f"?cursor={first.context['page_obj'].next_cursor}"
+        )
+        self.assertEqual(second_counts, 0)
+        self.assertEqual(second.context["total_skills"], 30)
+
+    def test_cursor_keeps_filters(self):
+        """Test that pagination links keep the active filters"""
+        response, _ = self.get_page("?type=offer")
+        self.assertEqual(response.context["total_skills"], 15)
+        self.assertContains(response, "?type=offer&cursor=")
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        """Test that a malformed cursor shows the first page"""
+        response, _ = self.get_page("?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["page_obj"][0].title, "Skill 29")
+
+
+class SkillLocationFilterTest(TestCase):
+    """Test cases for the indexed location filter on skills_list_search"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        cache.clear()
+        self.user = User.objects.create_user(username="located", password="pass")
+        self.user.profile.city = "Stockholm"
+        self.user.profile.country = "Sweden"
+        self.user.profile.save()
+        self.remote_user = User.objects.create_user(username="remote", password="p")
+
+        Skill.objects.create(
+            user=self.user,
+            title="Swedish Fika",
+            description="Coffee and buns",
+            skill_type="offer",
+            category="cooking",
+        )
+        Skill.objects.create(
+            user=self.remote_user,
+            title="Oslo Hiking",
+            description="Trails around the fjord",
+            skill_type="offer",
+            category="sports",
+            location="Oslo Centrum",
+        )
+
+    def titles(self, location):
+        response = self.client.get(
+            reverse("skills_list_search") + f"?location={location}"
+        )
+        return {skill.title for skill in response.context["skills"]}
+
+    def test_matches_owner_city_and_country(self):
+        """Test location matches the owner's city or country, any case"""
+        self.assertEqual(self.titles("stockholm"), {"Swedish Fika"})
+        self.assertEqual(self.titles("SWEDEN"), {"Swedish Fika"})
+
+    def test_matches_skill_location(self):
+        """Test location matches the skill's own location field"""
+        self.assertEqual(self.titles("oslo"), {"Oslo Hiking"})
+
+    def test_matches_prefix_only(self):
+        """Test that location matches are prefix matches"""
+        self.assertEqual(self.titles("Stock"), {"Swedish Fika"})
+        self.assertEqual(self.titles("holm"), set())
+
+
+class SkillFacetCountTest(TestCase):
+    """Test cases for the filter sidebar facet counts"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        cache.clear()
+        self.alice = User.objects.create_user(username="alice", password="pass")
+        self.alice.profile.gender = "F"
+        self.alice.profile.save()
+        self.bob = User.objects.create_user(username="bob", password="pass")
+        self.bob.profile.gender = "M"
+        self.bob.profile.save()
+
+        for user, title, skill_type, category in [
+            (self.alice, "Python", "offer", "technology"),
+            (self.alice, "Django", "request", "technology"),
+            (self.bob, "Guitar", "offer", "music"),
+            (self.bob, "Rust", "offer", "technology"),
+        ]:
+            Skill.objects.create(
+                user=user,
+                title=title,
+                description="Facet test",
+                skill_type=skill_type,
+                category=category,
+            )
+
+    def get(self, query=""):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("skills_list_search") + query)
+        grouped = [q for q in queries if "GROUP BY" in q["sql"].upper()]
+        return response, len(grouped)
+
+    def test_counts_without_filters(self):
+        """Test every facet is counted from one grouped query"""
+        response, grouped_queries = self.get()
+        counts = response.context["facet_counts"]
+
+        self.assertEqual(grouped_queries, 1)
+        self.assertEqual(counts["category"], {"technology": 3, "music": 1})
+        self.assertEqual(counts["type"], {"offer": 3, "request": 1})
+        self.assertEqual(counts["gender"], {"F": 2, "M": 2})
+        self.assertContains(response, "Music &amp; Arts (1)")
+
+    def test_counts_ignore_own_facet_selection(self):
+        """Test a facet's options are counted under the other facets only"""
+        response, _ = self.get("?category=technology&gender=M")
+        counts = response.context["facet_counts"]
+
+        self.assertEqual(counts["category"], {"technology": 1, "music": 1})
+        self.assertEqual(counts["type"], {"offer": 1})
+        self.assertEqual(counts["gender"], {"F": 2, "M": 1})
+
+    def test_counts_are_cached_until_skills_change(self):
+        """Test repeated requests reuse the counts until a skill is saved"""
+        self.get("?type=offer")
+        _, grouped_queries = self.get("?type=request")
+        self.assertEqual(grouped_queries, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(
+                user=self.alice,
+                title="Chess",
+                description="Facet test",
+                skill_type="offer",
+                category="sports",
+            )
+        response, grouped_queries = self.get("?type=request")
+        self.assertEqual(grouped_queries, 1)
+        self.assertEqual(response.context["facet_counts"]["type"]["offer"], 4)
+
+
+class RatedSkillListQueryCountTest(TestCase):
+    """Test list pages run the same queries whatever the number of skills"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.owner = User.objects.create_user(
+            username="listowner", first_name="List", password="testpass123"
+        )
+        self.owner.profile.city = "Lisbon"
+        self.owner.profile.save()
+        self.rater = User.objects.create_user(username="listrater", password="pass")
+        self.skill = self.add_skills(1)[0]
+        self.client.login(username="listowner", password="testpass123")
+
+    def add_skills(self, count):
+        skills = []
+        for index in range(count):
+            skill = Skill.objects.create(
+                user=self.owner,
+                title=f"Rated skill {index}",
+                description="Rated",
+                skill_type="offer" if index % 2 else "request",
+                category="technology",
+            )
+            Rating.objects.create(skill=skill, user=self.rater, rating=index % 5 + 1)
+            skills.append(skill)
+        return skills
+
+    def count_queries(self, url):
+        SKILL_RESULTS.reset_stats()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertConstantQueries(self, url, more=8):
+        """Request url with few and with more skills; the counts must match"""
+        cache.clear()
+        few = self.count_queries(url)
+        self.add_skills(more)
+        cache.clear()
+        self.assertEqual(self.count_queries(url), few)
+
+    def test_skills_list_search(self):
+        self.assertConstantQueries(reverse("skills_list_search"))
+
+    def test_skills_list_search_text(self):
+        self.assertConstantQueries(reverse("skills_list_search") + "?search=rated")
+
+    def test_my_skills(self):
+        self.assertConstantQueries(reverse("my_skills"))
+
+    def test_view_my_profile(self):
+        self.assertConstantQueries(reverse("view_my_profile"))
+
+    def test_view_user_profile(self):
+        self.assertConstantQueries(reverse("view_user_profile", args=[self.owner.pk]))
+
+    def test_skill_detail_more_skills(self):
+        self.assertConstantQueries(
+            reverse("skill_detail_page", args=[self.skill.pk]), more=2
+        )
+
+    def test_cards_show_annotated_average(self):
+        """Test the cards render the average from the with_ratings annotation"""
+        Rating.objects.create(
+            skill=self.skill,
+            user=User.objects.create_user(username="secondrater", password="pass"),
+            rating=4,
+        )
+        response = self.client.get(reverse("my_skills"))
+        skill = next(
+            card for card in response.context["skills"] if card.pk == self.skill.pk
+        )
+        self.assertEqual(skill.rating_average, 2.5)
+        self.assertEqual(skill.average_rating, 2.5)
+
+
+class RateSkillViewTest(TestCase):
+    """Test cases for submitting a rating through rate_skill"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.owner = User.objects.create_user(username="rateowner", password="pass")
+        self.rater = User.objects.create_user(username="raterone", password="pass")
+        self.skill = Skill.objects.create(
+            user=self.owner,
+            title="Pottery",
+            description="Wheel throwing",
+            skill_type="offer",
+            category="crafts",
+        )
+        self.url = reverse("rate_skill", args=[self.skill.pk])
+        self.client.login(username="raterone", password="pass")
+
+    def test_post_creates_rating_and_totals(self):
+        """Test a first submission inserts the rating and counts it"""
+        response = self.client.post(self.url, {"rating": "4", "comment": " Nice "})
+
+        self.assertRedirects(
+            response, reverse("skill_detail_page", args=[self.skill.pk])
+        )
+        rating = Rating.objects.get(skill=self.skill, user=self.rater)
+        self.assertEqual((rating.rating, rating.comment), (4, "Nice"))
+        self.skill.refresh_from_db()
+        self.assertEqual((self.skill.rating_sum, self.skill.rating_count), (4, 1))
+        self.assertEqual(self.skill.ratings_4, 1)
+        self.assertEqual(Profile.objects.get(user=self.owner).overall_rating, 4.0)
+
+    def test_repeat_post_updates_in_place(self):
+        """Test resubmitting replaces the rating instead of hitting the unique key"""
+        other = User.objects.create_user(username="ratertwo", password="pass")
+        Rating.objects.create(skill=self.skill, user=other, rating=2)
+        self.client.post(self.url, {"rating": "5", "comment": "First"})
+        created_at = Rating.objects.get(skill=self.skill, user=self.rater).created_at
+
+        self.client.post(self.url, {"rating": "3", "comment": "Second"})
+
+        rating = Rating.objects.get(skill=self.skill, user=self.rater)
+        self.assertEqual((rating.rating, rating.comment), (3, "Second"))
+        self.assertEqual(rating.created_at, created_at)
+        self.assertEqual(Rating.objects.filter(skill=self.skill).count(), 2)
+        self.skill.refresh_from_db()
+        self.assertEqual((self.skill.rating_sum, self.skill.rating_count), (5, 2))
+        self.assertEqual((self.skill.ratings_5, self.skill.ratings_3), (0, 1))
+        self.assertEqual(Profile.objects.get(user=self.owner).total_ratings, 2)
+
+    def test_post_writes_before_reading_rating(self):
+        """Test a changed rating is updated before any read of core_rating"""
+        self.client.post(self.url, {"rating": "5"})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, {"rating": "3"})
+
+        rating_queries = [
+            query["sql"] for query in queries if '"core_rating"' in query["sql"]
+        ]
+        self.assertRegex(rating_queries[0], r'^UPDATE "core_rating"')
+        self.assertFalse(
+            any(sql.startswith('INSERT INTO "core_rating"') for sql in rating_queries)
+        )
+        self.assertEqual(Rating.objects.get(skill=self.skill).rating, 3)
+
+    def test_first_post_inserts_after_update_finds_no_row(self):
+        """Test a new rating is inserted once the UPDATE found no row"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, {"rating": "5"})
+
+        rating_queries = [
+            query["sql"] for query in queries if '"core_rating"' in query["sql"]
+        ]
+        insert = next(
+            index
+            for index, sql in enumerate(rating_queries)
+            if sql.startswith('INSERT INTO "core_rating"')
+        )
+        self.assertEqual(
+            [sql for sql in rating_queries[:insert] if sql.startswith("SELECT")], []
+        )
+        self.assertRegex(rating_queries[0], r'^UPDATE "core_rating"')
+
+    def test_post_shifts_totals_without_recount(self):
+        """Test the totals move by the rating delta instead of a recount"""
+        self.client.post(self.url, {"rating": "2"})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, {"rating": "5"})
+
+        aggregates = [
+            q["sql"] for q in queries if "SUM(" in q["sql"] or "COUNT(" in q["sql"]
+        ]
+        self.assertEqual(aggregates, [])
+        self.skill.refresh_from_db()
+        self.assertEqual((self.skill.rating_sum, self.skill.rating_count), (5, 1))
+        self.assertEqual((self.skill.ratings_2, self.skill.ratings_5), (0, 1))
+        profile = Profile.objects.get(user=self.owner)
+        self.assertEqual((profile.rating_sum, profile.total_ratings), (5, 1))
+
+    def test_invalid_post_shows_form(self):
+        """Test an invalid rating re-renders the form without saving"""
+        response = self.client.post(self.url, {"rating": "9"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Rating.objects.filter(skill=self.skill).exists())
+
+
+class SkillRatingHistogramViewTest(TestCase):
+    """Test cases for the star histogram in the skill sidebar"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.owner = User.objects.create_user(username="histowner", password="pass")
+        self.skill = Skill.objects.create(
+            user=self.owner,
+            title="Calligraphy",
+            description="Brush lettering",
+            skill_type="offer",
+            category="crafts",
+        )
+
+    def test_histogram_adds_no_queries(self):
+        """Test the histogram renders from the skill row the page already reads"""
+        url = reverse("skill_detail_page", args=[self.skill.pk])
+        self.rate(5)
+        with CaptureQueriesContext(connection) as one_rating:
+            self.client.get(url)
+        for rating in (5, 3, 1):
+            self.rate(rating)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(len(queries), len(one_rating))
+        self.assertContains(response, "rating-histogram-row", count=5)
+        self.assertContains(response, 'style="width: 50%"')
+
+    def rate(self, rating):
+        rater = User.objects.create_user(
+            username=f"histrater{Rating.objects.count()}", password="pass"
+        )
+        Rating.objects.create(skill=self.skill, user=rater, rating=rating)
+
+
+class SkillLeaderboardViewTest(TestCase):
+    """Test cases for the per-category top rated page"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        owner = User.objects.create_user(username="topowner", password="pass")
+        rater = User.objects.create_user(username="toprater", password="pass")
+        for title, rating in (("Salsa", 3), ("Tango", 5)):
+            skill = Skill.objects.create(
+                user=owner,
+                title=title,
+                description="Dance",
+                skill_type="offer",
+                category="sports",
+            )
+            Rating.objects.create(skill=skill, user=rater, rating=rating)
+
+    def test_board_is_one_query(self):
+        """Test the page reads the board, skills and owners in one query"""
+        url = reverse("skill_leaderboard", args=["sports"])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        titles = [entry.skill.title for entry in response.context["entries"]]
+        self.assertEqual(titles, ["Tango", "Salsa"])
+
+    def test_other_type_and_unknown_category(self):
+        """Test the request board is separate and unknown categories 404"""
+        response = self.client.get(
+            reverse("skill_leaderboard", args=["sports"]) + "?type=request"
+        )
+        self.assertContains(response, "No rated skills yet")
+
+        response = self.client.get(reverse("skill_leaderboard", args=["nope"]))
+        self.assertEqual(response.status_code, 404)
+
+
+class SkillResultCacheTest(TestCase):
+    """Test cases for the cached skill search result pages"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        cache.clear()
+        SKILL_RESULTS.reset_stats()
+        self.user = User.objects.create_user(username="owner", password="pass")
+        self.rater = User.objects.create_user(username="rater", password="pass")
+        self.skills = [
+            Skill.objects.create(
+                user=self.user,
+                title=f"Cached skill {i}",
+                description="Cache test",
+                skill_type="offer",
+                category="technology",
+            )
+            for i in range(15)
+        ]
+
+    def get(self, query=""):
+        return self.client.get(reverse("skills_list_search") + query)
+
+    def test_repeated_request_hits_cache(self):
+        """Test the second identical request is served from the cache"""
+        first = self.get("?category=technology&type=offer")
+        second = self.get("?category=technology&type=offer")
+
+        self.assertEqual(first["X-Search-Cache"], "miss")
+        self.assertEqual(second["X-Search-Cache"], "hit")
+        self.assertEqual(
+            [skill.id for skill in first.context["page_obj"]],
+            [skill.id for skill in second.context["page_obj"]],
+        )
+        self.assertEqual(second.context["total_skills"], 15)
+        self.assertTrue(second.context["page_obj"].has_next)
+        self.assertEqual(
+            SKILL_RESULTS.stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5}
+        )
+
+    def test_stats_are_logged_periodically(self):
+        """Test the hit rate is logged when a counter reaches a multiple"""
+        with patch("core.search_cache.STATS_LOG_EVERY", 2):
+            with self.assertLogs("core.search_cache", "INFO") as logs:
+                self.get()
+                self.get()
+                self.get()
+
+        self.assertEqual(
+            logs.output,
+            [
+                "INFO:core.search_cache:Skill search results cache: "
+                "2 hits, 1 misses, 66.7% hit rate"
+            ],
+        )
+
+    def test_stats_command(self):
+        """Test the command prints the counters and can reset them"""
+        self.get()
+        self.get()
+        out = StringIO()
+        call_command("search_cache_stats", "--reset", stdout=out)
+
+        self.assertIn("1 hits, 1 misses, 50.0% hit rate", out.getvalue())
+        self.assertEqual(SKILL_RESULTS.stats()["hits"], 0)
+
+    def test_cache_hit_runs_fewer_queries(self):
+        """Test a hit loads the page by id instead of re-running the listing"""
+        self.get()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get()
+
+        skill_queries = [q["sql"] for q in queries if 'FROM "core_skill"' in q["sql"]]
+        self.assertEqual(response["X-Search-Cache"], "hit")
+        self.assertEqual(len(skill_queries), 1)
+        self.assertIn(" IN (", skill_queries[0])
+        self.assertNotIn("COUNT(", skill_queries[0].upper())
+
+    def test_cursor_is_part_of_the_key(self):
+        """Test each page of results is cached separately"""
+        first_page = self.get().context["page_obj"]
+        response = self.get(f"?cursor={first_page.next_cursor}")
+
+        self.assertEqual(response["X-Search-Cache"], "miss")
+        self.assertEqual(len(response.context["page_obj"]), 3)
+
+    def test_search_pages_are_cached(self):
+        """Test numbered search result pages are cached too"""
+        self.get("?search=cached&page=2")
+        response = self.get("?search=cached&page=2")
+
+        self.assertEqual(response["X-Search-Cache"], "hit")
+        self.assertEqual(response.context["page_obj"].number, 2)
+        self.assertEqual(len(response.context["page_obj"]), 3)
+        self.assertEqual(response.context["total_skills"], 15)
+
+    def test_skill_change_invalidates_cache(self):
+        """Test saving a skill bumps the generation and drops cached pages"""
+        self.get()
+        skill = self.skills[0]
+        skill.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            skill.save()
+
+        response = self.get()
+        self.assertEqual(response["X-Search-Cache"], "miss")
+        self.assertEqual(response.context["total_skills"], 14)
+
+    def test_generation_bumps_after_commit(self):
+        """Test a write only moves the generation once it commits"""
+        generation = get_generation()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.skills[0].title = "Renamed"
+            self.skills[0].save()
+            self.assertEqual(get_generation(), generation)
+
+        for callback in callbacks:
+            callback()
+        self.assertGreater(get_generation(), generation)
+
+    def test_evicted_generation_is_not_reused(self):
+        """Test a lost generation restarts above every earlier one"""
+        generation = get_generation()
+        cache.delete(GENERATION_KEY)
+        bump_generation()
+        self.assertGreater(get_generation(), generation)
+
+    def test_rating_change_invalidates_cache(self):
+        """Test adding or deleting a rating drops cached pages"""
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            rating = Rating.objects.create(
+                skill=self.skills[0], user=self.rater, rating=4
+            )
+        self.assertEqual(self.get()["X-Search-Cache"], "miss")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rating.delete()
+        self.assertEqual(self.get()["X-Search-Cache"], "miss")
+
+    def test_profile_change_invalidates_cache(self):
+        """Test profile changes drop cached pages filtered on the owner"""
+        self.get("?gender=F")
+        self.user.profile.gender = "F"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile.save()
+
+        response = self.get("?gender=F")
+        self.assertEqual(response["X-Search-Cache"], "miss")
+        self.assertEqual(response.context["total_skills"], 15)
+
+
+class AutocompleteViewTest(TestCase):
+    """Test cases for the autocomplete endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        SKILL_TITLES.reset()
+        LOCATIONS.reset()
+        self.user = User.objects.create_user(username="typer", password="pass")
+        self.user.profile.city = "Stockholm"
+        self.user.profile.country = "Sweden"
+        self.user.profile.save()
+        for title in ["Python Basics", "python basics", "Pottery", "Piano"]:
+            Skill.objects.create(
+                user=self.user,
+                title=title,
+                description="Autocomplete test",
+                skill_type="offer",
+                category="other",
+            )
+
+    def complete(self, query):
+        response = self.client.get(reverse("autocomplete") + query)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_title_prefix(self):
+        """Test titles are matched by case-insensitive prefix, once each"""
+        results = self.complete("?q=PYT")
+        self.assertEqual([title.lower() for title in results], ["python basics"])
+        self.assertEqual(self.complete("?q=p&limit=2"), ["Piano", "Pottery"])
+
+    def test_location_prefix(self):
+        """Test cities and countries are suggested for field=location"""
+        self.assertEqual(self.complete("?field=location&q=s"), ["Stockholm", "Sweden"])
+
+    def test_unknown_field(self):
+        """Test an unknown field is rejected"""
+        response = self.client.get(reverse("autocomplete") + "?field=bio&q=x")
+        self.assertEqual(response.status_code, 400)
+
+    def test_index_follows_skill_changes(self):
+        """Test committed skill edits and deletes update the loaded index"""
+        self.assertEqual(self.complete("?q=pot"), ["Pottery"])
+
+        skill = Skill.objects.get(title="Pottery")
+        with self.captureOnCommitCallbacks(execute=True):
+            skill.title = "Pasta"
+            skill.save()
+        self.assertEqual(self.complete("?q=pot"), [])
+        self.assertEqual(self.complete("?q=pas"), ["Pasta"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.get(title="python basics").delete()
+        self.assertEqual(len(self.complete("?q=pyt")), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.get(title="Python Basics").delete()
+        self.assertEqual(self.complete("?q=pyt"), [])
+
+
 class MessageViewTest(TestCase):
     """Test cases for message-related views"""
 
@@ -371,6 +1212,251 @@ class MessageViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Question")  # Message subject
 
+    def test_inbox_lists_threads_in_one_query(self):
+        """The inbox reads threads, not messages, whatever the thread length"""
+        for index in range(5):
+            Message.objects.create(
+                sender=self.sender,
+                receiver=self.receiver,
+                skill=self.skill,
+                subject=f"Follow-up {index}",
+                message="Hello again",
+            )
+        self.client.login(username="receiver", password="testpass123")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("inbox"))
+
+        self.assertContains(response, "Follow-up 4")
+        self.assertNotContains(response, "Follow-up 3")
+        self.assertContains(response, "6 NEW")
+        self.assertEqual(len(response.context["threads"]), 1)
+        message_reads = [
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "core_message"' in query["sql"]
+        ]
+        self.assertEqual(message_reads, [])
+
+    def test_view_conversation_marks_thread_read(self):
+        """Opening a thread lists its messages and clears the unread count"""
+        Message.objects.create(
+            sender=self.receiver,
+            receiver=self.sender,
+            skill=self.skill,
+            subject="Answer",
+            message="Sure!",
+        )
+        conversation = self.message.conversation
+        self.client.login(username="receiver", password="testpass123")
+
+        response = self.client.get(reverse("view_conversation", args=[conversation.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Question")
+        self.assertContains(response, "Answer")
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.unread_for(self.receiver), 0)
+        self.assertEqual(conversation.unread_for(self.sender), 1)
+        self.message.refresh_from_db()
+        self.assertTrue(self.message.is_read)
+
+    def test_view_conversation_other_users(self):
+        """A thread is only visible to its participants"""
+        User.objects.create_user(username="outsider", password="testpass123")
+        self.client.login(username="outsider", password="testpass123")
+
+        response = self.client.get(
+            reverse("view_conversation", args=[self.message.conversation_id])
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+
+class InboxActionsTest(TestCase):
+    """Test the bulk read/delete actions of the inbox"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username="user", password="testpass123")
+        self.alice = User.objects.create_user(username="alice", password="pass123")
+        self.bob = User.objects.create_user(username="bob", password="pass123")
+        for sender in (self.alice, self.alice, self.bob):
+            Message.objects.create(
+                sender=sender, receiver=self.user, subject="Hi", message="Hello!"
+            )
+        Message.objects.create(
+            sender=self.user, receiver=self.alice, subject="Re", message="Hey!"
+        )
+        self.with_alice = Conversation.objects.get(second_user=self.alice)
+        self.with_bob = Conversation.objects.get(second_user=self.bob)
+        self.client.login(username="user", password="testpass123")
+
+    def post_action(self, action, conversations=()):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("inbox_actions"),
+                {
+                    "action": action,
+                    "conversation": [conversation.pk for conversation in conversations],
+                },
+            )
+        sql = [query["sql"] for query in queries]
+        self.assertRedirects(response, reverse("inbox"))
+        return sql
+
+    def test_mark_all_read(self):
+        """One UPDATE reads every received message and clears the counters"""
+        self.assertEqual(unread_count(self.user), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sql = self.post_action("mark_all_read")
+
+        message_updates = [q for q in sql if q.startswith('UPDATE "core_message"')]
+        self.assertEqual(len(message_updates), 1)
+        self.assertFalse(
+            Message.objects.filter(receiver=self.user, is_read=False).exists()
+        )
+        self.assertEqual(Conversation.objects.unread_total(self.user), 0)
+        self.assertEqual(unread_count(self.user), 0)
+        # Alice still hasn't read the user's reply
+        self.assertEqual(Conversation.objects.unread_total(self.alice), 1)
+
+    def test_mark_selected_read(self):
+        """Only the selected threads are read"""
+        self.post_action("mark_read", [self.with_alice])
+
+        self.with_alice.refresh_from_db()
+        self.with_bob.refresh_from_db()
+        self.assertEqual(self.with_alice.unread_for(self.user), 0)
+        self.assertEqual(self.with_alice.unread_for(self.alice), 1)
+        self.assertEqual(self.with_bob.unread_for(self.user), 1)
+        self.assertTrue(Message.objects.filter(sender=self.bob, is_read=False).exists())
+
+    def test_delete_selected(self):
+        """Deleting hides the selected threads for the user only"""
+        self.assertEqual(unread_count(self.user), 3)
+        old_message = Message.objects.filter(sender=self.alice).first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post_action("delete", [self.with_alice])
+
+        self.assertEqual(unread_count(self.user), 1)
+        response = self.client.get(reverse("inbox"))
+        self.assertEqual(
+            [thread["conversation"] for thread in response.context["threads"]],
+            [self.with_bob],
+        )
+        response = self.client.get(
+            reverse("view_conversation", args=[self.with_alice.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("view_message", args=[old_message.pk]))
+        self.assertEqual(response.status_code, 404)
+        # Alice keeps the whole thread
+        self.assertEqual(Message.objects.visible_to(self.alice).count(), 3)
+        self.client.login(username="alice", password="pass123")
+        response = self.client.get(
+            reverse("view_conversation", args=[self.with_alice.pk])
+        )
+        self.assertEqual(len(response.context["thread_messages"]), 3)
+
+    def test_actions_scoped_to_user(self):
+        """Threads of other users are left alone"""
+        other_thread = Message.objects.create(
+            sender=self.alice, receiver=self.bob, subject="Hi", message="Hello!"
+        ).conversation
+
+        self.post_action("mark_read", [other_thread])
+        self.post_action("delete", [other_thread])
+
+        other_thread.refresh_from_db()
+        self.assertEqual(other_thread.unread_for(self.bob), 1)
+
+    def test_view_message_updates_only_is_read(self):
+        """Opening a message writes just its is_read column"""
+        message = Message.objects.filter(sender=self.bob).get()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("view_message", args=[message.pk]))
+
+        updates = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith('UPDATE "core_message"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('SET "is_read" = ', updates[0])
+        self.assertNotIn('"subject"', updates[0])
+        self.with_bob.refresh_from_db()
+        self.assertEqual(self.with_bob.unread_for(self.user), 0)
+
+
+class UnreadBadgeTest(TestCase):
+    """Test the cached unread total behind the Messages badge"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = Client()
+        self.sender = User.objects.create_user(
+            username="sender", password="testpass123"
+        )
+        self.receiver = User.objects.create_user(
+            username="receiver", password="testpass123"
+        )
+        self.message = Message.objects.create(
+            sender=self.sender,
+            receiver=self.receiver,
+            subject="Question",
+            message="Hello!",
+        )
+
+    def test_badge_shows_unread_total(self):
+        """Every page shows the signed-in user's unread total"""
+        self.client.login(username="receiver", password="testpass123")
+        response = self.client.get(reverse("home"))
+
+        self.assertEqual(response.context["unread_message_count"], 1)
+        self.assertContains(response, 'title="Unread messages">1</span>')
+
+    def test_cached_total_costs_no_query(self):
+        """Once cached, the badge doesn't read the conversations again"""
+        self.client.login(username="receiver", password="testpass123")
+        self.client.get(reverse("home"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("home"))
+
+        self.assertEqual(response.context["unread_message_count"], 1)
+        self.assertFalse(any("core_conversation" in query["sql"] for query in queries))
+
+    def test_send_and_read_shift_cached_total(self):
+        """send_message counts up and view_message counts down, after commit"""
+        self.assertEqual(unread_count(self.receiver), 1)
+        self.client.login(username="sender", password="testpass123")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("send_message_to_user", args=[self.receiver.pk]),
+                {"subject": "Another", "message": "Another message"},
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.receiver), 2)
+
+        self.client.login(username="receiver", password="testpass123")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse("view_message", args=[self.message.pk]))
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.receiver), 1)
+
+    def test_anonymous_has_no_badge(self):
+        """Signed-out pages neither count nor show unread messages"""
+        response = self.client.get(reverse("home"))
+
+        self.assertNotIn("unread_message_count", response.context)
+
 
 class SearchViewTest(TestCase):
     """Test cases for search functionality"""
@@ -437,6 +1523,104 @@ class SearchViewTest(TestCase):
         self.assertNotContains(response, "John Doe")
         self.assertContains(response, "Jane Smith")
 
+    def test_search_form_keeps_filters(self):
+        """Test the search form re-submits the active location and gender"""
+        response = self.client.get(reverse("search") + "?location=Oslo&gender=F")
+
+        self.assertContains(
+            response, '<input type="hidden" name="location" value="Oslo">', html=True
+        )
+        self.assertContains(
+            response, '<input type="hidden" name="gender" value="F">', html=True
+        )
+
+    def test_search_form_skips_unset_filters(self):
+        """Test no hidden filter inputs are rendered without filters"""
+        response = self.client.get(reverse("search") + "?gender=nope")
+
+        self.assertNotContains(response, 'type="hidden" name="location"')
+        self.assertNotContains(response, 'type="hidden" name="gender"')
+
+    def test_search_complete_profiles_only(self):
+        """Test ?complete=1 lists only people with a complete profile"""
+        self.user2.profile.skills_offered = "Knitting"
+        self.user2.profile.save()
+
+        response = self.client.get(reverse("search") + "?complete=1")
+
+        self.assertContains(response, "Jane Smith")
+        self.assertNotContains(response, "John Doe")
+        self.assertTrue(response.context["show_complete_only"])
+        self.assertIn("complete=1", response.context["filter_query"])
+
+    def test_search_by_profile_skill(self):
+        """Test search matches the skills listed on a profile"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(
+                user=self.user2,
+                title="Watercolor Painting",
+                description="Landscapes",
+                skill_type="offer",
+                category="music",
+            )
+
+        response = self.client.get(reverse("search") + "?search=watercolor")
+        self.assertContains(response, "Jane Smith")
+        self.assertNotContains(response, "John Doe")
+
+    def test_search_after_rename(self):
+        """Test renamed users are found by their new name only"""
+        self.user1.first_name = "Jonathan"
+        self.user1.save()
+
+        response = self.client.get(reverse("search") + "?search=jonathan")
+        self.assertContains(response, "Jonathan Doe")
+        response = self.client.get(reverse("search") + "?search=john")
+        self.assertNotContains(response, "Doe")
+
+    def test_search_is_paginated(self):
+        """Test the directory renders one page of users at a time"""
+        for index in range(12):
+            User.objects.create_user(
+                username=f"member{index}",
+                first_name="Member",
+                last_name=f"Number{index}",
+                password="testpass123",
+            )
+
+        response = self.client.get(reverse("search"))
+        page = response.context["page_obj"]
+        self.assertEqual(len(response.context["users_with_profiles"]), 12)
+        self.assertEqual(response.context["total_users"], 14)
+        self.assertTrue(page.has_next)
+
+        response = self.client.get(reverse("search") + f"?cursor={page.next_cursor}")
+        self.assertEqual(len(response.context["users_with_profiles"]), 2)
+        self.assertContains(response, "Number11")
+
+    def test_search_top_rated_sort(self):
+        """Test sort=top lists rated people only, best overall rating first"""
+        rater = User.objects.create_user(username="rater", password="testpass123")
+        with self.captureOnCommitCallbacks(execute=True):
+            for user, rating in ((self.user1, 3), (self.user2, 5)):
+                skill = Skill.objects.create(
+                    user=user,
+                    title="Cooking",
+                    description="Meals",
+                    skill_type="offer",
+                    category="cooking",
+                )
+                Rating.objects.create(skill=skill, user=rater, rating=rating)
+
+        response = self.client.get(reverse("search") + "?sort=top")
+        users = [entry["user"] for entry in response.context["users_with_profiles"]]
+        self.assertEqual(users, [self.user2, self.user1])
+        self.assertEqual(response.context["current_sort"], "top")
+
+        response = self.client.get(reverse("search") + "?search=cooking&sort=top")
+        users = [entry["user"] for entry in response.context["users_with_profiles"]]
+        self.assertEqual(users, [self.user2, self.user1])
+
 
 class ErrorViewTest(TestCase):
     """Test cases for error handling views"""
@@ -78,6 +78,7 @@ class SkillSwapTestRunner:
             "forms": "core.tests.django_tests.test_forms",
             "templates": "core.tests.django_tests.test_templates",
             "integration": "core.tests.django_tests.test_integration",
+            "query_plans": "core.tests.django_tests.test_query_plans",
         }
         self.frontend_categories = {
             "css_integration": "core.tests.frontend_tests.test_css_integration",
@@ -277,6 +278,7 @@ class SkillSwapTestRunner:
             "test_forms.py",
             "test_templates.py",
             "test_integration.py",
+            "test_query_plans.py",
         ]
 
         required_frontend_files = [
@@ -340,6 +342,7 @@ def main():
             "forms",
             "templates",
             "integration",
+            "query_plans",
             "css_integration",
             "css_refactoring_suite",
             "css_duplicates",
@@ -83,7 +83,14 @@ def main():
     """Main function"""
     if len(sys.argv) > 1:
         test_category = sys.argv[1]
-        valid_categories = ["models", "views", "forms", "templates", "integration"]
+        valid_categories = [
+            "models",
+            "views",
+            "forms",
+            "templates",
+            "integration",
+            "query_plans",
+        ]
 
         if test_category not in valid_categories:
             print_error(f"Invalid test category: {test_category}")
@@ -0,0 +1,53 @@
+"""
+Per-user unread message totals for the navigation badge.
+
+The stored counts are the per-participant Conversation.first_unread and
+second_unread columns. A user's total over their threads is cached under
+unread:<user_id>, so rendering the badge costs no query on a hit. The Message
+signals shift a cached total with incr/decr once their transaction commits (a
+rolled back send never reaches the cache), or drop it when a thread was
+recounted. A missing total is recomputed from the conversations on the next
+read; the timeout bounds any drift from a write that lands while another
+request is refilling the key.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+
+UNREAD_TIMEOUT = 60 * 15
+
+
+def _key(user_id):
+    return f"unread:{user_id}"
+
+
+def unread_count(user):
+    """How many received messages the user hasn't read"""
+    count = cache.get(_key(user.pk))
+    if count is None:
+        from .models import Conversation
+
+        count = Conversation.objects.unread_total(user)
+        cache.add(_key(user.pk), count, UNREAD_TIMEOUT)
+    return count
+
+
+def shift_unread_count(user_id, delta):
+    """Move a cached total by delta after the current transaction commits"""
+
+    def shift():
+        try:
+            if cache.incr(_key(user_id), delta) < 0:
+                cache.delete(_key(user_id))
+        except ValueError:
+            # Not cached: the next read counts from the conversations
+            pass
+
+    if delta:
+        transaction.on_commit(shift)
+
+
+def forget_unread_counts(*user_ids):
+    """Drop cached totals after the current transaction commits"""
+    keys = [_key(user_id) for user_id in set(user_ids)]
+    transaction.on_commit(lambda: cache.delete_many(keys))
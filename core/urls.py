@@ -12,12 +12,16 @@ from .views import (
     complete_name,
     add_skill,
     skills_list_search,
+    skill_leaderboard,
+    autocomplete,
     skill_detail_page,
     skill_edit,
     delete_skill,
     my_skills,
     send_message,
     inbox,
+    inbox_actions,
+    view_conversation,
     sent_messages,
     view_message,
     rate_skill,
@@ -54,6 +58,8 @@ urlpatterns = [
     # Skill URLs
     path("skills/", skills_list_search, name="skills_list_search"),
     path("skills/create/", add_skill, name="add_skill"),
+    path("autocomplete/", autocomplete, name="autocomplete"),
+    path("skills/top/<str:category>/", skill_leaderboard, name="skill_leaderboard"),
     path("skills/<int:pk>/", skill_detail_page, name="skill_detail_page"),
     path("skills/<int:pk>/edit/", skill_edit, name="skill_edit"),
     path("skills/<int:pk>/delete/", delete_skill, name="delete_skill"),
@@ -63,6 +69,8 @@ urlpatterns = [
     path("skills/<int:skill_id>/message/", send_message, name="send_message"),
     path("message/<int:user_id>/", send_message, name="send_message_to_user"),
     path("inbox/", inbox, name="inbox"),
+    path("inbox/actions/", inbox_actions, name="inbox_actions"),
+    path("inbox/<int:conversation_id>/", view_conversation, name="view_conversation"),
     path("sent/", sent_messages, name="sent_messages"),
     path("messages/<int:message_id>/", view_message, name="view_message"),
     # Rating URLs
@@ -1,11 +1,14 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404, JsonResponse
 from django.contrib.auth import login
 from django.views.generic import View
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q
+from django.core.paginator import Page, Paginator
+from django.db import transaction
+from django.db.models import F
+from django.utils.http import urlencode
 from .forms import (
     ProfileForm,
     CustomUserCreationForm,
@@ -14,7 +17,41 @@ from .forms import (
     MessageForm,
     RatingForm,
 )
-from .models import Profile, Skill, Message, Rating
+from .autocomplete import AUTOCOMPLETE_INDEXES
+from .facets import skill_facet_counts
+from .models import (
+    Conversation,
+    LeaderboardEntry,
+    Profile,
+    Skill,
+    Message,
+    Rating,
+    delete_conversations,
+    mark_conversation_read,
+    mark_conversations_read,
+    upsert_rating,
+)
+from .pagination import KeysetPage, KeysetPaginator
+from .search import (
+    fuzzy_search_skills,
+    location_q,
+    normalize_location,
+    prefix_q,
+    search_skills,
+    search_users,
+)
+from .search_cache import SKILL_RESULTS
+
+# "" keeps the natural order: relevance for text searches, otherwise newest
+SKILL_SORTS = [
+    ("", "Default"),
+    ("best", "Best match"),
+]
+
+USER_SORTS = [
+    ("", "Default"),
+    ("top", "Top rated"),
+]
 
 
 def home(request):
@@ -62,8 +99,9 @@ class SignupView(View):
 
 def _prepare_profile_context(target_user, is_own_profile):
     profile = get_object_or_404(Profile, user=target_user)
-    offered_skills = Skill.objects.filter(user=target_user, skill_type="offer")
-    requested_skills = Skill.objects.filter(user=target_user, skill_type="request")
+    skills = Skill.objects.with_ratings().filter(user=target_user)
+    offered_skills = skills.filter(skill_type="offer")
+    requested_skills = skills.filter(skill_type="request")
 
     profile_meta_items = [
         {
@@ -102,7 +140,10 @@ def view_user_profile(request, user_id):
 
 @login_required
 def edit_my_profile(request):
-    profile = get_object_or_404(Profile, user=request.user)
+    # The user's names count towards the completion computed on save
+    profile = get_object_or_404(
+        Profile.objects.select_related("user"), user=request.user
+    )
 
     if request.method == "POST":
         try:
@@ -125,8 +166,9 @@ def edit_my_profile(request):
         form = ProfileForm(instance=profile)
 
     # Get user's skills for display
-    offered_skills = Skill.objects.filter(user=request.user, skill_type="offer")
-    requested_skills = Skill.objects.filter(user=request.user, skill_type="request")
+    skills = Skill.objects.with_ratings().filter(user=request.user)
+    offered_skills = skills.filter(skill_type="offer")
+    requested_skills = skills.filter(skill_type="request")
 
     return render(
         request,
@@ -149,25 +191,79 @@ def custom_500(request):
 
 
 def search(request):
-    # Get all users
-    users_with_profiles = []
     users = (
-        User.objects.filter(is_active=True)
+        User.objects.filter(is_active=True, profile__isnull=False)
         .exclude(is_superuser=True)
         .select_related("profile")
     )
 
-    for user in users:
-        try:
-            profile = user.profile
-            users_with_profiles.append({"user": user, "profile": profile})
-        except Profile.DoesNotExist:
-            continue
+    search_query = request.GET.get("search", "").strip()
+    location = request.GET.get("location", "").strip()
+    gender = request.GET.get("gender", "").strip()
+    sort = request.GET.get("sort", "").strip()
+    if sort not in [choice[0] for choice in USER_SORTS]:
+        sort = ""
+    show_complete_only = request.GET.get("complete") == "1"
+
+    if location:
+        key = normalize_location(location)
+        users = users.filter(
+            prefix_q("profile__city_key", key) | prefix_q("profile__country_key", key)
+        )
+    if gender in [choice[0] for choice in Profile.GENDER_CHOICES]:
+        users = users.filter(profile__gender=gender)
+    else:
+        gender = ""
+    if show_complete_only:
+        users = users.filter(profile__is_profile_complete=True)
+
+    if sort == "top":
+        # Only people with ratings, best stored overall rating first
+        users = users.filter(profile__total_ratings__gt=0).annotate(
+            top_rating=F("profile__overall_rating")
+        )
+
+    if search_query:
+        # Ranked results are paged by number; relevance can't be seeked on
+        results = search_users(users, search_query)
+        if sort == "top":
+            results = results.order_by("-top_rating", "id")
+        paginator = Paginator(results, 12)
+        page_obj = paginator.get_page(request.GET.get("page"))
+        total_users = paginator.count
+    else:
+        ordering = ("-top_rating", "-id") if sort == "top" else ("id",)
+        paginator = KeysetPaginator(users, 12, ordering=ordering)
+        page_obj = paginator.get_page(request.GET.get("cursor"))
+        total_users = page_obj.count
+
+    users_with_profiles = [{"user": user, "profile": user.profile} for user in page_obj]
+
+    filter_query = urlencode(
+        {
+            key: value
+            for key, value in (
+                ("search", search_query),
+                ("location", location),
+                ("gender", gender),
+                ("sort", sort),
+                ("complete", "1" if show_complete_only else ""),
+            )
+            if value
+        }
+    )
 
     context = {
         "users_with_profiles": users_with_profiles,
-        "total_users": len(users_with_profiles),
-        "show_complete_only": False,
+        "page_obj": page_obj,
+        "total_users": total_users,
+        "search_query": search_query,
+        "current_location": location,
+        "current_gender": gender,
+        "filter_query": filter_query,
+        "show_complete_only": show_complete_only,
+        "current_sort": sort,
+        "sort_choices": USER_SORTS,
     }
     return render(request, "core/search.html", context)
 
@@ -208,7 +304,11 @@ def add_skill(request):
 
 
 def skills_list_search(request):
-    skills = Skill.objects.filter(is_active=True).select_related("user__profile")
+    skills = (
+        Skill.objects.with_ratings()
+        .filter(is_active=True)
+        .select_related("user__profile")
+    )
 
     # Get filter parameters and clean them
     skill_type = request.GET.get("type", "").strip()
@@ -216,6 +316,7 @@ def skills_list_search(request):
     search_query = request.GET.get("search", "").strip()
     location = request.GET.get("location", "").strip()
     gender = request.GET.get("gender", "").strip()
+    sort = request.GET.get("sort", "").strip()
 
     if skill_type.lower() in ["none", "null", ""]:
         skill_type = ""
@@ -228,41 +329,137 @@ def skills_list_search(request):
     if gender.lower() in ["none", "null", ""]:
         gender = ""
 
-    # Filter by skill type (offer/request) - optional
-    if skill_type and skill_type in ["offer", "request"]:
-        skills = skills.filter(skill_type=skill_type)
-
-    # Filter by category - optional
-    if category and category != "":
-        # Validate that the category exists in our choices
-        valid_categories = [choice[0] for choice in Skill.SKILL_CATEGORIES]
-        if category in valid_categories:
-            skills = skills.filter(category=category)
+    # Only valid choices narrow the results
+    valid_categories = [choice[0] for choice in Skill.SKILL_CATEGORIES]
+    valid_genders = [choice[0] for choice in Profile.GENDER_CHOICES]
+    type_filter = skill_type if skill_type in ["offer", "request"] else ""
+    category_filter = category if category in valid_categories else ""
+    gender_filter = gender if gender in valid_genders else ""
+    if sort not in [choice[0] for choice in SKILL_SORTS]:
+        sort = ""
+    best_match = sort == "best"
+
+    # Pages are cached as skill ids under the normalized filters + page address
+    result_key = {
+        "search": " ".join(search_query.lower().split()),
+        "location": normalize_location(location),
+        "type": type_filter,
+        "category": category_filter,
+        "gender": gender_filter,
+        "sort": sort,
+        "page": request.GET.get("cursor" if not search_query else "page", ""),
+    }
+    cached = SKILL_RESULTS.get(result_key)
 
-    # Filter by location (city or country) - optional
+    # Filter by location (city, country or skill location prefix) - optional
     if location and location != "":
-        skills = skills.filter(
-            Q(user__profile__city__icontains=location)
-            | Q(user__profile__country__icontains=location)
-            | Q(location__icontains=location)
-        )
-    if gender and gender != "":
-        valid_genders = [choice[0] for choice in Profile.GENDER_CHOICES]
-        if gender in valid_genders:
-            skills = skills.filter(user__profile__gender=gender)
-
-    # Search functionality (optional - applies to title and description)
+        skills = skills.filter(location_q(location))
+
+    # Sidebar counts per option are taken before the facet filters
+    facet_skills = skills
+
+    # Filter by skill type (offer/request), category and gender - optional
+    if type_filter:
+        skills = skills.filter(skill_type=type_filter)
+    if category_filter:
+        skills = skills.filter(category=category_filter)
+    if gender_filter:
+        skills = skills.filter(user__profile__gender=gender_filter)
+
+    # Search text - optional, retried typo-tolerantly when nothing matches.
+    # Both checks run on the filtered skills so the fuzzy match cap only
+    # counts skills that can be shown.
+    fuzzy_search = facet_fuzzy = False
     if search_query and search_query != "":
-        skills = skills.filter(
-            Q(title__icontains=search_query) | Q(description__icontains=search_query)
-        )
+        if cached is not None:
+            fuzzy_search = cached.get("fuzzy", False)
+            facet_fuzzy = cached.get("facet_fuzzy", fuzzy_search)
+        else:
+            fuzzy_search = not search_skills(skills, search_query).exists()
+            # Dropping the facet filters can only add exact matches
+            facet_fuzzy = (
+                fuzzy_search and not search_skills(facet_skills, search_query).exists()
+            )
+        if fuzzy_search:
+            skills = fuzzy_search_skills(skills, search_query, best_match=best_match)
+        else:
+            skills = search_skills(skills, search_query, best_match=best_match)
+        if facet_fuzzy:
+            # Uncapped, so the counts don't depend on other facets' matches
+            facet_skills = fuzzy_search_skills(facet_skills, search_query, capped=False)
+        else:
+            facet_skills = search_skills(facet_skills, search_query)
 
-    skills = skills.order_by("-created_at")
+    facet_counts = skill_facet_counts(
+        facet_skills,
+        {
+            "search": " ".join(search_query.lower().split()),
+            "location": normalize_location(location),
+        },
+        skill_type=type_filter,
+        category=category_filter,
+        gender=gender_filter,
+    )
 
-    # Pagination
-    paginator = Paginator(skills, 12)  # Show 12 skills per page
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    if search_query and search_query != "":
+        # Ranked results are paged by number; relevance can't be seeked on
+        paginator = Paginator(skills, 12)  # Show 12 skills per page
+        if cached is not None:
+            paginator.count = cached["count"]
+            page_obj = Page(_skills_by_ids(cached["ids"]), cached["number"], paginator)
+        else:
+            page_obj = paginator.get_page(request.GET.get("page"))
+            SKILL_RESULTS.set(
+                result_key,
+                {
+                    "ids": [skill.id for skill in page_obj],
+                    "number": page_obj.number,
+                    "count": paginator.count,
+                    "fuzzy": fuzzy_search,
+                    "facet_fuzzy": facet_fuzzy,
+                },
+            )
+        total_skills = paginator.count
+    else:
+        # Newest or best first, seeking on (created_at|score, id) so deep pages
+        # stay cheap; both orders have a matching partial index
+        ordering = ("-score", "-id") if best_match else ("-created_at", "-id")
+        paginator = KeysetPaginator(skills, 12, ordering=ordering)
+        if cached is not None:
+            page_obj = KeysetPage(
+                _skills_by_ids(cached["ids"]),
+                paginator,
+                cached["has_next"],
+                cached["has_previous"],
+                cached["count"],
+            )
+        else:
+            page_obj = paginator.get_page(request.GET.get("cursor"))
+            SKILL_RESULTS.set(
+                result_key,
+                {
+                    "ids": [skill.id for skill in page_obj],
+                    "has_next": page_obj.has_next,
+                    "has_previous": page_obj.has_previous,
+                    "count": page_obj.count,
+                },
+            )
+        total_skills = page_obj.count
+
+    filter_query = urlencode(
+        {
+            key: value
+            for key, value in (
+                ("search", search_query),
+                ("type", skill_type),
+                ("category", category),
+                ("location", location),
+                ("gender", gender),
+                ("sort", sort),
+            )
+            if value
+        }
+    )
 
     # Get categories and gender choices for filter dropdowns
     categories = Skill.SKILL_CATEGORIES
@@ -277,19 +474,82 @@ def skills_list_search(request):
         "current_category": category if category else "",
         "current_location": location if location else "",
         "current_gender": gender if gender else "",
+        "current_sort": sort,
+        "sort_choices": SKILL_SORTS,
         "search_query": search_query if search_query else "",
-        "total_skills": skills.count(),
+        "filter_query": filter_query,
+        "facet_counts": facet_counts,
+        "fuzzy_search": fuzzy_search,
+        "total_skills": total_skills,
     }
 
-    return render(request, "core/skills/skills_list_search.html", context)
+    response = render(request, "core/skills/skills_list_search.html", context)
+    response["X-Search-Cache"] = "hit" if cached is not None else "miss"
+    return response
+
+
+def _skills_by_ids(ids):
+    """Load active skills for cached ids, keeping the cached order"""
+    skills = (
+        Skill.objects.with_ratings()
+        .filter(is_active=True)
+        .select_related("user__profile")
+    )
+    by_id = skills.in_bulk(ids)
+    return [by_id[pk] for pk in ids if pk in by_id]
+
+
+def autocomplete(request):
+    """JSON prefix suggestions for skill titles (field=title) or locations"""
+    index = AUTOCOMPLETE_INDEXES.get(request.GET.get("field", "title"))
+    if index is None:
+        return JsonResponse({"error": "Unknown autocomplete field."}, status=400)
+
+    try:
+        limit = min(max(int(request.GET.get("limit", 10)), 1), 25)
+    except ValueError:
+        limit = 10
+
+    return JsonResponse(
+        {"results": index.complete(request.GET.get("q", ""), limit=limit)}
+    )
+
+
+def skill_leaderboard(request, category):
+    """Top rated skills of one category, read from the precomputed board"""
+    categories = dict(Skill.SKILL_CATEGORIES)
+    if category not in categories:
+        raise Http404("Unknown category")
+    skill_type = request.GET.get("type", "offer").strip()
+    if skill_type not in dict(Skill.SKILL_TYPES):
+        skill_type = "offer"
+
+    entries = (
+        LeaderboardEntry.objects.filter(category=category, skill_type=skill_type)
+        .select_related("skill__user__profile")
+        .order_by("rank")
+    )
+
+    context = {
+        "entries": entries,
+        "category": category,
+        "category_label": categories[category],
+        "categories": Skill.SKILL_CATEGORIES,
+        "current_type": skill_type,
+    }
+    return render(request, "core/skills/skill_leaderboard.html", context)
 
 
 def skill_detail_page(request, pk):
-    skill = get_object_or_404(Skill, pk=pk, is_active=True)
+    skill = get_object_or_404(
+        Skill.objects.select_related("user__profile"), pk=pk, is_active=True
+    )
 
-    other_skills_queryset = Skill.objects.filter(
-        user=skill.user, is_active=True
-    ).exclude(pk=pk)
+    other_skills_queryset = (
+        Skill.objects.with_ratings()
+        .filter(user=skill.user, is_active=True)
+        .exclude(pk=pk)
+    )
 
     offered_skills = other_skills_queryset.filter(skill_type="offer")[:3]
     requested_skills = other_skills_queryset.filter(skill_type="request")[:3]
@@ -372,8 +632,10 @@ def delete_skill(request, pk):
 
 @login_required
 def my_skills(request):
-    skills = Skill.objects.filter(user=request.user, is_active=True).order_by(
-        "-created_at"
+    skills = (
+        Skill.objects.with_ratings()
+        .filter(user=request.user, is_active=True)
+        .order_by("-created_at")
     )
 
     context = {
@@ -440,25 +702,91 @@ def send_message(request, skill_id=None, user_id=None):
 
 @login_required
 def inbox(request):
-    received_messages = Message.objects.filter(receiver=request.user).order_by(
-        "-created_at"
+    """The user's conversations, most recently active first"""
+    conversations = (
+        Conversation.objects.visible_to(request.user)
+        .select_related("first_user", "second_user", "skill", "last_message")
+        .order_by("-last_message_at", "-id")
+    )
+    paginator = KeysetPaginator(
+        conversations, 10, ordering=("-last_message_at", "-id"), with_count=False
     )
+    page_obj = paginator.get_page(request.GET.get("cursor"))
 
-    # Pagination
-    paginator = Paginator(received_messages, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    threads = [
+        {
+            "conversation": conversation,
+            "other_user": conversation.other_user(request.user),
+            "unread": conversation.unread_for(request.user),
+        }
+        for conversation in page_obj
+    ]
 
+    # The unread total comes from the unread_messages context processor
     context = {
-        "messages": page_obj,
-        "unread_count": received_messages.filter(is_read=False).count(),
+        "threads": threads,
+        "page_obj": page_obj,
     }
     return render(request, "core/messaging/inbox.html", context)
 
 
+@login_required
+def inbox_actions(request):
+    """Mark all, mark selected read, or delete selected threads of the inbox"""
+    if request.method != "POST":
+        return redirect("inbox")
+
+    action = request.POST.get("action")
+    selected = Conversation.objects.filter(
+        pk__in=[pk for pk in request.POST.getlist("conversation") if pk.isdigit()]
+    )
+    if action == "mark_all_read":
+        mark_conversations_read(request.user, Conversation.objects.all())
+    elif action == "mark_read":
+        mark_conversations_read(request.user, selected)
+    elif action == "delete":
+        delete_conversations(request.user, selected)
+    return redirect("inbox")
+
+
+@login_required
+def view_conversation(request, conversation_id):
+    """A thread's messages, newest first; opening it reads the user's share"""
+    conversation = get_object_or_404(
+        Conversation.objects.visible_to(request.user).select_related(
+            "first_user", "second_user", "skill"
+        ),
+        id=conversation_id,
+    )
+    if conversation.unread_for(request.user):
+        mark_conversation_read(conversation, request.user)
+
+    thread = conversation.messages.select_related("sender")
+    deleted_at = conversation.deleted_at_for(request.user)
+    if deleted_at is not None:
+        thread = thread.filter(created_at__gt=deleted_at)
+    paginator = KeysetPaginator(
+        thread, 20, ordering=("-created_at", "-id"), with_count=False
+    )
+    page_obj = paginator.get_page(request.GET.get("cursor"))
+
+    context = {
+        "conversation": conversation,
+        "other_user": conversation.other_user(request.user),
+        "thread_messages": page_obj,
+        "page_obj": page_obj,
+    }
+    return render(request, "core/messaging/conversation.html", context)
+
+
 @login_required
 def sent_messages(request):
-    sent_messages = Message.objects.filter(sender=request.user).order_by("-created_at")
+    sent_messages = (
+        Message.objects.filter(sender=request.user)
+        .visible_to(request.user)
+        .select_related("receiver", "skill")
+        .order_by("-created_at")
+    )
 
     # Pagination
     paginator = Paginator(sent_messages, 10)
@@ -474,17 +802,24 @@ def sent_messages(request):
 @login_required
 def view_message(request, message_id):
     """View a specific message"""
-    message = get_object_or_404(Message, id=message_id)
+    message = get_object_or_404(
+        Message.objects.select_related("sender", "receiver", "skill", "conversation"),
+        id=message_id,
+    )
 
     # Check if user is sender or receiver
-    if message.sender != request.user and message.receiver != request.user:
+    if request.user.pk not in (message.sender_id, message.receiver_id):
         messages.error(request, "You don't have permission to view this message.")
         return redirect("inbox")
+    if message.hidden_for(request.user):
+        raise Http404("Message not found")
 
-    # Mark as read if user is the receiver
-    if message.receiver == request.user and not message.is_read:
+    # Mark as read if user is the receiver; the signal moves the thread's
+    # unread counter in the same transaction
+    if message.receiver_id == request.user.pk and not message.is_read:
         message.is_read = True
-        message.save()
+        with transaction.atomic():
+            message.save(update_fields=["is_read"])
 
     context = {
         "message": message,
@@ -503,19 +838,20 @@ def rate_skill(request, skill_id):
         messages.error(request, "You cannot rate your own skill.")
         return redirect("skill_detail_page", pk=skill.id)
 
-    existing_rating = Rating.objects.filter(skill=skill, user=request.user).first()
-
     if request.method == "POST":
-        form = RatingForm(request.POST, instance=existing_rating)
+        form = RatingForm(request.POST)
         if form.is_valid():
-            rating = form.save(commit=False)
-            rating.skill = skill
-            rating.user = request.user
-            rating.save()
-
-            action = "updated" if existing_rating else "submitted"
+            # Inserts or replaces the user's rating, writing before it reads
+            upsert_rating(
+                skill,
+                request.user,
+                int(form.cleaned_data["rating"]),
+                form.cleaned_data["comment"],
+            )
             return redirect("skill_detail_page", pk=skill.id)
-    else:
+
+    existing_rating = Rating.objects.filter(skill=skill, user=request.user).first()
+    if request.method != "POST":
         form = RatingForm(instance=existing_rating)
 
     context = {
@@ -41,6 +41,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "core.context_processors.unread_messages",
             ],
         },
     },
@@ -89,3 +90,15 @@ LOGIN_URL = "/login/"
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")  # Changed to avoid conflict
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+
+# Send the core app's INFO lines (e.g. the search cache hit rate) to stderr
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core": {"handlers": ["console"], "level": "INFO"},
+    },
+}